@@ -1,3 +1,127 @@
-from django.contrib import admin
+from django.contrib.admin.utils import unquote
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, JsonResponse
+from django.urls import path
+from django.utils.http import urlencode
+from django.views.decorators.http import require_POST
+from unfold.views import ChangeList
 
-# Register your models here.
+from apps.common.paginators import CURSOR_VAR, KeysetPaginator
+from apps.common.search import get_search_backend, split_search_terms
+
+
+class KeysetChangeList(ChangeList):
+    # Links to the next page carry a cursor past the last row shown
+    next_cursor = None
+
+    def get_results(self, request):
+        super().get_results(request)
+        if self.multi_page and hasattr(self.paginator, "cursor_after"):
+            self.next_cursor = self.paginator.cursor_after(
+                self.page_num, self.result_list
+            )
+
+    def get_query_string(self, new_params=None, remove=None):
+        query = super().get_query_string(new_params, remove)
+        if self.next_cursor and (new_params or {}).get(PAGE_VAR) == self.page_num + 1:
+            query += "&" + urlencode({CURSOR_VAR: self.next_cursor})
+        return query
+
+
+class RankedChangeList(KeysetChangeList):
+    def get_ordering(self, request, queryset):
+        # Order search results by relevance unless a column sort was requested
+        ordering = super().get_ordering(request, queryset)
+        if "search_rank" in queryset.query.annotations and not self.params.get(
+            ORDER_VAR
+        ):
+            ordering = ["-search_rank", *ordering]
+        return ordering
+
+
+class IndexedSearchAdminMixin:
+    # Plain model fields searched through the database's search index
+    indexed_search_fields = None
+
+    def get_indexed_search_fields(self, request):
+        return self.indexed_search_fields or self.get_search_fields(request)
+
+    def get_search_results(self, request, queryset, search_term):
+        terms = split_search_terms(search_term)
+        if not terms:
+            return super().get_search_results(request, queryset, search_term)
+
+        backend = get_search_backend(
+            self.model, self.get_indexed_search_fields(request), using=queryset.db
+        )
+        return backend.search(queryset, terms), False
+
+    def get_changelist(self, request, **kwargs):
+        return RankedChangeList
+
+
+class KeysetPaginationAdminMixin:
+    # Page changelists by key: "next" links seek past the rows already shown
+    paginator = KeysetPaginator
+    show_full_result_count = False
+
+    def changelist_view(self, request, extra_context=None):
+        # The cursor isn't a filter; keep it out of the changelist's lookups
+        if CURSOR_VAR in request.GET:
+            request.GET = request.GET.copy()
+            request._keyset_cursor = request.GET.pop(CURSOR_VAR)[-1]
+        return super().changelist_view(request, extra_context)
+
+    def get_paginator(
+        self, request, queryset, per_page, orphans=0, allow_empty_first_page=True
+    ):
+        return self.paginator(
+            queryset,
+            per_page,
+            orphans,
+            allow_empty_first_page,
+            cursor=getattr(request, "_keyset_cursor", None),
+        )
+
+    def get_changelist(self, request, **kwargs):
+        # Changelists already built on KeysetChangeList (e.g. ranked search) stay
+        changelist = super().get_changelist(request, **kwargs)
+        if issubclass(changelist, KeysetChangeList):
+            return changelist
+        return KeysetChangeList
+
+
+class SortableAdminMixin:
+    # Drag-and-drop changelist reordering for OrderingMixin models
+    ordering_field = "order"
+    hide_ordering_field = True
+
+    class Media:
+        js = ["js/admin/sortable-changelist.js"]
+
+    def get_urls(self):
+        info = self.opts.app_label, self.opts.model_name
+        return [
+            path(
+                "<path:object_id>/move/",
+                self.admin_site.admin_view(require_POST(self.move_view)),
+                name="%s_%s_move" % info,
+            ),
+        ] + super().get_urls()
+
+    def move_view(self, request, object_id):
+        # Move one row before or after another, as posted by the changelist
+        obj = self.get_object(request, unquote(object_id))
+        if obj is None:
+            raise Http404
+        if not self.has_change_permission(request, obj):
+            raise PermissionDenied
+
+        position = "before" if request.POST.get("before") else "after"
+        target = self.get_object(request, unquote(request.POST.get(position, "")))
+        if target is None or target.pk == obj.pk:
+            return JsonResponse({"error": "Unknown target row."}, status=400)
+
+        self.model._default_manager.move(obj, **{position: target})
+        return JsonResponse({"pk": obj.pk, "order": obj.order})
@@ -5,3 +5,7 @@ class CommonConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.common"
     verbose_name = "Common Utilities"
+
+    def ready(self):
+        # Register signals
+        import apps.common.signals
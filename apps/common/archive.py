@@ -0,0 +1,146 @@
+import logging
+import time
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import router, transaction
+from django.db.models import ProtectedError, QuerySet, RestrictedError
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from apps.common.mixins import SoftDeleteMixin
+from apps.common.models import ArchivedRecord
+
+logger = logging.getLogger("apps.common")
+
+# Rows moved per transaction
+ARCHIVE_BATCH_SIZE = 500
+
+# Seconds to pause between batches so archiving never hogs the database
+ARCHIVE_THROTTLE = 0.2
+
+
+def archivable_models():
+    # Concrete soft-delete models that opt into archiving
+    return [
+        model
+        for model in apps.get_models()
+        if issubclass(model, SoftDeleteMixin)
+        and model.soft_delete_retention is not None
+    ]
+
+
+def expired_rows(model, now=None):
+    # Soft-deleted rows older than the model's retention window
+    cutoff = (now or timezone.now()) - model.soft_delete_retention
+    return model.all_objects.filter(is_deleted=True, deleted_at__lt=cutoff)
+
+
+def archive_model(
+    model,
+    batch_size=ARCHIVE_BATCH_SIZE,
+    throttle=ARCHIVE_THROTTLE,
+    now=None,
+    dry_run=False,
+):
+    # Move expired rows into the archive in primary key order, one batch at a time
+    queryset = expired_rows(model, now).order_by("pk")
+    if dry_run:
+        return {"eligible": queryset.count(), "archived": 0, "skipped": 0}
+
+    content_type = ContentType.objects.get_for_model(model, for_concrete_model=False)
+    archived = skipped = 0
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(batch[:batch_size])
+        if not rows:
+            break
+
+        last_pk = rows[-1].pk
+        moved, blocked = _archive_batch(model, rows, content_type)
+        archived += moved
+        skipped += blocked
+
+        if len(rows) < batch_size:
+            break
+        if throttle:
+            time.sleep(throttle)
+
+    if archived or skipped:
+        logger.info(
+            "Archived %s soft-deleted %s rows (%s skipped)",
+            archived,
+            model._meta.label,
+            skipped,
+        )
+    return {"eligible": archived + skipped, "archived": archived, "skipped": skipped}
+
+
+def _archive_batch(model, rows, content_type):
+    if _try_move(model, rows, content_type):
+        return len(rows), 0
+
+    # Part of the batch is still referenced; archive what we can
+    archived = 0
+    for row in rows:
+        if _try_move(model, [row], content_type):
+            archived += 1
+        else:
+            logger.warning(
+                "Cannot archive %s #%s, it is still referenced",
+                model._meta.label,
+                row.pk,
+            )
+    return archived, len(rows) - archived
+
+
+def _try_move(model, rows, content_type):
+    try:
+        with transaction.atomic():
+            return _move(model, rows, content_type)
+    except (ProtectedError, RestrictedError):
+        return False
+
+
+def _move(model, rows, content_type):
+    # Archive and delete the rows, unless deleting them would also delete or
+    # unlink other rows: those aren't archived, so the rows stay put
+    collector = Collector(using=router.db_for_write(model))
+    collector.collect(rows)
+    if _has_dependents(model, rows, collector):
+        return False
+
+    ArchivedRecord.objects.bulk_create(
+        ArchivedRecord.from_instance(row, content_type) for row in rows
+    )
+    collector.delete()
+    return True
+
+
+def _has_dependents(model, rows, collector):
+    # Anything the collector would cascade to or update besides the rows
+    # themselves (and their multi-table parents)
+    own = {model, *model._meta.get_parent_list()}
+    pks = {row.pk for row in rows}
+    for related, instances in collector.data.items():
+        if related in own:
+            if any(instance.pk not in pks for instance in instances):
+                return True
+        elif instances:
+            return True
+
+    pending = [*collector.fast_deletes]
+    for updates in collector.field_updates.values():
+        pending.extend(updates)
+    return any(
+        objs.exists() if isinstance(objs, QuerySet) else bool(objs) for objs in pending
+    )
+
+
+def archive_soft_deleted(**kwargs):
+    # Archive every archivable model, returning per-model results
+    return {
+        model._meta.label: archive_model(model, **kwargs)
+        for model in archivable_models()
+    }
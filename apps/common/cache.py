@@ -0,0 +1,15 @@
+from django_redis.exceptions import ConnectionInterrupted
+from redis.exceptions import RedisError
+
+# Errors raised by the cache when Redis is unreachable
+CACHE_ERRORS = (RedisError, ConnectionInterrupted)
+
+
+def get_redis_client(alias="default"):
+    # Raw Redis client behind a cache alias, or None for non-Redis backends
+    from django_redis import get_redis_connection
+
+    try:
+        return get_redis_connection(alias)
+    except NotImplementedError:
+        return None
@@ -0,0 +1,106 @@
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.core.validators import RegexValidator
+
+from apps.common.validators import date_not_in_future, date_not_in_past
+
+# Column validation runs each validator over a whole column, judging every
+# distinct value once and only building errors for the values that fail.
+# Good values never raise, so no exception is allocated for them. Column
+# values must be hashable (strings, numbers, dates).
+
+
+def _is_empty(value):
+    # Mirrors form validation, which skips validators for empty values
+    return value is None or value == ""
+
+
+def _years_before(day, years):
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        # February 29th in a non-leap year
+        return day.replace(year=day.year - years, day=28)
+
+
+def _raised_error(validator):
+    # Error for a value already known to fail, built by the validator itself
+    def make_error(value):
+        try:
+            validator(value)
+        except ValidationError as error:
+            return error
+
+    return make_error
+
+
+def _regex_check(validator):
+    search = validator.regex.search
+    inverse_match = validator.inverse_match
+
+    def is_valid(value):
+        return bool(search(str(value))) is not inverse_match
+
+    def make_error(value):
+        return ValidationError(
+            validator.message, code=validator.code, params={"value": value}
+        )
+
+    return is_valid, make_error
+
+
+def _column_check(validator, today):
+    # (is_valid, make_error) for one validator, with the per-value work hoisted
+    if isinstance(validator, RegexValidator):
+        return _regex_check(validator)
+
+    if validator is date_not_in_past:
+        return (lambda value: value >= today), _raised_error(validator)
+
+    if validator is date_not_in_future:
+        return (lambda value: value <= today), _raised_error(validator)
+
+    min_years = getattr(validator, "min_years", None)
+    if min_years is not None:
+        # age_at_least(): old enough means born on or before the cutoff
+        cutoff = _years_before(today, min_years)
+        return (lambda value: value <= cutoff), _raised_error(validator)
+
+    # Any other validator is called per distinct value
+    make_error = _raised_error(validator)
+    return (lambda value: make_error(value) is None), make_error
+
+
+# Validates a column against validators, returning {index: [ValidationError]}
+# for the failing rows only.
+def validate_column(values, *validators):
+    if not isinstance(values, (list, tuple)):
+        values = list(values)
+    distinct = {value for value in values if not _is_empty(value)}
+    today = date.today()
+
+    errors = {}
+    for validator in validators:
+        is_valid, make_error = _column_check(validator, today)
+        failed = {value: make_error(value) for value in distinct if not is_valid(value)}
+        if not failed:
+            continue
+
+        # Repeated bad values share one error instance
+        for index, value in enumerate(values):
+            if value in failed:
+                errors.setdefault(index, []).append(failed[value])
+
+    return errors
+
+
+# Validates several columns of the same rows, e.g. {"first_name": [...]} with
+# {"first_name": [human_name_validator]}, returning {index: {name: [errors]}}.
+def validate_columns(columns, validators):
+    errors = {}
+    for name, column_validators in validators.items():
+        column_errors = validate_column(columns[name], *column_validators)
+        for index, field_errors in column_errors.items():
+            errors.setdefault(index, {})[name] = field_errors
+    return dict(sorted(errors.items()))
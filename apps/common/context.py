@@ -0,0 +1,60 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# The user (or system sentinel) responsible for the work in progress. Context
+# variables follow async tasks and sync_to_async/async_to_sync hops, unlike
+# thread-locals, and are re-established per Celery task from message headers.
+_current_actor = ContextVar("current_actor", default=None)
+
+
+class SystemActor:
+    # Marks work done by the system itself; stored as no user
+    is_authenticated = False
+    pk = None
+
+    def __init__(self, name="system"):
+        self.name = name
+
+    def __str__(self):
+        return self.name
+
+
+def get_current_actor():
+    # Authenticated user for the current context, or None
+    actor = _current_actor.get()
+    if actor is None or not getattr(actor, "is_authenticated", False):
+        return None
+    return actor
+
+
+def get_current_actor_id():
+    actor = get_current_actor()
+    return actor.pk if actor is not None else None
+
+
+def is_system_actor():
+    return isinstance(_current_actor.get(), SystemActor)
+
+
+def set_current_actor(actor):
+    # Returns a token for reset_current_actor()
+    return _current_actor.set(actor)
+
+
+def reset_current_actor(token):
+    _current_actor.reset(token)
+
+
+@contextmanager
+def acting_as(actor):
+    # Attribute writes inside the block to actor
+    token = set_current_actor(actor)
+    try:
+        yield actor
+    finally:
+        reset_current_actor(token)
+
+
+def system_actor(name="system"):
+    # Attribute writes inside the block to the system rather than a leaked user
+    return acting_as(SystemActor(name))
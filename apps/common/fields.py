@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.db import models
+
+from apps.common.context import get_current_actor_id
+
+
+class CurrentActorField(models.ForeignKey):
+    # User foreign key filled from the current actor context on create, and
+    # on every save when on_update=True
+    def __init__(self, *args, on_update=False, **kwargs):
+        self.on_update = on_update
+        kwargs.setdefault("to", settings.AUTH_USER_MODEL)
+        kwargs.setdefault("on_delete", models.CASCADE)
+        kwargs.setdefault("default", get_current_actor_id)
+        kwargs["null"] = True
+        if on_update:
+            kwargs["editable"] = False
+            kwargs["blank"] = True
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.on_update:
+            kwargs["on_update"] = True
+            kwargs.pop("editable", None)
+            kwargs.pop("blank", None)
+        if kwargs.get("default") is get_current_actor_id:
+            del kwargs["default"]
+        kwargs.pop("null", None)
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        if self.on_update and not add:
+            # System work and saves outside any actor are credited to no one,
+            # never to whoever saved the row last
+            setattr(model_instance, self.attname, get_current_actor_id())
+        return super().pre_save(model_instance, add)
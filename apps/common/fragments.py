@@ -0,0 +1,78 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from apps.common.cache import CACHE_ERRORS
+
+logger = logging.getLogger("apps.common")
+
+# Seconds a rendered fragment is reused, in Redis and in process
+FRAGMENT_TIMEOUT = 3600
+
+# Fragments kept in the per-process LRU in front of Redis
+LOCAL_FRAGMENT_SIZE = 256
+
+KEY_PREFIX = "fragments"
+
+# Bumped when the navigation (templates or sidebar config) changes; part of
+# every role signature, so bumping it retires all cached chrome at once
+NAVIGATION_VERSION_KEY = f"{KEY_PREFIX}:navigation:version"
+
+# key -> (expires_at, value), most recently used last
+_local = OrderedDict()
+_lock = threading.Lock()
+
+
+def fragment_key(name, signature):
+    return f"{KEY_PREFIX}:{name}:{signature}"
+
+
+def _remember(key, value, timeout):
+    with _lock:
+        _local[key] = (time.monotonic() + timeout, value)
+        _local.move_to_end(key)
+        while len(_local) > LOCAL_FRAGMENT_SIZE:
+            _local.popitem(last=False)
+
+
+def get_fragment(key):
+    # Process memory first, then Redis; None on a miss
+    with _lock:
+        entry = _local.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                _local.move_to_end(key)
+                return entry[1]
+            del _local[key]
+
+    try:
+        value = cache.get(key)
+    except CACHE_ERRORS:
+        return None
+    if value is not None:
+        _remember(key, value, FRAGMENT_TIMEOUT)
+    return value
+
+
+def set_fragment(key, value, timeout=FRAGMENT_TIMEOUT):
+    _remember(key, value, timeout)
+    try:
+        cache.set(key, value, timeout)
+    except CACHE_ERRORS:
+        logger.debug("Fragment cache unavailable, kept %s in process only", key)
+
+
+def clear_local_fragments():
+    with _lock:
+        _local.clear()
+
+
+def invalidate_navigation():
+    # Every process picks up the new version with its next role signature
+    try:
+        cache.set(NAVIGATION_VERSION_KEY, time.time_ns(), None)
+    except CACHE_ERRORS:
+        logger.warning("Fragment cache unavailable, navigation not invalidated")
@@ -0,0 +1,172 @@
+import weakref
+from contextvars import ContextVar
+from functools import cache
+
+from django.apps import apps
+from django.db import connections, router, transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+
+from apps.common.context import get_current_actor_id
+
+# Attribute holding the last saved field values on tracked instances
+SNAPSHOT_ATTR = "_history_snapshot"
+
+# Values JSON can store as-is; anything else is recorded as its string form
+JSON_TYPES = (str, int, float, bool, type(None))
+
+# Entries waiting for their transaction to commit, per database alias
+_pending = ContextVar("change_log_pending", default=None)
+
+
+class _Marker:
+    # No-op on_commit callback standing in for one entry. Django drops it when
+    # the entry's savepoint or transaction rolls back, which kills the weak
+    # reference the batch keeps to it.
+    def __call__(self):
+        pass
+
+
+class _Batch:
+    # Entries of one transaction, written by a single robust on_commit flush
+    def __init__(self, using):
+        self.using = using
+        self.entries = []
+
+        # Only Django holds the flush, so a rollback that drops it kills the ref
+        def flush():
+            self.write()
+
+        transaction.on_commit(flush, robust=True, using=using)
+        self.flush_ref = weakref.ref(flush)
+
+    def add(self, entry):
+        # Registered after the flush, so surviving markers are still pending
+        # (and alive) when it runs
+        marker = _Marker()
+        transaction.on_commit(marker, using=self.using)
+        self.entries.append((weakref.ref(marker), entry))
+
+    @property
+    def scheduled(self):
+        return self.flush_ref() is not None
+
+    def write(self):
+        pending = _pending.get()
+        if pending is not None and pending.get(self.using) is self:
+            del pending[self.using]
+        committed = [entry for marker, entry in self.entries if marker() is not None]
+        self.entries = []
+        if committed:
+            _flush(self.using, committed)
+
+
+@cache
+def _tracked_fields(model):
+    exclude = set(model.history_exclude_fields)
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if not field.primary_key and field.name not in exclude
+    ]
+
+
+def _snapshot(instance):
+    # Loaded values only, so deferred fields are never fetched
+    values = instance.__dict__
+    return {
+        field.attname: values[field.attname]
+        for field in _tracked_fields(type(instance))
+        if field.attname in values
+    }
+
+
+def _json_value(value):
+    return value if isinstance(value, JSON_TYPES) else str(value)
+
+
+def _diff(old, new):
+    return {
+        name: [_json_value(old.get(name)), _json_value(value)]
+        for name, value in new.items()
+        if name not in old or old[name] != value
+    }
+
+
+def _record(instance, action, changes, using):
+    # Buffer an entry until the surrounding transaction commits; entries from
+    # rolled back savepoints are left out
+    entry = {
+        "model": type(instance),
+        "object_id": str(instance.pk),
+        "action": action,
+        "changes": changes,
+        "actor_id": get_current_actor_id(),
+        "created_at": timezone.now(),
+    }
+
+    if not connections[using].in_atomic_block:
+        _flush(using, [entry])
+        return
+
+    # A batch whose flush was discarded by a rollback is replaced; its entries
+    # were discarded with it
+    pending = _pending.get()
+    if pending is None:
+        pending = {}
+        _pending.set(pending)
+    batch = pending.get(using)
+    if batch is None or not batch.scheduled:
+        batch = pending[using] = _Batch(using)
+    batch.add(entry)
+
+
+def _flush(using, batch):
+    # One bulk insert per committed batch
+    content_type_model = apps.get_model("contenttypes", "ContentType")
+    change_log_entry = apps.get_model("common", "ChangeLogEntry")
+    content_types = content_type_model.objects.db_manager(using).get_for_models(
+        *{entry["model"] for entry in batch}, for_concrete_models=False
+    )
+    change_log_entry.objects.using(router.db_for_write(change_log_entry)).bulk_create(
+        change_log_entry(content_type=content_types[entry.pop("model")], **entry)
+        for entry in batch
+    )
+
+
+def remember_values(sender, instance, **kwargs):
+    setattr(instance, SNAPSHOT_ATTR, _snapshot(instance))
+
+
+def record_save(sender, instance, created, update_fields=None, using=None, **kwargs):
+    previous = {} if created else getattr(instance, SNAPSHOT_ATTR, {})
+    current = _snapshot(instance)
+    if update_fields is not None:
+        # Unsaved changes to other fields are diffed on a later save
+        names = {sender._meta.get_field(name).attname for name in update_fields}
+        current = {name: value for name, value in current.items() if name in names}
+    setattr(instance, SNAPSHOT_ATTR, {**previous, **current})
+
+    if created:
+        current = {
+            name: value for name, value in current.items() if value not in (None, "")
+        }
+
+    changes = _diff(previous, current)
+    if created or changes:
+        action = "create" if created else "update"
+        _record(instance, action, changes, using)
+
+
+def record_delete(sender, instance, using=None, **kwargs):
+    previous = getattr(instance, SNAPSHOT_ATTR, {})
+    changes = {name: [_json_value(value), None] for name, value in previous.items()}
+    _record(instance, "delete", changes, using)
+
+
+def track_changes(model):
+    # Connect the change log receivers for one concrete model
+    uid = f"change-log:{model._meta.label}"
+    post_init.connect(remember_values, sender=model, dispatch_uid=uid)
+    post_save.connect(record_save, sender=model, dispatch_uid=uid)
+    post_delete.connect(record_delete, sender=model, dispatch_uid=uid)
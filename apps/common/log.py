@@ -0,0 +1,106 @@
+import atexit
+import json
+import logging
+import os
+import queue
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler
+
+# LogRecord attributes that are not user supplied "extra" fields
+RESERVED_ATTRS = frozenset(logging.LogRecord("", 0, "", 0, "", None, None).__dict__) | {
+    "message",
+    "asctime",
+}
+
+
+class JSONLinesFormatter(logging.Formatter):
+    # One JSON object per line, including any "extra" fields
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+
+        return json.dumps(entry, default=str)
+
+
+class BoundedQueueHandler(QueueHandler):
+    # Hands records to a background writer thread and never blocks the caller.
+    # Configured through LOGGING with "handlers", "queue" and
+    # "respect_handler_level"; dictConfig attaches the QueueListener.
+
+    def __init__(self, queue):
+        super().__init__(queue)
+        self.listener = None
+        self.dropped = 0
+        self._reported = 0
+        self._pid = None
+
+    def prepare(self, record):
+        # Merge args now so later mutation can't change the message; timestamp
+        # formatting, tracebacks, JSON encoding and file I/O run on the writer
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Disk is stalled; drop rather than add latency to the request
+            self.dropped += 1
+            return
+
+        if self.dropped > self._reported:
+            self._report_dropped()
+
+    def _report_dropped(self):
+        count = self.dropped - self._reported
+        record = logging.LogRecord(
+            "apps.common.log",
+            logging.WARNING,
+            __file__,
+            0,
+            "Dropped %s log records while the log queue was full",
+            (count,),
+            None,
+        )
+        try:
+            self.queue.put_nowait(self.prepare(record))
+            self._reported = self.dropped
+        except queue.Full:
+            pass
+
+    def _ensure_listener(self):
+        # One writer thread per process, restarted in forked workers
+        pid = os.getpid()
+        if self.listener is None or self._pid == pid:
+            return
+
+        if self._pid is not None:
+            # The parent's thread and queue locks don't survive fork
+            self.queue = queue.Queue(maxsize=self.queue.maxsize)
+            self.listener.queue = self.queue
+            self.listener._thread = None
+
+        self._pid = pid
+        self.listener.start()
+        atexit.register(self.listener.stop)
@@ -0,0 +1,126 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+
+from apps.common.column_validators import validate_column
+from apps.common.validators import (
+    age_at_least,
+    date_not_in_future,
+    human_name_validator,
+    sku_code_validator,
+    slug_validator,
+    username_validator,
+)
+
+DEFAULT_ROWS = 1_000_000
+
+FIRST_NAMES = ["Juan", "María", "José", "Ana", "Luis", "Carmen", "Mark", "Joy"]
+LAST_NAMES = ["Cruz", "Santos", "Reyes", "dela Peña", "O'Neil", "Garcia-Lopez"]
+
+
+def validate_per_value(values, validator):
+    # The baseline: call the validator on every cell and catch failures
+    errors = {}
+    for index, value in enumerate(values):
+        if value is None or value == "":
+            continue
+        try:
+            validator(value)
+        except ValidationError as error:
+            errors[index] = [error]
+    return errors
+
+
+class Command(BaseCommand):
+    help = "Compare per-value and column validation on generated columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=DEFAULT_ROWS,
+            help=f"Rows per column (default: {DEFAULT_ROWS:,})",
+        )
+        parser.add_argument(
+            "--invalid-rate",
+            type=float,
+            default=0.01,
+            help="Share of generated values that fail validation (default: 0.01)",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        self.random = random.Random(options["seed"])
+        self.invalid_rate = options["invalid_rate"]
+
+        cases = [
+            ("human_name_validator", human_name_validator, self._names(rows)),
+            ("username_validator", username_validator, self._usernames(rows)),
+            ("slug_validator", slug_validator, self._slugs(rows)),
+            ("sku_code_validator", sku_code_validator, self._skus(rows)),
+            ("date_not_in_future", date_not_in_future, self._dates(rows)),
+            ("age_at_least(18)", age_at_least(18), self._dates(rows)),
+        ]
+
+        self.stdout.write(f"{rows:,} rows per column")
+        for label, validator, values in cases:
+            started = time.perf_counter()
+            expected = validate_per_value(values, validator)
+            per_value = time.perf_counter() - started
+
+            started = time.perf_counter()
+            errors = validate_column(values, validator)
+            column = time.perf_counter() - started
+
+            if errors.keys() != expected.keys():
+                self.stderr.write(f"{label}: results differ from per-value path")
+
+            speedup = per_value / column if column else float("inf")
+            self.stdout.write(
+                f"{label:<22} {len(errors):>8,} invalid  "
+                f"per-value {per_value:7.3f}s  column {column:7.3f}s  "
+                f"{speedup:6.1f}x"
+            )
+
+    def _pick(self, valid, invalid):
+        return invalid() if self.random.random() < self.invalid_rate else valid()
+
+    def _names(self, rows):
+        # Imported name columns repeat heavily
+        pool = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+        choice = self.random.choice
+        return [self._pick(lambda: choice(pool), lambda: "R2-D2") for _ in range(rows)]
+
+    def _usernames(self, rows):
+        # Every value distinct, so only per-call overhead is saved
+        return [
+            self._pick(lambda i=i: f"user.{i}", lambda i=i: f"user {i}")
+            for i in range(rows)
+        ]
+
+    def _slugs(self, rows):
+        return [
+            self._pick(lambda i=i: f"team-{i % 1000}", lambda: "Team Alpha")
+            for i in range(rows)
+        ]
+
+    def _skus(self, rows):
+        return [
+            self._pick(lambda i=i: f"SKU-{i % 20000}", lambda: "sku")
+            for i in range(rows)
+        ]
+
+    def _dates(self, rows):
+        today = date.today()
+        randint = self.random.randint
+        return [
+            self._pick(
+                lambda: today - timedelta(days=randint(20 * 365, 70 * 365)),
+                lambda: today + timedelta(days=randint(1, 365)),
+            )
+            for _ in range(rows)
+        ]
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+
+from apps.common.archive import (
+    ARCHIVE_BATCH_SIZE,
+    ARCHIVE_THROTTLE,
+    archivable_models,
+    archive_model,
+)
+
+
+class Command(BaseCommand):
+    help = "Archive soft-deleted rows that are past their retention window."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report how many rows would be archived without changing anything",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=ARCHIVE_BATCH_SIZE,
+            help=f"Rows archived per transaction (default: {ARCHIVE_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--throttle",
+            type=float,
+            default=ARCHIVE_THROTTLE,
+            help=f"Seconds to pause between batches (default: {ARCHIVE_THROTTLE})",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        models = archivable_models()
+        if not models:
+            self.stdout.write("No models use soft-delete archiving.")
+            return
+
+        total = 0
+        for model in models:
+            result = archive_model(
+                model,
+                batch_size=options["batch_size"],
+                throttle=options["throttle"],
+                dry_run=dry_run,
+            )
+            label = model._meta.label
+            if dry_run:
+                total += result["eligible"]
+                self.stdout.write(
+                    f"{label}: {result['eligible']} rows would be archived"
+                )
+            else:
+                total += result["archived"]
+                self.stdout.write(
+                    f"{label}: {result['archived']} archived, "
+                    f"{result['skipped']} skipped (still referenced)"
+                )
+
+        verb = "would be archived" if dry_run else "archived"
+        self.stdout.write(self.style.SUCCESS(f"{total} rows {verb}"))
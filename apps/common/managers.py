@@ -1,7 +1,121 @@
-from django.db import models
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
 
+from apps.common.context import get_current_actor_id
 
-class SoftDeleteManager(models.Manager):
+# Distance between neighbouring order keys after a rebalance
+ORDER_GAP = 1024
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    def soft_delete(self):
+        # Flag every matched row as deleted in one UPDATE
+        return self.filter(is_deleted=False).update(
+            is_deleted=True,
+            deleted_at=timezone.now(),
+            deleted_by_id=get_current_actor_id(),
+        )
+
+    def restore(self):
+        # Clear the deletion stamp on every matched row in one UPDATE
+        return self.filter(is_deleted=True).update(
+            is_deleted=False, deleted_at=None, deleted_by=None
+        )
+
+    def hard_delete(self):
+        # Permanently remove the matched rows
+        return self.delete()
+
+    def archived(self):
+        # Archived rows of this model; use .instances() for model objects
+        archived_record = apps.get_model("common", "ArchivedRecord")
+        return archived_record.objects.for_model(self.model)
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
     def get_queryset(self):
         # Return only non-deleted records
         return super().get_queryset().filter(is_deleted=False)
+
+
+class OrderingQuerySet(models.QuerySet):
+    def sort_order(self):
+        # The model's ordering with pk as the final tie-breaker
+        ordering = list(self.model._meta.ordering) or ["order"]
+        return [*ordering, "pk"]
+
+    def next_order(self):
+        # Key that places a new row after every existing one
+        last = self.aggregate(last=models.Max("order"))["last"]
+        return ORDER_GAP if last is None else last + ORDER_GAP
+
+    def move(self, obj, before=None, after=None):
+        # Place obj directly before or after another row with one UPDATE
+        if (before is None) == (after is None):
+            raise ValueError("Pass exactly one of before or after.")
+
+        with transaction.atomic(using=self.db):
+            key = self._key_for(obj, before, after)
+            if key is None:
+                # Neighbours share a key or are adjacent, spread keys out first
+                self.rebalance()
+                key = self._key_for(obj, before, after)
+
+            self.filter(pk=obj.pk).update(order=key)
+        obj.order = key
+        return obj
+
+    def rebalance(self):
+        # Renumber every row in its current order with a single CASE update
+        pks = list(self.order_by(*self.sort_order()).values_list("pk", flat=True))
+        if not pks:
+            return 0
+        return self.order_by().update(
+            order=Case(
+                *[
+                    When(pk=pk, then=Value(index * ORDER_GAP))
+                    for index, pk in enumerate(pks, start=1)
+                ],
+                default=F("order"),
+                output_field=models.PositiveIntegerField(),
+            )
+        )
+
+    def _key_for(self, obj, before, after):
+        others = self.exclude(pk=obj.pk)
+        target = before if before is not None else after
+        target_order = others.values_list("order", flat=True).get(pk=target.pk)
+
+        if after is not None:
+            lower = target_order
+            upper = (
+                others.exclude(pk=target.pk)
+                .filter(order__gte=target_order)
+                .order_by("order")
+                .values_list("order", flat=True)
+                .first()
+            )
+        else:
+            upper = target_order
+            lower = (
+                others.exclude(pk=target.pk)
+                .filter(order__lte=target_order)
+                .order_by("-order")
+                .values_list("order", flat=True)
+                .first()
+            )
+            if lower is None:
+                # Keys stay positive, so the top of the list is bounded by 0
+                lower = 0
+
+        if upper is None:
+            return lower + ORDER_GAP
+        if upper - lower > 1:
+            return (lower + upper) // 2
+        return None
+
+
+class OrderingManager(models.Manager.from_queryset(OrderingQuerySet)):
+    pass
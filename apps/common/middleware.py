@@ -0,0 +1,48 @@
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.decorators import sync_and_async_middleware
+
+from apps.common import profiling
+from apps.common.context import reset_current_actor, set_current_actor
+
+
+@sync_and_async_middleware
+def CurrentActorMiddleware(get_response):
+    # Expose request.user as the current actor for the rest of the request.
+    # The lazy user is stored as-is, so requests that write nothing never load it.
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            token = set_current_actor(request.user)
+            try:
+                return await get_response(request)
+            finally:
+                reset_current_actor(token)
+
+    else:
+
+        def middleware(request):
+            token = set_current_actor(request.user)
+            try:
+                return get_response(request)
+            finally:
+                reset_current_actor(token)
+
+    return middleware
+
+
+def TemplateProfilerMiddleware(get_response):
+    # Time every template rendered for the request. Opt-in through
+    # TEMPLATE_PROFILING; the template engine is left unpatched otherwise.
+    if not settings.TEMPLATE_PROFILING:
+        raise MiddlewareNotUsed
+    profiling.install()
+
+    def middleware(request):
+        with profiling.collect_renders() as profile:
+            response = get_response(request)
+        profiling.record_profile(request.path, profile)
+        return response
+
+    return middleware
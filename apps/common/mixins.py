@@ -1,15 +1,26 @@
+from datetime import timedelta
+
 from django.db import models
+from django.db.backends.utils import names_digest
+from django.db.models.signals import class_prepared
+from django.dispatch import receiver
 from django.utils import timezone
-from django_currentuser.db.models import CurrentUserField
 
-from apps.common.managers import SoftDeleteManager
+from apps.common.context import get_current_actor_id
+from apps.common.fields import CurrentActorField
+from apps.common.history import track_changes
+from apps.common.managers import (
+    OrderingManager,
+    SoftDeleteManager,
+    SoftDeleteQuerySet,
+)
 
 
 class AuditMixin(models.Model):
     created_at = models.DateTimeField(
         verbose_name="Created At", auto_now_add=True, db_index=True
     )
-    created_by = CurrentUserField(
+    created_by = CurrentActorField(
         verbose_name="Created By",
         related_name="%(app_label)s_%(class)s_created_by",
         db_index=True,
@@ -17,23 +28,27 @@ class AuditMixin(models.Model):
     updated_at = models.DateTimeField(
         verbose_name="Last Updated At", auto_now=True, db_index=True
     )
-    updated_by = CurrentUserField(
+    updated_by = CurrentActorField(
         verbose_name="Last Updated By",
+        on_update=True,
         related_name="%(app_label)s_%(class)s_updated_by",
         db_index=True,
     )
 
+    # Bookkeeping fields left out of the change log
+    history_exclude_fields = ["created_at", "created_by", "updated_at", "updated_by"]
+
     class Meta:
         abstract = True
 
 
 class SoftDeleteMixin(models.Model):
-    is_deleted = models.BooleanField(
-        verbose_name="Is Deleted", default=False, db_index=True
-    )
+    # Not indexed on its own; see the partial indexes added below
+    is_deleted = models.BooleanField(verbose_name="Is Deleted", default=False)
     deleted_at = models.DateTimeField(verbose_name="Deleted At", null=True, blank=True)
-    deleted_by = CurrentUserField(
+    deleted_by = CurrentActorField(
         verbose_name="Deleted By",
+        default=None,
         related_name="%(app_label)s_%(class)s_deleted_by",
         db_index=True,
         null=True,
@@ -42,7 +57,13 @@ class SoftDeleteMixin(models.Model):
     )
 
     objects = SoftDeleteManager()  # Returns non-deleted records only
-    all_objects = models.Manager()  # Return all records including deleted ones
+    all_objects = SoftDeleteQuerySet.as_manager()  # Return all records
+
+    # Columns given a partial index over live rows; defaults to Meta.ordering
+    soft_delete_index_fields = None
+
+    # How long deleted rows stay in the table before archiving (None keeps them)
+    soft_delete_retention = timedelta(days=90)
 
     class Meta:
         abstract = True
@@ -50,6 +71,7 @@ class SoftDeleteMixin(models.Model):
     def soft_delete(self):
         self.is_deleted = True
         self.deleted_at = timezone.now()
+        self.deleted_by_id = get_current_actor_id()
         self.save(update_fields=["is_deleted", "deleted_at", "deleted_by"])
 
     def restore(self):
@@ -59,6 +81,50 @@ class SoftDeleteMixin(models.Model):
         self.save(update_fields=["is_deleted", "deleted_at", "deleted_by"])
 
 
+def live_index_name(table, fields):
+    # Stable name within the 30 character limit for cross-database indexes
+    return f"{table[:16]}_{names_digest(table, *fields, length=8)}_live"
+
+
+@receiver(class_prepared)
+def track_audited_changes(sender, **kwargs):
+    # Record a field-level change log for every concrete AuditMixin model
+    if issubclass(sender, AuditMixin) and not sender._meta.abstract:
+        track_changes(sender)
+
+
+@receiver(class_prepared)
+def add_live_indexes(sender, **kwargs):
+    # Index hot lookup columns WHERE is_deleted = false on every concrete model
+    opts = sender._meta
+    if not issubclass(sender, SoftDeleteMixin) or opts.abstract or opts.proxy:
+        return
+
+    fields = sender.soft_delete_index_fields
+    if fields is None:
+        ordering = [
+            name
+            for name in opts.ordering
+            if isinstance(name, str) and "__" not in name and name != "?"
+        ]
+        fields = [ordering or ["pk"]]
+
+    for columns in fields:
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        columns = [
+            name.replace("pk", opts.pk.name) if name.lstrip("-") == "pk" else name
+            for name in columns
+        ]
+        name = live_index_name(opts.db_table, columns)
+        if any(index.name == name for index in opts.indexes):
+            continue
+        opts.indexes.append(
+            models.Index(
+                fields=columns, name=name, condition=models.Q(is_deleted=False)
+            )
+        )
+
+
 class ActiveMixin(models.Model):
     is_active = models.BooleanField(verbose_name="Active", default=True, db_index=True)
 
@@ -69,10 +135,21 @@ class ActiveMixin(models.Model):
 class OrderingMixin(models.Model):
     order = models.PositiveIntegerField(verbose_name="Order", default=0)
 
+    objects = OrderingManager()  # Adds move() and rebalance()
+
     class Meta:
         abstract = True
         ordering = ["order"]
 
+    def save(self, *args, **kwargs):
+        # New rows without an explicit order go last, a gap after the current
+        # last row, so later moves rarely need a rebalance
+        if self._state.adding and not self.order:
+            self.order = self.__class__._default_manager.using(
+                kwargs.get("using") or self._state.db
+            ).next_order()
+        super().save(*args, **kwargs)
+
 
 class NoteMixin(models.Model):
     notes = models.TextField(blank=True, default="", verbose_name="Notes")
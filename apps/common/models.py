@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class ArchivedRecordQuerySet(models.QuerySet):
+    def for_model(self, model):
+        # Same content type as stored by ArchivedRecord.from_instance()
+        return self.filter(
+            content_type=ContentType.objects.get_for_model(
+                model, for_concrete_model=False
+            )
+        )
+
+    def instances(self):
+        # Rebuild unsaved model instances from the archived rows
+        for record in self.select_related("content_type"):
+            yield record.instance
+
+
+class ArchivedRecord(models.Model):
+    content_type = models.ForeignKey(
+        ContentType, verbose_name="Content Type", on_delete=models.CASCADE
+    )
+    object_pk = models.CharField(verbose_name="Object ID", max_length=64)
+    data = models.JSONField(verbose_name="Data", encoder=DjangoJSONEncoder)
+    deleted_at = models.DateTimeField(verbose_name="Deleted At", null=True)
+    archived_at = models.DateTimeField(verbose_name="Archived At", auto_now_add=True)
+
+    objects = ArchivedRecordQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Archived Record"
+        indexes = [
+            models.Index(fields=["content_type", "object_pk"]),
+        ]
+
+    @classmethod
+    def from_instance(cls, instance, content_type=None):
+        # Snapshot every concrete column of a row
+        return cls(
+            content_type=content_type
+            or ContentType.objects.get_for_model(instance, for_concrete_model=False),
+            object_pk=str(instance.pk),
+            data={
+                field.attname: field.value_from_object(instance)
+                for field in instance._meta.concrete_fields
+            },
+            deleted_at=getattr(instance, "deleted_at", None),
+        )
+
+    @property
+    def instance(self):
+        # Unsaved instance of the original model; save() restores it
+        model = self.content_type.model_class()
+        values = {}
+        for field in model._meta.concrete_fields:
+            if field.attname in self.data:
+                values[field.attname] = field.to_python(self.data[field.attname])
+        return model(**values)
+
+    def __str__(self):
+        return f"{self.content_type} #{self.object_pk}"
+
+
+class ChangeLogEntryQuerySet(models.QuerySet):
+    def for_object(self, obj):
+        # An object's timeline, served by the (content_type, object_id, created_at) index
+        return self.filter(
+            content_type=ContentType.objects.get_for_model(
+                obj, for_concrete_model=False
+            ),
+            object_id=str(obj.pk),
+        ).order_by("created_at", "pk")
+
+
+class ChangeLogEntry(models.Model):
+    class Action(models.TextChoices):
+        CREATE = "create", "Created"
+        UPDATE = "update", "Updated"
+        DELETE = "delete", "Deleted"
+
+    content_type = models.ForeignKey(
+        ContentType, verbose_name="Content Type", on_delete=models.CASCADE
+    )
+    object_id = models.CharField(verbose_name="Object ID", max_length=64)
+    action = models.CharField(
+        verbose_name="Action", max_length=10, choices=Action.choices
+    )
+    # {field: [old, new]} for every field that changed
+    changes = models.JSONField(
+        verbose_name="Changes", encoder=DjangoJSONEncoder, default=dict
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name="Changed By",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    created_at = models.DateTimeField(verbose_name="Changed At", default=timezone.now)
+
+    objects = ChangeLogEntryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Change Log Entry"
+        verbose_name_plural = "Change Log"
+        indexes = [
+            models.Index(fields=["content_type", "object_id", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_action_display()} {self.content_type} #{self.object_id}"
@@ -0,0 +1,148 @@
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+# Query parameter carrying the key a page starts after
+CURSOR_VAR = "after"
+
+
+class KeysetPaginator(Paginator):
+    # Tables estimated above this many rows report the planner's estimate
+    estimate_threshold = 100_000
+
+    def __init__(self, *args, cursor=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Cursor from the link that led here; see cursor_after()
+        self.cursor = cursor
+
+    @cached_property
+    def count(self):
+        # Use the planner's estimate for large unfiltered tables
+        estimate = self._estimated_count()
+        if estimate is not None and estimate > self.estimate_threshold:
+            return estimate
+        return super().count
+
+    def page(self, number):
+        # Pages reached through a cursor seek past the previous page's last key;
+        # jumps to an arbitrary page fall back to OFFSET
+        number = self.validate_number(number)
+        keys = self._keyset_fields()
+        if number == 1 or keys is None:
+            return super().page(number)
+
+        boundary = self._decode_cursor(number, keys)
+        if boundary is None:
+            return super().page(number)
+
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+
+        object_list = self.object_list.filter(self._seek_filter(keys, boundary))
+        return self._get_page(object_list[: top - bottom], number, self)
+
+    def _estimated_count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet) or queryset.query.where:
+            return None
+
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+
+        # reltuples is -1 until the table is first analyzed
+        return row[0] if row and row[0] >= 0 else None
+
+    def _keyset_fields(self):
+        # Resolve ordering into (field, descending) pairs ending in a unique field
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet) or queryset.query.distinct:
+            return None
+
+        opts = queryset.model._meta
+        ordering = queryset.query.order_by or opts.ordering
+        keys = []
+        for item in ordering:
+            if not isinstance(item, str) or "__" in item or item.startswith("?"):
+                return None
+
+            descending = item.startswith("-")
+            name = item.lstrip("-")
+            try:
+                field = opts.pk if name == "pk" else opts.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if not field.concrete or field.null:
+                return None
+
+            keys.append((field.attname, descending))
+            if field.primary_key or field.unique:
+                return keys
+
+        return None
+
+    def cursor_after(self, number, object_list):
+        # Cursor for the page after `number`, from the last row shown on it.
+        # It carries the row's key, so rows added or removed meanwhile don't
+        # shift the next page.
+        keys = self._keyset_fields()
+        rows = list(object_list)
+        if keys is None or not rows:
+            return None
+
+        opts = self.object_list.model._meta
+        values = [opts.get_field(field).value_to_string(rows[-1]) for field, _ in keys]
+        payload = json.dumps([number + 1, values], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def _decode_cursor(self, number, keys):
+        # Key values from a cursor issued for this page; None when absent,
+        # malformed or meant for another page
+        if not self.cursor:
+            return None
+        try:
+            padded = self.cursor + "=" * (-len(self.cursor) % 4)
+            page, values = json.loads(base64.urlsafe_b64decode(padded))
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+            return None
+        if page != number or not isinstance(values, list) or len(values) != len(keys):
+            return None
+
+        opts = self.object_list.model._meta
+        try:
+            return tuple(
+                opts.get_field(field).to_python(value)
+                for (field, _), value in zip(keys, values)
+            )
+        except (TypeError, ValidationError):
+            return None
+
+    def _seek_filter(self, keys, boundary):
+        # (a, b) past (x, y) expands to: a past x OR (a = x AND b past y)
+        clauses = []
+        for index, (field, descending) in enumerate(keys):
+            lookup = "lt" if descending else "gt"
+            equal = {name: boundary[i] for i, (name, _) in enumerate(keys[:index])}
+            clauses.append(Q(**equal, **{f"{field}__{lookup}": boundary[index]}))
+
+        # Redundant bound on the leading key lets the index range scan start there
+        field, descending = keys[0]
+        leading = Q(**{f"{field}__{'lte' if descending else 'gte'}": boundary[0]})
+        return leading & reduce(or_, clauses)
@@ -0,0 +1,205 @@
+import logging
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.template.base import Template
+
+from apps.common.cache import CACHE_ERRORS, get_redis_client
+
+logger = logging.getLogger("apps.common")
+
+KEY_PREFIX = "template-profile"
+
+# Template names seen recently, scored by when they were last rendered
+TEMPLATE_INDEX_KEY = f"{KEY_PREFIX}:templates"
+
+# Requests kept per template for the rolling percentiles
+PROFILE_SAMPLES = 1000
+
+# Templates not rendered for a day drop off the report
+PROFILE_TTL = 24 * 60 * 60
+
+# Templates listed in a slow render log line
+SLOW_LOG_TEMPLATES = 5
+
+# Name recorded for templates built from strings
+UNNAMED_TEMPLATE = "<string>"
+
+# Collector for the request being profiled; None everywhere else
+_current_profile = ContextVar("template_profile", default=None)
+
+
+class RenderProfile:
+    # Inclusive and exclusive render seconds and render counts per template
+
+    def __init__(self):
+        self.stats = {}
+        self.total = 0.0
+        # [name, seconds spent in nested renders] per open render
+        self._stack = []
+
+    def enter(self, name):
+        self._stack.append([name, 0.0])
+
+    def exit(self, elapsed):
+        name, nested = self._stack.pop()
+        inclusive, exclusive, count = self.stats.get(name, (0.0, 0.0, 0))
+        # A template nested in itself is already timed by its outer render
+        if all(frame[0] != name for frame in self._stack):
+            inclusive += elapsed
+        self.stats[name] = (inclusive, exclusive + elapsed - nested, count + 1)
+
+        if self._stack:
+            self._stack[-1][1] += elapsed
+        else:
+            self.total += elapsed
+
+
+def profiled(render):
+    # Wrap Template._render; extends and include both go through it
+    @wraps(render)
+    def _render(self, context):
+        profile = _current_profile.get()
+        if profile is None:
+            return render(self, context)
+
+        profile.enter(self.name or UNNAMED_TEMPLATE)
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            profile.exit(time.perf_counter() - started)
+
+    _render.profiled = True
+    return _render
+
+
+def install():
+    if not getattr(Template._render, "profiled", False):
+        Template._render = profiled(Template._render)
+
+
+@contextmanager
+def collect_renders():
+    profile = RenderProfile()
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+def samples_key(name):
+    return f"{KEY_PREFIX}:samples:{name}"
+
+
+def record_profile(path, profile):
+    if not profile.stats:
+        return
+
+    _log_if_slow(path, profile)
+
+    client = get_redis_client()
+    if client is None:
+        return
+
+    now = time.time()
+    try:
+        pipe = client.pipeline(transaction=False)
+        for name, (inclusive, exclusive, count) in profile.stats.items():
+            key = samples_key(name)
+            pipe.lpush(key, f"{inclusive * 1000:.3f} {exclusive * 1000:.3f} {count}")
+            pipe.ltrim(key, 0, PROFILE_SAMPLES - 1)
+            pipe.expire(key, PROFILE_TTL)
+        pipe.zadd(TEMPLATE_INDEX_KEY, {name: now for name in profile.stats})
+        pipe.zremrangebyscore(TEMPLATE_INDEX_KEY, "-inf", now - PROFILE_TTL)
+        pipe.expire(TEMPLATE_INDEX_KEY, PROFILE_TTL)
+        pipe.execute()
+    except CACHE_ERRORS:
+        logger.debug("Template profile for %s dropped, cache unreachable", path)
+
+
+def _log_if_slow(path, profile):
+    render_ms = profile.total * 1000
+    if render_ms < settings.TEMPLATE_PROFILING_SLOW_MS:
+        return
+
+    slowest = sorted(profile.stats.items(), key=lambda item: item[1][1], reverse=True)
+    logger.warning(
+        "Slow template render on %s: %.1fms",
+        path,
+        render_ms,
+        extra={
+            "path": path,
+            "render_ms": round(render_ms, 1),
+            "templates": [
+                {
+                    "template": name,
+                    "inclusive_ms": round(inclusive * 1000, 1),
+                    "exclusive_ms": round(exclusive * 1000, 1),
+                    "renders": count,
+                }
+                for name, (inclusive, exclusive, count) in slowest[:SLOW_LOG_TEMPLATES]
+            ],
+        },
+    )
+
+
+def percentile(values, percent):
+    # Nearest-rank percentile of an already sorted list
+    if not values:
+        return None
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def summarize(name, samples):
+    # Rolling percentiles for one template from its "inclusive exclusive count" samples
+    rows = [sample.split() for sample in samples]
+    inclusive = sorted(float(row[0]) for row in rows)
+    exclusive = sorted(float(row[1]) for row in rows)
+    renders = sum(int(row[2]) for row in rows)
+    return {
+        "template": name,
+        "requests": len(rows),
+        "renders_per_request": renders / len(rows) if rows else 0,
+        "inclusive_p50": percentile(inclusive, 50),
+        "inclusive_p95": percentile(inclusive, 95),
+        "inclusive_p99": percentile(inclusive, 99),
+        "exclusive_p50": percentile(exclusive, 50),
+        "exclusive_p95": percentile(exclusive, 95),
+        "exclusive_p99": percentile(exclusive, 99),
+    }
+
+
+def template_report():
+    # Per-template summaries, slowest own render time first; None without Redis
+    client = get_redis_client()
+    if client is None:
+        return None
+
+    try:
+        names = [
+            name.decode()
+            for name in client.zrangebyscore(
+                TEMPLATE_INDEX_KEY, time.time() - PROFILE_TTL, "+inf"
+            )
+        ]
+        pipe = client.pipeline(transaction=False)
+        for name in names:
+            pipe.lrange(samples_key(name), 0, -1)
+        samples = pipe.execute()
+    except CACHE_ERRORS:
+        logger.warning("Template profile unavailable, cache unreachable")
+        return None
+
+    report = [
+        summarize(name, [sample.decode() for sample in values])
+        for name, values in zip(names, samples)
+        if values
+    ]
+    return sorted(report, key=lambda row: row["exclusive_p95"], reverse=True)
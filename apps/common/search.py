@@ -0,0 +1,267 @@
+import logging
+import re
+from functools import reduce
+from operator import and_, or_
+
+from django.db import DatabaseError, connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger("apps.common")
+
+# Shortest term the trigram indexes can serve (shorter terms scan)
+MIN_TRIGRAM_LENGTH = 3
+
+
+def split_search_terms(search_term):
+    # Split a search box value into lowercase terms, dropping empty ones
+    return [term.lower() for term in re.split(r"\s+", search_term.strip()) if term]
+
+
+def search_index_name(table, suffix):
+    # Database object name for a table's search index
+    return f"{table}_{suffix}"
+
+
+class SearchBackend:
+    # Fallback backend: case-insensitive substring match on every field
+    vendor = None
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        self.table = model._meta.db_table
+        self.columns = [model._meta.get_field(field).column for field in fields]
+
+    def is_available(self, connection):
+        return True
+
+    def search(self, queryset, terms):
+        # Return queryset filtered to terms and annotated with "search_rank"
+        queryset = queryset.filter(*[self._term_filter(term) for term in terms])
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def _term_filter(self, term):
+        return reduce(
+            or_, [Q(**{f"{field}__icontains": term}) for field in self.fields]
+        )
+
+    # Index management (called from migrations with historical models)
+    @classmethod
+    def install(cls, schema_editor, table, pk_column, columns):
+        pass
+
+    @classmethod
+    def uninstall(cls, schema_editor, table):
+        pass
+
+
+class TrigramSearchBackend(SearchBackend):
+    # PostgreSQL: pg_trgm GIN index over a lowercased concatenated document
+    vendor = "postgresql"
+
+    @staticmethod
+    def document_sql(columns, table=None):
+        # Must match the indexed expression for the planner to use the index
+        prefix = f'"{table}".' if table else ""
+        return "lower(%s)" % " || ' ' || ".join(
+            f'{prefix}"{column}"' for column in columns
+        )
+
+    def is_available(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_indexes WHERE indexname = %s",
+                [search_index_name(self.table, "search_trgm")],
+            )
+            return cursor.fetchone() is not None
+
+    def search(self, queryset, terms):
+        document = self.document_sql(self.columns, self.table)
+        for term in terms:
+            queryset = queryset.filter(
+                RawSQL(
+                    f"{document} LIKE %s",
+                    [f"%{escape_like(term)}%"],
+                    output_field=BooleanField(),
+                )
+            )
+        return queryset.annotate(
+            search_rank=RawSQL(
+                f"similarity({document}, %s)",
+                [" ".join(terms)],
+                output_field=FloatField(),
+            )
+        )
+
+    @classmethod
+    def install(cls, schema_editor, table, pk_column, columns):
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{search_index_name(table, "search_trgm")}" '
+            f'ON "{table}" USING gin (({cls.document_sql(columns)}) gin_trgm_ops)'
+        )
+
+    @classmethod
+    def uninstall(cls, schema_editor, table):
+        schema_editor.execute(
+            f'DROP INDEX IF EXISTS "{search_index_name(table, "search_trgm")}"'
+        )
+
+
+class FTS5SearchBackend(SearchBackend):
+    # SQLite: FTS5 trigram table kept in sync by triggers
+    vendor = "sqlite"
+    triggers = ["fts_insert", "fts_delete", "fts_update"]
+
+    def is_available(self, connection):
+        # Triggers are lost when SQLite migrations remake the table
+        names = [search_index_name(self.table, "fts")] + [
+            search_index_name(self.table, trigger) for trigger in self.triggers
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE name IN (%s)"
+                % ", ".join(["%s"] * len(names)),
+                names,
+            )
+            return cursor.fetchone()[0] == len(names)
+
+    def search(self, queryset, terms):
+        fts_table = search_index_name(self.table, "fts")
+        indexed = [term for term in terms if len(term) >= MIN_TRIGRAM_LENGTH]
+        short = [term for term in terms if len(term) < MIN_TRIGRAM_LENGTH]
+
+        # Terms too short for trigrams fall back to substring matching
+        if short:
+            queryset = queryset.filter(reduce(and_, map(self._term_filter, short)))
+        if not indexed:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+        match = " AND ".join('"%s"' % term.replace('"', '""') for term in indexed)
+        pk_column = self.model._meta.pk.column
+        return queryset.filter(
+            pk__in=RawSQL(
+                f'SELECT rowid FROM "{fts_table}" WHERE "{fts_table}" MATCH %s',
+                [match],
+            )
+        ).annotate(
+            # bm25() ranks are negative, lower is better
+            search_rank=RawSQL(
+                f'(SELECT -rank FROM "{fts_table}" WHERE "{fts_table}" MATCH %s '
+                f'AND rowid = "{self.table}"."{pk_column}")',
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+    @classmethod
+    def install(cls, schema_editor, table, pk_column, columns):
+        fts_table = search_index_name(table, "fts")
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"new.{column}" for column in columns)
+        old_values = ", ".join(f"old.{column}" for column in columns)
+
+        try:
+            schema_editor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS "{fts_table}" USING fts5('
+                f"{column_list}, content='{table}', content_rowid='{pk_column}', "
+                f"tokenize='trigram')"
+            )
+        except DatabaseError:
+            logger.warning(
+                "SQLite FTS5 trigram tokenizer unavailable, skipping %s", table
+            )
+            return
+
+        delete_old = (
+            f'INSERT INTO "{fts_table}"("{fts_table}", rowid, {column_list}) '
+            f"VALUES ('delete', old.{pk_column}, {old_values});"
+        )
+        insert_new = (
+            f'INSERT INTO "{fts_table}"(rowid, {column_list}) '
+            f"VALUES (new.{pk_column}, {new_values});"
+        )
+        statements = {
+            "fts_insert": f'AFTER INSERT ON "{table}" BEGIN {insert_new} END',
+            "fts_delete": f'AFTER DELETE ON "{table}" BEGIN {delete_old} END',
+            "fts_update": (
+                f'AFTER UPDATE OF {column_list} ON "{table}" '
+                f"BEGIN {delete_old} {insert_new} END"
+            ),
+        }
+        for trigger, body in statements.items():
+            schema_editor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS "{search_index_name(table, trigger)}" '
+                f"{body}"
+            )
+
+        # Index rows that existed before the table was created
+        schema_editor.execute(
+            f'INSERT INTO "{fts_table}"("{fts_table}") VALUES (\'rebuild\')'
+        )
+
+    @classmethod
+    def uninstall(cls, schema_editor, table):
+        for trigger in cls.triggers:
+            schema_editor.execute(
+                f'DROP TRIGGER IF EXISTS "{search_index_name(table, trigger)}"'
+            )
+        schema_editor.execute(
+            f'DROP TABLE IF EXISTS "{search_index_name(table, "fts")}"'
+        )
+
+
+# Indexed backends by database vendor
+SEARCH_BACKENDS = {
+    backend.vendor: backend for backend in [TrigramSearchBackend, FTS5SearchBackend]
+}
+
+# Per-process cache of index availability keyed by (alias, table)
+_available = {}
+
+
+def escape_like(term):
+    # Escape LIKE wildcards so user input matches literally
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def get_search_backend(model, fields, using="default"):
+    # Pick the indexed backend for the database, falling back to icontains
+    connection = connections[using]
+    backend_class = SEARCH_BACKENDS.get(connection.vendor)
+    if backend_class is None:
+        return SearchBackend(model, fields)
+
+    backend = backend_class(model, fields)
+    key = (using, backend.table)
+    if key not in _available:
+        try:
+            _available[key] = backend.is_available(connection)
+        except DatabaseError:
+            _available[key] = False
+        if not _available[key]:
+            logger.warning(
+                "Search index missing for %s, using unindexed search", backend.table
+            )
+    return backend if _available[key] else SearchBackend(model, fields)
+
+
+def install_search_index(schema_editor, model, fields):
+    # Create the vendor's search index for a (historical) model
+    backend_class = SEARCH_BACKENDS.get(schema_editor.connection.vendor)
+    if backend_class:
+        backend_class.install(
+            schema_editor,
+            model._meta.db_table,
+            model._meta.pk.column,
+            [model._meta.get_field(field).column for field in fields],
+        )
+        _available.clear()
+
+
+def uninstall_search_index(schema_editor, model):
+    backend_class = SEARCH_BACKENDS.get(schema_editor.connection.vendor)
+    if backend_class:
+        backend_class.uninstall(schema_editor, model._meta.db_table)
+        _available.clear()
@@ -0,0 +1,52 @@
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+from django.utils.functional import SimpleLazyObject
+
+from apps.common.context import (
+    get_current_actor_id,
+    reset_current_actor,
+    set_current_actor,
+)
+from apps.common.fragments import invalidate_navigation
+
+# Message header carrying the publishing context's actor to the worker
+ACTOR_HEADER = "actor_id"
+
+# Tokens of actors set for running tasks, keyed by task id
+_task_tokens = {}
+
+
+@before_task_publish.connect
+def attach_actor_header(headers=None, **kwargs):
+    # Tasks queued during a request or acting_as() block inherit its actor
+    if headers is not None:
+        headers[ACTOR_HEADER] = get_current_actor_id()
+
+
+@task_prerun.connect
+def set_task_actor(task_id=None, task=None, **kwargs):
+    actor_id = getattr(task.request, ACTOR_HEADER, None) if task else None
+    actor = None
+    if actor_id is not None:
+        # Loaded only if the task writes an audited row
+        actor = SimpleLazyObject(
+            lambda: get_user_model()._default_manager.filter(pk=actor_id).first()
+        )
+    _task_tokens[task_id] = set_current_actor(actor)
+
+
+@task_postrun.connect
+def reset_task_actor(task_id=None, **kwargs):
+    token = _task_tokens.pop(task_id, None)
+    if token is not None:
+        reset_current_actor(token)
+
+
+@receiver(post_migrate)
+def invalidate_navigation_on_deploy(sender, **kwargs):
+    # Navigation templates and the sidebar config ship with deploys, which
+    # migrate; once per run rather than once per app
+    if sender.name == "apps.common":
+        invalidate_navigation()
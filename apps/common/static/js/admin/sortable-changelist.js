@@ -0,0 +1,45 @@
+document.addEventListener('DOMContentLoaded', () => {
+    // Unfold makes the result list sortable when the admin sets ordering_field
+    const table = document.getElementById('result_list');
+    if (!table || !table.dataset.orderingField) return;
+
+    // Rows sorted by another column have no meaningful drop position
+    if (new URLSearchParams(window.location.search).has('o')) return;
+
+    table.addEventListener('end', (event) => {
+        if (event.oldIndex === event.newIndex) return;
+        moveRow(event.item);
+    });
+});
+
+function rowPk(row) {
+    // Changelist rows carry their pk on the action checkbox
+    const checkbox = row && row.querySelector('input.action-select');
+    return checkbox ? checkbox.value : null;
+}
+
+function moveRow(row) {
+    const previous = rowPk(row.previousElementSibling);
+    const next = rowPk(row.nextElementSibling);
+    const pk = rowPk(row);
+    if (!pk || (!previous && !next)) return;
+
+    // Anchor to the row above, or the row below when dropped at the top
+    const body = new FormData();
+    if (previous) {
+        body.append('after', previous);
+    } else {
+        body.append('before', next);
+    }
+
+    const csrfToken = document.querySelector('input[name=csrfmiddlewaretoken]');
+    fetch(`${encodeURIComponent(pk)}/move/`, {
+        method: 'POST',
+        body: body,
+        headers: { 'X-CSRFToken': csrfToken ? csrfToken.value : '' },
+        credentials: 'same-origin',
+    }).then((response) => {
+        // Reload to show the saved order if the move was rejected
+        if (!response.ok) window.location.reload();
+    });
+}
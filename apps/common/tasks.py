@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from apps.common.archive import archive_soft_deleted
+
+
+@shared_task
+def archive_soft_deleted_rows():
+    # Move soft-deleted rows past their retention window into the archive
+    return archive_soft_deleted()
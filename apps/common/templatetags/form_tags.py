@@ -0,0 +1,10 @@
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag
+def form_field(field, **overrides):
+    # {% form_field form.email tabindex="1" %} renders the field's component
+    # template; keyword arguments override the values taken from the field
+    return field.field.widget.render_component(field, **overrides)
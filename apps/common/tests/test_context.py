@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import warnings
+from types import SimpleNamespace
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from apps.common.context import (
+    acting_as,
+    get_current_actor,
+    get_current_actor_id,
+    is_system_actor,
+    system_actor,
+)
+from apps.common.middleware import CurrentActorMiddleware
+from apps.common.signals import attach_actor_header, reset_task_actor, set_task_actor
+
+User = get_user_model()
+
+# Disable all logging during tests
+logging.disable(logging.CRITICAL)
+
+# Suppress staticfiles warning during tests
+warnings.filterwarnings(
+    "ignore",
+    message="No directory at.*staticfiles",
+    category=UserWarning,
+)
+
+
+class CurrentActorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="juan", email="j@example.com")
+
+    # Test: acting_as sets the actor and restores the previous one
+    def test_acting_as_nests(self):
+        self.assertIsNone(get_current_actor())
+        with acting_as(self.user):
+            self.assertEqual(get_current_actor_id(), self.user.pk)
+            with system_actor("nightly-import"):
+                self.assertIsNone(get_current_actor())
+                self.assertTrue(is_system_actor())
+            self.assertEqual(get_current_actor(), self.user)
+        self.assertIsNone(get_current_actor())
+
+    # Test: anonymous users are not recorded as actors
+    def test_anonymous_user_is_no_actor(self):
+        with acting_as(AnonymousUser()):
+            self.assertIsNone(get_current_actor_id())
+
+    # Test: the actor follows async tasks and sync_to_async hops
+    def test_actor_crosses_async_boundaries(self):
+        async def view():
+            inner = asyncio.create_task(sync_to_async(get_current_actor_id)())
+            return await inner
+
+        with acting_as(self.user):
+            self.assertEqual(async_to_sync(view)(), self.user.pk)
+
+    # Test: the middleware exposes request.user for the request only
+    def test_middleware_sync_and_async(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        seen = []
+
+        def get_response(request):
+            seen.append(get_current_actor_id())
+            return HttpResponse()
+
+        async def aget_response(request):
+            seen.append(await sync_to_async(get_current_actor_id)())
+            return HttpResponse()
+
+        CurrentActorMiddleware(get_response)(request)
+        async_to_sync(CurrentActorMiddleware(aget_response))(request)
+        self.assertEqual(seen, [self.user.pk, self.user.pk])
+        self.assertIsNone(get_current_actor())
+
+    # Test: Celery tasks run as the actor that queued them
+    def test_celery_header_round_trip(self):
+        headers = {}
+        with acting_as(self.user):
+            attach_actor_header(headers=headers)
+
+        task = SimpleNamespace(request=SimpleNamespace(**headers))
+        set_task_actor(task_id="task-1", task=task)
+        self.assertEqual(get_current_actor_id(), self.user.pk)
+        reset_task_actor(task_id="task-1")
+        self.assertIsNone(get_current_actor())
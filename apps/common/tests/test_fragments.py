@@ -0,0 +1,47 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.common import fragments
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class FragmentStoreTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        fragments.clear_local_fragments()
+
+    # Test: Stored fragments are served from process memory
+    def test_local_hit(self):
+        fragments.set_fragment("fragments:a", "<nav>")
+        with mock.patch.object(cache, "get", side_effect=AssertionError):
+            self.assertEqual(fragments.get_fragment("fragments:a"), "<nav>")
+
+    # Test: A local miss falls back to the shared cache and is kept locally
+    def test_shared_fallback(self):
+        cache.set("fragments:a", "<nav>")
+        self.assertEqual(fragments.get_fragment("fragments:a"), "<nav>")
+        cache.clear()
+        self.assertEqual(fragments.get_fragment("fragments:a"), "<nav>")
+
+    # Test: The least recently used fragment is evicted first
+    @mock.patch.object(fragments, "LOCAL_FRAGMENT_SIZE", 2)
+    def test_eviction(self):
+        fragments.set_fragment("fragments:a", "a")
+        fragments.set_fragment("fragments:b", "b")
+        fragments.get_fragment("fragments:a")
+        fragments.set_fragment("fragments:c", "c")
+        cache.clear()
+
+        self.assertEqual(fragments.get_fragment("fragments:a"), "a")
+        self.assertIsNone(fragments.get_fragment("fragments:b"))
+        self.assertEqual(fragments.get_fragment("fragments:c"), "c")
+
+    # Test: Expired local copies are dropped
+    def test_expiry(self):
+        fragments.set_fragment("fragments:a", "a", timeout=-1)
+        cache.clear()
+        self.assertIsNone(fragments.get_fragment("fragments:a"))
@@ -0,0 +1,100 @@
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from django.test import SimpleTestCase
+
+from apps.common.log import BoundedQueueHandler, JSONLinesFormatter
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def make_record(msg, *args, level=logging.INFO, **extra):
+    record = logging.LogRecord("apps.test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class BoundedQueueHandlerTests(SimpleTestCase):
+    def setUp(self):
+        self.target = CollectingHandler()
+        self.handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+        self.handler.listener = QueueListener(
+            self.handler.queue, self.target, respect_handler_level=True
+        )
+
+    def tearDown(self):
+        if self.handler.listener._thread is not None:
+            self.handler.listener.stop()
+
+    # Test: Records are written by the background listener
+    def test_records_reach_target(self):
+        self.handler.handle(make_record("Hello %s", "world"))
+        self.handler.listener.stop()
+        self.assertEqual([r.getMessage() for r in self.target.records], ["Hello world"])
+
+    # Test: A full queue drops records and reports how many were lost
+    def test_full_queue_drops_and_reports(self):
+        self.handler._pid = -1
+        self.handler._ensure_listener = lambda: None
+        for index in range(4):
+            self.handler.handle(make_record("Message %s", index))
+        self.assertEqual(self.handler.dropped, 2)
+
+        self.handler.queue.get_nowait()
+        self.handler.queue.get_nowait()
+        self.handler.handle(make_record("After stall"))
+        messages = [self.handler.queue.get_nowait().getMessage() for _ in range(2)]
+        self.assertEqual(
+            messages,
+            ["After stall", "Dropped 2 log records while the log queue was full"],
+        )
+
+    # Test: Message arguments are merged before queueing
+    def test_prepare_merges_args(self):
+        args = ["before"]
+        record = self.handler.prepare(make_record("Value %s", args))
+        args.append("after")
+        self.assertEqual(record.getMessage(), "Value ['before']")
+
+    # Test: A forked process gets a fresh queue and its own writer thread
+    def test_restarts_after_fork(self):
+        self.handler.handle(make_record("Parent"))
+        parent_queue = self.handler.queue
+
+        # The parent's writer thread does not exist in the child
+        self.handler.listener.stop()
+        self.handler._pid = -1
+
+        self.handler.handle(make_record("Child"))
+        self.assertIsNot(self.handler.queue, parent_queue)
+        self.assertIs(self.handler.listener.queue, self.handler.queue)
+        self.handler.listener.stop()
+        self.assertIn("Child", [r.getMessage() for r in self.target.records])
+
+
+class JSONLinesFormatterTests(SimpleTestCase):
+    # Test: Output is one JSON object including extra fields
+    def test_format(self):
+        record = make_record("Login from %s", "10.0.0.1", user_id=7)
+        line = JSONLinesFormatter().format(record)
+        entry = json.loads(line)
+        self.assertNotIn("\n", line)
+        self.assertEqual(entry["message"], "Login from 10.0.0.1")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["user_id"], 7)
+
+    # Test: The apps logger is wired through the queue handler
+    def test_settings_configure_queue(self):
+        handler = logging.getHandlerByName("app_queue")
+        self.assertIsInstance(handler, BoundedQueueHandler)
+        self.assertEqual(handler.queue.maxsize, 10000)
+        self.assertEqual(logging.getLogger("apps").handlers, [handler])
@@ -0,0 +1,90 @@
+import logging
+import warnings
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.common.managers import ORDER_GAP
+from apps.users.models import Group
+
+User = get_user_model()
+
+# Disable all logging during tests
+logging.disable(logging.CRITICAL)
+
+# Suppress staticfiles warning during tests
+warnings.filterwarnings(
+    "ignore",
+    message="No directory at.*staticfiles",
+    category=UserWarning,
+)
+
+
+class OrderingQuerySetTests(TestCase):
+    def setUp(self):
+        self.groups = [
+            Group.objects.create(name=name, order=index * ORDER_GAP)
+            for index, name in enumerate(["A", "B", "C", "D"], start=1)
+        ]
+
+    def _names(self):
+        return list(Group.objects.values_list("name", flat=True))
+
+    # Test: Moving into a gap issues a single UPDATE
+    def test_move_uses_single_update(self):
+        a, b, c, d = self.groups
+        with self.assertNumQueries(5) as context:
+            Group.objects.move(d, after=a)
+        updates = [q for q in context.captured_queries if "UPDATE" in q["sql"]]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self._names(), ["A", "D", "B", "C"])
+
+    # Test: Moving before the first row and after the last row
+    def test_move_to_ends(self):
+        a, b, c, d = self.groups
+        Group.objects.move(c, before=a)
+        Group.objects.move(a, after=d)
+        self.assertEqual(self._names(), ["C", "B", "D", "A"])
+
+    # Test: Exhausted gaps trigger one CASE rebalance
+    def test_rebalance_when_gaps_run_out(self):
+        a, b, c, d = self.groups
+        for _ in range(12):
+            Group.objects.move(d, before=b)
+            Group.objects.move(c, before=d)
+            d, c = c, d
+        self.assertEqual(self._names()[0], "A")
+        self.assertEqual(len(set(Group.objects.values_list("order", flat=True))), 4)
+
+    # Test: Rows sharing the default key are spread out before moving
+    def test_move_with_duplicate_keys(self):
+        Group.objects.update(order=0)
+        a, b, c, d = self.groups
+        Group.objects.move(d, after=a)
+        self.assertEqual(self._names(), ["A", "D", "B", "C"])
+        self.assertEqual(
+            list(Group.objects.values_list("order", flat=True)),
+            [ORDER_GAP, ORDER_GAP + ORDER_GAP // 2, 2 * ORDER_GAP, 3 * ORDER_GAP],
+        )
+
+    # Test: Exactly one position argument is required
+    def test_move_requires_one_position(self):
+        with self.assertRaises(ValueError):
+            Group.objects.move(self.groups[0])
+
+    # Test: The admin move endpoint reorders rows
+    def test_admin_move_view(self):
+        admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="admin123"
+        )
+        self.client.force_login(admin)
+        a, b, c, d = self.groups
+
+        url = reverse("admin:users_group_move", args=[d.pk])
+        response = self.client.post(url, {"before": a.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._names(), ["D", "A", "B", "C"])
+
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertEqual(self.client.post(url, {"after": d.pk}).status_code, 400)
@@ -1,10 +1,20 @@
 import logging
 import warnings
+from datetime import timedelta
+from io import StringIO
 
 from django.contrib.auth import get_user_model
-from django.db import connection, models
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection, models, transaction
+from django.db.models import Q
 from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
+from apps.common.archive import archive_model
+from apps.common.context import acting_as, system_actor
+from apps.common.managers import ORDER_GAP
 from apps.common.mixins import (
     ActiveMixin,
     AuditMixin,
@@ -12,6 +22,7 @@ from apps.common.mixins import (
     OrderingMixin,
     SoftDeleteMixin,
 )
+from apps.common.models import ChangeLogEntry
 
 User = get_user_model()
 
@@ -45,6 +56,24 @@ class TestSoftDeleteModel(SoftDeleteMixin):
         app_label = "common"
 
 
+class TestSoftDeleteChild(models.Model):
+    parent = models.ForeignKey(
+        TestSoftDeleteModel,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="children",
+    )
+    linked = models.ForeignKey(
+        TestSoftDeleteModel,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="links",
+    )
+
+    class Meta:
+        app_label = "common"
+
+
 class TestActiveModel(ActiveMixin):
     name = models.CharField(max_length=100)
 
@@ -99,6 +128,130 @@ class AuditMixinTests(TransactionTestCase):
         obj.save()
         self.assertGreater(obj.updated_at, old_updated)
 
+    # Test: created_by and updated_by come from the current actor
+    def test_audit_actor_fields(self):
+        author = User.objects.create_user(username="author", email="a@example.com")
+        editor = User.objects.create_user(username="editor", email="e@example.com")
+
+        with acting_as(author):
+            obj = TestAuditModel.objects.create(name="Test")
+        self.assertEqual(obj.created_by, author)
+        self.assertEqual(obj.updated_by, author)
+
+        with acting_as(editor):
+            obj.save()
+        obj.refresh_from_db()
+        self.assertEqual(obj.updated_by, editor)
+
+        # System writes and writes outside any actor are credited to no one
+        with system_actor():
+            obj.save()
+        obj.refresh_from_db()
+        self.assertEqual(obj.created_by, author)
+        self.assertIsNone(obj.updated_by)
+
+        with acting_as(editor):
+            obj.save()
+        obj.save()
+        obj.refresh_from_db()
+        self.assertIsNone(obj.updated_by)
+
+
+class ChangeLogTests(TransactionTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with connection.schema_editor() as schema_editor:
+            schema_editor.create_model(TestAuditModel)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as schema_editor:
+            schema_editor.delete_model(TestAuditModel)
+
+    def _log_inserts(self, context):
+        table = ChangeLogEntry._meta.db_table
+        return [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith(f'INSERT INTO "{table}"')
+        ]
+
+    # Test: every change in a transaction is written by one bulk insert
+    def test_one_insert_per_transaction(self):
+        editor = User.objects.create_user(username="editor", email="e@example.com")
+
+        with CaptureQueriesContext(connection) as context:
+            with transaction.atomic(), acting_as(editor):
+                obj = TestAuditModel.objects.create(name="Draft")
+                obj.name = "Final"
+                obj.save()
+                obj.save()  # No changes, no entry
+                self.assertFalse(ChangeLogEntry.objects.exists())
+
+        self.assertEqual(len(self._log_inserts(context)), 1)
+        entries = list(ChangeLogEntry.objects.for_object(obj))
+        self.assertEqual([entry.action for entry in entries], ["create", "update"])
+        self.assertEqual(entries[0].changes, {"name": [None, "Draft"]})
+        self.assertEqual(entries[1].changes, {"name": ["Draft", "Final"]})
+        self.assertEqual(entries[1].actor, editor)
+
+    # Test: changes inside a rolled back savepoint are not logged
+    def test_rolled_back_savepoint_is_dropped(self):
+        with transaction.atomic():
+            obj = TestAuditModel.objects.create(name="Kept")
+            try:
+                with transaction.atomic():
+                    obj.name = "Discarded"
+                    obj.save()
+                    raise ValueError
+            except ValueError:
+                pass
+
+        self.assertEqual(
+            list(
+                ChangeLogEntry.objects.for_object(obj).values_list("action", flat=True)
+            ),
+            ["create"],
+        )
+
+    # Test: rolling back the savepoint that started the batch keeps later changes
+    def test_rolled_back_first_savepoint(self):
+        try:
+            with transaction.atomic():
+                TestAuditModel.objects.create(name="Lost")
+                raise ValueError
+        except ValueError:
+            pass
+
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    TestAuditModel.objects.create(name="Discarded")
+                    raise ValueError
+            except ValueError:
+                pass
+            obj = TestAuditModel.objects.create(name="Kept")
+
+        self.assertEqual(
+            list(ChangeLogEntry.objects.values_list("changes", flat=True)),
+            [{"name": [None, "Kept"]}],
+        )
+
+    # Test: deletes record the last values and timelines load in one query
+    def test_delete_and_timeline(self):
+        obj = TestAuditModel.objects.create(name="Gone")
+        pk = obj.pk
+        obj.delete()
+        obj.pk = pk
+
+        ContentType.objects.get_for_model(TestAuditModel)
+        with self.assertNumQueries(1):
+            entries = list(ChangeLogEntry.objects.for_object(obj))
+        self.assertEqual(entries[-1].action, "delete")
+        self.assertEqual(entries[-1].changes, {"name": ["Gone", None]})
+
 
 class SoftDeleteMixinTests(TransactionTestCase):
     @classmethod
@@ -106,11 +259,13 @@ class SoftDeleteMixinTests(TransactionTestCase):
         super().setUpClass()
         with connection.schema_editor() as schema_editor:
             schema_editor.create_model(TestSoftDeleteModel)
+            schema_editor.create_model(TestSoftDeleteChild)
 
     @classmethod
     def tearDownClass(cls):
         super().tearDownClass()
         with connection.schema_editor() as schema_editor:
+            schema_editor.delete_model(TestSoftDeleteChild)
             schema_editor.delete_model(TestSoftDeleteModel)
 
     # Test: soft_delete sets flags correctly
@@ -153,6 +308,139 @@ class SoftDeleteMixinTests(TransactionTestCase):
         self.assertIn(active, queryset)
         self.assertIn(deleted, queryset)
 
+    # Test: queryset soft_delete and restore each run as one UPDATE
+    def test_queryset_soft_delete_and_restore(self):
+        for name in ["A", "B", "C"]:
+            TestSoftDeleteModel.objects.create(name=name)
+
+        with self.assertNumQueries(1):
+            updated = TestSoftDeleteModel.objects.filter(
+                name__in=["A", "B"]
+            ).soft_delete()
+        self.assertEqual(updated, 2)
+        self.assertEqual(TestSoftDeleteModel.objects.get().name, "C")
+        self.assertTrue(
+            all(
+                obj.deleted_at
+                for obj in TestSoftDeleteModel.all_objects.filter(is_deleted=True)
+            )
+        )
+
+        with self.assertNumQueries(1):
+            restored = TestSoftDeleteModel.all_objects.filter(name="A").restore()
+        self.assertEqual(restored, 1)
+        self.assertEqual(TestSoftDeleteModel.objects.count(), 2)
+
+    # Test: hard_delete removes rows permanently
+    def test_queryset_hard_delete(self):
+        TestSoftDeleteModel.objects.create(name="A")
+        TestSoftDeleteModel.all_objects.filter(name="A").hard_delete()
+        self.assertFalse(TestSoftDeleteModel.all_objects.exists())
+
+    # Test: a partial index over live rows replaces the is_deleted index
+    def test_live_partial_index(self):
+        index = TestSoftDeleteModel._meta.indexes[-1]
+        self.assertTrue(index.name.endswith("_live"))
+        self.assertEqual(index.condition, Q(is_deleted=False))
+
+        table = TestSoftDeleteModel._meta.db_table
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, table)
+        self.assertIn(index.name, constraints)
+        self.assertNotIn(
+            ["is_deleted"],
+            [constraint["columns"] for constraint in constraints.values()],
+        )
+
+
+class SoftDeleteArchiveTests(TransactionTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with connection.schema_editor() as schema_editor:
+            schema_editor.create_model(TestSoftDeleteModel)
+            schema_editor.create_model(TestSoftDeleteChild)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as schema_editor:
+            schema_editor.delete_model(TestSoftDeleteChild)
+            schema_editor.delete_model(TestSoftDeleteModel)
+
+    def _create_deleted(self, names, days_ago):
+        for name in names:
+            TestSoftDeleteModel.objects.create(name=name)
+        TestSoftDeleteModel.objects.filter(name__in=names).update(
+            is_deleted=True, deleted_at=timezone.now() - timedelta(days=days_ago)
+        )
+
+    # Test: expired rows move to the archive in batches, recent ones stay
+    def test_archive_moves_expired_rows(self):
+        self._create_deleted(["Old 1", "Old 2", "Old 3"], days_ago=120)
+        self._create_deleted(["Recent"], days_ago=5)
+        TestSoftDeleteModel.objects.create(name="Live")
+
+        result = archive_model(TestSoftDeleteModel, batch_size=2, throttle=0)
+        self.assertEqual(result, {"eligible": 3, "archived": 3, "skipped": 0})
+        self.assertEqual(
+            sorted(TestSoftDeleteModel.all_objects.values_list("name", flat=True)),
+            ["Live", "Recent"],
+        )
+
+        # Archived rows are still readable through all_objects
+        archived = list(TestSoftDeleteModel.all_objects.archived().instances())
+        self.assertEqual(
+            sorted(obj.name for obj in archived), ["Old 1", "Old 2", "Old 3"]
+        )
+        self.assertTrue(all(obj.is_deleted and obj.deleted_at for obj in archived))
+
+    # Test: rows with cascading or nullable dependents are skipped, not lost
+    def test_archive_skips_rows_with_dependents(self):
+        self._create_deleted(["Parent", "Linked", "Alone"], days_ago=120)
+        parent = TestSoftDeleteModel.all_objects.get(name="Parent")
+        linked = TestSoftDeleteModel.all_objects.get(name="Linked")
+        TestSoftDeleteChild.objects.create(parent=parent)
+        TestSoftDeleteChild.objects.create(linked=linked)
+
+        result = archive_model(TestSoftDeleteModel, throttle=0)
+        self.assertEqual(result, {"eligible": 3, "archived": 1, "skipped": 2})
+        self.assertEqual(
+            sorted(TestSoftDeleteModel.all_objects.values_list("name", flat=True)),
+            ["Linked", "Parent"],
+        )
+        self.assertEqual(TestSoftDeleteChild.objects.filter(parent=parent).count(), 1)
+        self.assertEqual(TestSoftDeleteChild.objects.filter(linked=linked).count(), 1)
+        self.assertEqual(
+            [
+                obj.name
+                for obj in TestSoftDeleteModel.all_objects.archived().instances()
+            ],
+            ["Alone"],
+        )
+
+    # Test: purge_soft_deleted --dry-run reports without changing anything
+    def test_purge_dry_run(self):
+        self._create_deleted(["Old"], days_ago=120)
+        stdout = StringIO()
+        call_command("purge_soft_deleted", "--dry-run", stdout=stdout)
+
+        self.assertIn(
+            "common.TestSoftDeleteModel: 1 rows would be archived", stdout.getvalue()
+        )
+        self.assertEqual(TestSoftDeleteModel.all_objects.count(), 1)
+        self.assertFalse(TestSoftDeleteModel.all_objects.archived().exists())
+
+    # Test: an archived instance can be saved back into the table
+    def test_restore_archived_instance(self):
+        self._create_deleted(["Old"], days_ago=120)
+        archive_model(TestSoftDeleteModel, throttle=0)
+
+        obj = next(TestSoftDeleteModel.all_objects.archived().instances())
+        obj.save()
+        TestSoftDeleteModel.all_objects.filter(pk=obj.pk).restore()
+        self.assertEqual(TestSoftDeleteModel.objects.get().name, "Old")
+
 
 class ActiveMixinTests(TransactionTestCase):
     @classmethod
@@ -186,10 +474,18 @@ class OrderingMixinTests(TransactionTestCase):
         with connection.schema_editor() as schema_editor:
             schema_editor.delete_model(TestOrderingModel)
 
-    # Test: order defaults to 0
+    # Test: New rows are placed last with gapped keys
     def test_order_default(self):
-        obj = TestOrderingModel.objects.create(name="Test")
-        self.assertEqual(obj.order, 0)
+        first = TestOrderingModel.objects.create(name="First")
+        second = TestOrderingModel.objects.create(name="Second")
+        self.assertEqual(first.order, ORDER_GAP)
+        self.assertEqual(second.order, 2 * ORDER_GAP)
+
+    # Test: An explicit order is kept
+    def test_explicit_order_kept(self):
+        TestOrderingModel.objects.create(name="First")
+        obj = TestOrderingModel.objects.create(name="Second", order=5)
+        self.assertEqual(obj.order, 5)
 
     # Test: objects sort by order field
     def test_ordering(self):
@@ -0,0 +1,167 @@
+import logging
+import warnings
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.common.paginators import CURSOR_VAR, KeysetPaginator
+from apps.users.admin import UserAdmin
+
+User = get_user_model()
+
+# Disable all logging during tests
+logging.disable(logging.CRITICAL)
+
+# Suppress staticfiles warning during tests
+warnings.filterwarnings(
+    "ignore",
+    message="No directory at.*staticfiles",
+    category=UserWarning,
+)
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Pairs of users share a join date to exercise the id tie-breaker
+        now = timezone.now()
+        User.objects.bulk_create(
+            User(
+                username=f"user{i}",
+                email=f"user{i}@example.com",
+                date_joined=now - timedelta(days=i // 2),
+            )
+            for i in range(23)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.queryset = User.objects.order_by("-date_joined", "-pk")
+
+    def _pages(self, paginator):
+        return [
+            [user.pk for user in paginator.page(number).object_list]
+            for number in paginator.page_range
+        ]
+
+    # Test: Keyset pages match offset pages exactly
+    def test_pages_match_offset_pagination(self):
+        expected = [
+            [user.pk for user in self.queryset[start : start + 5]]
+            for start in range(0, 23, 5)
+        ]
+        self.assertEqual(self._pages(KeysetPaginator(self.queryset, 5)), expected)
+
+    def _cursor_pages(self, queryset, per_page):
+        # Follow "next" cursors from the first page to the last
+        pages, cursor = [], None
+        for number in KeysetPaginator(queryset, per_page).page_range:
+            paginator = KeysetPaginator(queryset, per_page, cursor=cursor)
+            rows = list(paginator.page(number).object_list)
+            pages.append([user.pk for user in rows])
+            cursor = paginator.cursor_after(number, rows)
+        return pages
+
+    # Test: Pages reached by cursor match offset pages and need no OFFSET
+    def test_cursor_pages_match_offset_pagination(self):
+        paginator = KeysetPaginator(self.queryset, 5)
+        self.assertEqual(self._cursor_pages(self.queryset, 5), self._pages(paginator))
+
+        cursor = paginator.cursor_after(1, paginator.page(1).object_list)
+        with CaptureQueriesContext(connection) as queries:
+            list(KeysetPaginator(self.queryset, 5, cursor=cursor).page(2).object_list)
+        self.assertNotIn("OFFSET", queries.captured_queries[-1]["sql"])
+
+    # Test: Rows added before the cursor don't shift the next page
+    def test_cursor_survives_inserts(self):
+        paginator = KeysetPaginator(self.queryset, 5)
+        first = list(paginator.page(1).object_list)
+        second = [user.pk for user in paginator.page(2).object_list]
+        cursor = paginator.cursor_after(1, first)
+
+        User.objects.create(username="newest", email="newest@example.com")
+        page = KeysetPaginator(self.queryset, 5, cursor=cursor).page(2)
+        self.assertEqual([user.pk for user in page.object_list], second)
+
+    # Test: Malformed cursors and cursors for another page fall back to offsets
+    def test_invalid_cursor_falls_back(self):
+        paginator = KeysetPaginator(self.queryset, 5)
+        expected = [user.pk for user in paginator.page(3).object_list]
+        cursor = paginator.cursor_after(1, paginator.page(1).object_list)
+        for value in (cursor, "not-a-cursor", "W10"):
+            page = KeysetPaginator(self.queryset, 5, cursor=value).page(3)
+            self.assertEqual([user.pk for user in page.object_list], expected)
+
+    # Test: Mixed ascending and descending keys are supported
+    def test_mixed_direction_ordering(self):
+        queryset = User.objects.order_by("date_joined", "-pk")
+        expected = [
+            [user.pk for user in queryset[start : start + 4]]
+            for start in range(0, 23, 4)
+        ]
+        self.assertEqual(self._pages(KeysetPaginator(queryset, 4)), expected)
+
+    # Test: Orderings without a unique trailing key fall back to offsets
+    def test_non_unique_ordering_falls_back(self):
+        paginator = KeysetPaginator(User.objects.order_by("-date_joined"), 5)
+        self.assertIsNone(paginator._keyset_fields())
+        self.assertEqual(len(paginator.page(2).object_list), 5)
+
+    # Test: Exact counts are used below the estimate threshold
+    def test_exact_count_for_small_tables(self):
+        self.assertEqual(KeysetPaginator(self.queryset, 5).count, 23)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class KeysetChangelistTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    # Test: User changelist pages through the keyset paginator
+    def test_user_changelist_uses_keyset_paginator(self):
+        admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="admin123"
+        )
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse("admin:users_user_changelist"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.context["cl"].paginator, KeysetPaginator)
+
+    # Test: The next page link carries a cursor the changelist accepts
+    @mock.patch.object(UserAdmin, "list_per_page", 2)
+    def test_next_page_link_carries_cursor(self):
+        admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="admin123"
+        )
+        for i in range(4):
+            User.objects.create_user(username=f"user{i}", email=f"user{i}@example.com")
+        self.client.force_login(admin)
+        url = reverse("admin:users_user_changelist")
+
+        changelist = self.client.get(url).context["cl"]
+        next_link = changelist.get_query_string({"p": 2})
+        self.assertIn(f"{CURSOR_VAR}=", next_link)
+        self.assertNotIn(CURSOR_VAR, changelist.get_query_string({"p": 3}))
+
+        response = self.client.get(url + next_link)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.context["cl"].paginator.cursor)
+        self.assertEqual(
+            [user.pk for user in response.context["cl"].result_list],
+            list(
+                User.objects.order_by("-date_joined", "-pk").values_list(
+                    "pk", flat=True
+                )[2:4]
+            ),
+        )
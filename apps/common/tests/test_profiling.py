@@ -0,0 +1,145 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.template import Context, Engine
+from django.template.base import Template
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from apps.common import profiling
+from apps.common.middleware import TemplateProfilerMiddleware
+
+User = get_user_model()
+
+TEMPLATES = {
+    "page.html": "{% extends 'layout.html' %}{% block body %}"
+    "{% include 'item.html' %}{% include 'item.html' %}{% endblock %}",
+    "layout.html": "<main>{% block body %}{% endblock %}</main>",
+    "item.html": "<p>item</p>",
+}
+
+
+class RenderProfileTests(SimpleTestCase):
+    # Test: Nested render time is subtracted from the outer template only
+    def test_inclusive_and_exclusive(self):
+        profile = profiling.RenderProfile()
+        profile.enter("page.html")
+        profile.enter("item.html")
+        profile.exit(0.2)
+        profile.enter("item.html")
+        profile.exit(0.3)
+        profile.exit(1.0)
+
+        inclusive, exclusive, count = profile.stats["page.html"]
+        self.assertEqual((inclusive, count), (1.0, 1))
+        self.assertAlmostEqual(exclusive, 0.5)
+        self.assertAlmostEqual(profile.stats["item.html"][0], 0.5)
+        self.assertEqual(profile.stats["item.html"][2], 2)
+        self.assertEqual(profile.total, 1.0)
+
+    # Test: A template nested in itself is not double counted
+    def test_recursive_template(self):
+        profile = profiling.RenderProfile()
+        profile.enter("tree.html")
+        profile.enter("tree.html")
+        profile.exit(0.4)
+        profile.exit(1.0)
+
+        inclusive, exclusive, count = profile.stats["tree.html"]
+        self.assertEqual((inclusive, count), (1.0, 2))
+        self.assertAlmostEqual(exclusive, 1.0)
+
+    # Test: Extends and includes are timed under their template names
+    def test_engine_renders_collected(self):
+        engine = Engine(loaders=[("django.template.loaders.locmem.Loader", TEMPLATES)])
+        template = engine.get_template("page.html")
+        with mock.patch.object(
+            Template, "_render", profiling.profiled(Template._render)
+        ):
+            with profiling.collect_renders() as profile:
+                html = template.render(Context())
+            self.assertEqual(template.render(Context()), html)
+
+        self.assertEqual(html, "<main><p>item</p><p>item</p></main>")
+        self.assertEqual(
+            {name: stats[2] for name, stats in profile.stats.items()},
+            {"page.html": 1, "layout.html": 1, "item.html": 2},
+        )
+        self.assertEqual(profile.stats["page.html"][0], profile.total)
+
+    # Test: Percentiles use the nearest rank
+    def test_summarize(self):
+        samples = [f"{ms} {ms / 2} 2" for ms in range(1, 101)]
+        summary = profiling.summarize("page.html", samples)
+
+        self.assertEqual(summary["requests"], 100)
+        self.assertEqual(summary["renders_per_request"], 2)
+        self.assertEqual(summary["inclusive_p50"], 50)
+        self.assertEqual(summary["inclusive_p99"], 99)
+        self.assertEqual(summary["exclusive_p95"], 47.5)
+        self.assertIsNone(profiling.percentile([], 50))
+
+    # Test: Requests that render slowly log the templates that dominated
+    @override_settings(TEMPLATE_PROFILING_SLOW_MS=100)
+    def test_slow_render_logged(self):
+        profile = profiling.RenderProfile()
+        profile.enter("page.html")
+        profile.enter("item.html")
+        profile.exit(0.08)
+        profile.exit(0.15)
+
+        with mock.patch.object(profiling.logger, "warning") as warning:
+            profiling.record_profile("/", profile)
+            profile.total = 0.05
+            profiling.record_profile("/", profile)
+
+        warning.assert_called_once()
+        templates = warning.call_args.kwargs["extra"]["templates"]
+        self.assertEqual(templates[0]["template"], "item.html")
+        self.assertEqual(templates[0]["exclusive_ms"], 80.0)
+
+
+class TemplateProfilerMiddlewareTests(TestCase):
+    # Test: The middleware drops out unless profiling is enabled
+    @override_settings(TEMPLATE_PROFILING=False)
+    def test_opt_in(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            TemplateProfilerMiddleware(lambda request: HttpResponse())
+
+    # Test: Each request's renders are recorded once it completes
+    @override_settings(TEMPLATE_PROFILING=True)
+    def test_request_recorded(self):
+        engine = Engine(loaders=[("django.template.loaders.locmem.Loader", TEMPLATES)])
+
+        def view(request):
+            return HttpResponse(engine.get_template("page.html").render(Context()))
+
+        with (
+            mock.patch.object(Template, "_render", Template._render),
+            mock.patch.object(profiling, "record_profile") as record,
+        ):
+            middleware = TemplateProfilerMiddleware(view)
+            middleware(RequestFactory().get("/dashboard/"))
+
+        path, profile = record.call_args.args
+        self.assertEqual(path, "/dashboard/")
+        self.assertEqual(profile.stats["item.html"][2], 2)
+
+    # Test: The admin report is limited to superusers
+    def test_admin_page(self):
+        url = reverse("admin:template_profile")
+        staff = User.objects.create_user(
+            username="staff", email="staff@example.com", is_staff=True
+        )
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass12345"
+        )
+        self.client.force_login(admin)
+        response = self.client.get(url)
+        self.assertContains(response, "Template profiling is off")
+        self.assertContains(response, "not available")
@@ -1,9 +1,13 @@
 from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
 
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.db import connection, models
 from django.test import TestCase, TransactionTestCase
 
+from apps.common.column_validators import validate_column, validate_columns
 from apps.common.validators import (
     age_at_least,
     date_not_in_future,
@@ -17,6 +21,7 @@ from apps.common.validators import (
     username_validator,
     uuid_validator,
     validate_unique_field,
+    validate_unique_values,
 )
 
 # ------------------------------------
@@ -69,6 +74,42 @@ class UniqueFieldValidatorTests(TransactionTestCase):
             TestUniqueModel, "email", "test@example.com", instance=obj
         )
 
+    # Test: batch validation resolves all values with chunked lookups
+    def test_validate_unique_values_chunks_queries(self):
+        TestUniqueModel.objects.create(email="user3@example.com")
+        emails = [f"user{i}@example.com" for i in range(10)]
+
+        with self.assertNumQueries(3):
+            errors = validate_unique_values(
+                TestUniqueModel, "email", emails, chunk_size=4
+            )
+        self.assertEqual(list(errors), [3])
+
+    # Test: batch errors match the single-value validator's message and code
+    def test_validate_unique_values_matches_single_validator(self):
+        TestUniqueModel.objects.create(email="test@example.com")
+        errors = validate_unique_values(TestUniqueModel, "email", ["test@example.com"])
+        with self.assertRaises(ValidationError) as single:
+            validate_unique_field(TestUniqueModel, "email", "test@example.com")
+
+        self.assertEqual(errors[0].messages, single.exception.messages)
+        self.assertEqual(errors[0].code, single.exception.code)
+
+    # Test: repeats within the batch fail after their first occurrence
+    def test_validate_unique_values_in_batch_duplicates(self):
+        errors = validate_unique_values(
+            TestUniqueModel, "email", ["a@example.com", "", "a@example.com", None]
+        )
+        self.assertEqual(list(errors), [2])
+
+    # Test: excluded rows don't count as conflicts
+    def test_validate_unique_values_exclude_pks(self):
+        obj = TestUniqueModel.objects.create(email="test@example.com")
+        errors = validate_unique_values(
+            TestUniqueModel, "email", ["test@example.com"], exclude_pks=[obj.pk]
+        )
+        self.assertEqual(errors, {})
+
 
 class RegexValidatorTests(TestCase):
     # Test: Accept valid slug
@@ -213,3 +254,88 @@ class DateValidatorTests(TestCase):
             ValidationError, msg="Underage birthdate should be rejected"
         ):
             validate_18(bday)
+
+
+class ColumnValidatorTests(TestCase):
+    # Same failures, messages and codes as calling the validator per value
+    def assertMatchesPerValue(self, values, validator):
+        errors = validate_column(values, validator)
+        expected = {}
+        for index, value in enumerate(values):
+            try:
+                validator(value)
+            except ValidationError as error:
+                expected[index] = error
+        self.assertEqual(errors.keys(), expected.keys())
+        for index, error in expected.items():
+            self.assertEqual(errors[index][0].messages, error.messages)
+            self.assertEqual(errors[index][0].code, error.code)
+
+    # Test: Regex validators report the same rows as the per-value path
+    def test_regex_validators(self):
+        self.assertMatchesPerValue(
+            ["Juan", "R2-D2", "María dela Cruz", "R2-D2"], human_name_validator
+        )
+        self.assertMatchesPerValue(["juan.cruz", "ju", "juan cruz"], username_validator)
+        self.assertMatchesPerValue(["team-alpha", "Team", "a--b"], slug_validator)
+        self.assertMatchesPerValue(["SKU-001", "sku-001", "AB"], sku_code_validator)
+
+    # Test: Date validators compare against a single reference date
+    def test_date_validators(self):
+        today = date.today()
+        dates = [today - timedelta(days=1), today, today + timedelta(days=1)]
+        self.assertMatchesPerValue(dates, date_not_in_past)
+        self.assertMatchesPerValue(dates, date_not_in_future)
+
+        birthdays = [
+            today.replace(year=today.year - 18),
+            today.replace(year=today.year - 18) + timedelta(days=1),
+            today.replace(year=today.year - 40),
+        ]
+        self.assertMatchesPerValue(birthdays, age_at_least(18))
+
+    # Test: Leap day birthdays use the same cutoff as the per-value path
+    def test_age_at_least_leap_day(self):
+        validator = age_at_least(18)
+        with mock.patch("apps.common.column_validators.date") as column_date:
+            column_date.today.return_value = date(2028, 2, 29)
+            errors = validate_column([date(2010, 2, 28), date(2010, 3, 1)], validator)
+        self.assertEqual(list(errors), [1])
+
+    # Test: Empty cells are skipped and other validators still run
+    def test_empty_values_and_fallback(self):
+        def even(value):
+            if value % 2:
+                raise ValidationError("Must be even.", code="odd")
+
+        errors = validate_column([None, "", 2, 3], even)
+        self.assertEqual(list(errors), [3])
+        self.assertEqual(errors[3][0].code, "odd")
+
+    # Test: Good values never construct or raise an error
+    def test_no_errors_for_good_values(self):
+        with mock.patch(
+            "apps.common.column_validators.ValidationError"
+        ) as validation_error:
+            self.assertEqual(validate_column(["Juan"] * 100, human_name_validator), {})
+        validation_error.assert_not_called()
+
+    # Test: Several columns collect errors per row and field
+    def test_validate_columns(self):
+        errors = validate_columns(
+            {"first_name": ["Juan", "R2"], "username": ["x", "juan"]},
+            {
+                "first_name": [human_name_validator],
+                "username": [username_validator],
+            },
+        )
+        self.assertEqual(list(errors), [0, 1])
+        self.assertEqual(list(errors[0]), ["username"])
+        self.assertEqual(list(errors[1]), ["first_name"])
+
+    # Test: The benchmark command agrees with the per-value path
+    def test_benchmark_command(self):
+        out, err = StringIO(), StringIO()
+        call_command("benchmark_validators", rows=500, stdout=out, stderr=err)
+        self.assertIn("age_at_least(18)", out.getvalue())
+        self.assertEqual(err.getvalue(), "")
@@ -0,0 +1,105 @@
+from django import forms
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from apps.common import widgets
+from apps.common.widgets import (
+    EmailInputWidget,
+    PasswordInputWidget,
+    SelectWidget,
+    TextInputWidget,
+    render_input_attrs,
+)
+
+# ------------------------------------
+# Test Forms
+# ------------------------------------
+
+
+class ContactForm(forms.Form):
+    name = forms.CharField(
+        label="Name",
+        help_text="As shown on your ID",
+        widget=TextInputWidget(attrs={"placeholder": 'e.g. "Juan"'}),
+    )
+    email = forms.EmailField(
+        label="Email", widget=EmailInputWidget(attrs={"autocomplete": "email"})
+    )
+    password = forms.CharField(
+        label="Password", help_text="Hidden", widget=PasswordInputWidget()
+    )
+    team = forms.ChoiceField(
+        label="Team",
+        required=False,
+        choices=[("sales", "Sales"), ("support", "Support")],
+        widget=SelectWidget(),
+    )
+
+
+def render(template_string, **context):
+    return engines["django"].from_string(template_string).render(context)
+
+
+# ------------------------------------
+# Test Cases
+# ------------------------------------
+
+
+class FormFieldTagTests(SimpleTestCase):
+    def setUp(self):
+        widgets._component_templates.clear()
+
+    # Test: Values come from the bound field, with static attributes pre-rendered
+    def test_renders_bound_field(self):
+        form = ContactForm({"name": "Juan", "email": "bad"})
+        form.is_valid()
+        html = render("{% load form_tags %}{% form_field form.name %}", form=form)
+
+        self.assertIn('name="name"', html)
+        self.assertIn('id="id_name"', html)
+        self.assertIn('value="Juan"', html)
+        self.assertIn('placeholder="e.g. &quot;Juan&quot;"', html)
+        self.assertIn("As shown on your ID", html)
+
+        html = render("{% load form_tags %}{% form_field form.email %}", form=form)
+        self.assertIn('type="email"', html)
+        self.assertIn('autocomplete="email"', html)
+        self.assertIn("Enter a valid email address.", html)
+
+    # Test: Keyword arguments override field values and add attributes
+    def test_overrides(self):
+        form = ContactForm({"email": "bad"})
+        form.is_valid()
+        html = render(
+            "{% load form_tags %}{% form_field form.email error_message=None tabindex='1' %}",
+            form=form,
+        )
+        self.assertIn('tabindex="1"', html)
+        self.assertNotIn("Enter a valid email address.", html)
+
+    # Test: Password fields never echo values or field help text
+    def test_password_field(self):
+        form = ContactForm({"password": "secret"})
+        html = render("{% load form_tags %}{% form_field form.password %}", form=form)
+        self.assertNotIn("secret", html)
+        self.assertNotIn("Hidden", html)
+
+    # Test: Select options are built with the current value selected
+    def test_select_options(self):
+        form = ContactForm({"team": "support"})
+        html = render("{% load form_tags %}{% form_field form.team %}", form=form)
+        self.assertIn('<option value="support" selected>Support</option>', html)
+        self.assertIn('<option value="sales">Sales</option>', html)
+
+    # Test: Component templates are compiled once per process outside DEBUG
+    @override_settings(DEBUG=False)
+    def test_template_cached(self):
+        widget = TextInputWidget()
+        self.assertIs(widget.get_component_template(), widget.get_component_template())
+        self.assertIn("forms/text_input.html", widgets._component_templates)
+
+    # Test: Identical attribute sets share one pre-rendered string
+    def test_input_attrs_cached(self):
+        items = (("placeholder", "Name"), ("autofocus", True))
+        self.assertIs(render_input_attrs(items), render_input_attrs(items))
+        self.assertEqual(render_input_attrs(items), ' placeholder="Name" autofocus')
@@ -1,4 +1,5 @@
 from datetime import date
+from itertools import batched
 
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
@@ -79,6 +80,48 @@ def validate_unique_field(model, field_name, value, instance=None, error_message
         raise ValidationError(error_message, code=f"unique_{field_name}")
 
 
+# Largest IN (...) list sent per query by validate_unique_values.
+UNIQUE_LOOKUP_CHUNK_SIZE = 500
+
+
+# Checks a batch of values for uniqueness, returning {index: ValidationError}.
+# Rows in exclude_pks (e.g. the ones being updated) are ignored, and repeats
+# within the batch fail after their first occurrence.
+def validate_unique_values(
+    model,
+    field_name,
+    values,
+    exclude_pks=None,
+    error_message=None,
+    chunk_size=UNIQUE_LOOKUP_CHUNK_SIZE,
+):
+    values = list(values)
+    if error_message is None:
+        error_message = f"A {model.__name__} with this {field_name} already exists."
+
+    query = model.objects.all()
+    if exclude_pks:
+        query = query.exclude(pk__in=exclude_pks)
+
+    existing = set()
+    for chunk in batched({value for value in values if value}, chunk_size):
+        existing.update(
+            query.filter(**{f"{field_name}__in": chunk}).values_list(
+                field_name, flat=True
+            )
+        )
+
+    errors = {}
+    seen = set()
+    for index, value in enumerate(values):
+        if not value:
+            continue
+        if value in existing or value in seen:
+            errors[index] = ValidationError(error_message, code=f"unique_{field_name}")
+        seen.add(value)
+    return errors
+
+
 # Ensures uploaded files do not exceed the given size in megabytes.
 def file_size_validator(max_mb: int):
     def _validator(f):
@@ -132,4 +175,6 @@ def age_at_least(min_years: int):
                 _(f"Must be at least {min_years} years old."), code="min_age"
             )
 
+    # Lets column validation compare against a single cutoff date
+    _validator.min_years = min_years
     return _validator
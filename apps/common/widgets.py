@@ -1,7 +1,39 @@
+from functools import lru_cache
+
+from django.conf import settings
 from django.forms import widgets
+from django.forms.utils import flatatt
+from django.template.loader import get_template
+from django.utils.html import format_html_join
+
+# Optional <input> attributes, output by the component templates as one
+# pre-rendered string
+INPUT_ATTRS = [
+    "placeholder",
+    "tabindex",
+    "maxlength",
+    "inputmode",
+    "pattern",
+    "autocomplete",
+    "autofocus",
+]
+
+# Component templates compiled once per process; DEBUG leaves them to the
+# template loaders so edits show up without a restart
+_component_templates = {}
+
+
+@lru_cache(maxsize=512)
+def render_input_attrs(items):
+    # Widget attributes are fixed per form field, so each distinct set is
+    # escaped and joined once
+    return flatatt(dict(items))
 
 
 class BaseFormWidget:
+    # Whether the component shows the form field's help text
+    show_field_help_text = True
+
     def get_context(self, name, value, attrs):
         context = super().get_context(name, value, attrs)
 
@@ -15,6 +47,46 @@ class BaseFormWidget:
 
         return context
 
+    def get_component_template(self):
+        template = _component_templates.get(self.template_name)
+        if template is None:
+            template = get_template(self.template_name)
+            if not settings.DEBUG:
+                _component_templates[self.template_name] = template
+        return template
+
+    def get_component_context(self, field, **overrides):
+        # Everything the component template needs for a bound field, resolved
+        # here instead of through a dozen include arguments
+        attrs = {
+            key: value
+            for key in INPUT_ATTRS
+            if (value := overrides.pop(key, self.attrs.get(key))) not in (None, "")
+        }
+        errors = field.errors
+        disabled = field.field.disabled
+
+        context = {
+            "label": field.label,
+            "name": field.html_name,
+            "id": field.id_for_label,
+            "type": getattr(self, "input_type", None),
+            "value": field.value() if getattr(self, "render_value", True) else None,
+            "required": field.field.required and not disabled,
+            "disabled": disabled,
+            "has_error": bool(errors),
+            "error_message": errors[0] if errors else "",
+            "help_text": field.help_text if self.show_field_help_text else "",
+            "input_attrs": render_input_attrs(tuple(attrs.items())),
+            **attrs,
+        }
+        context.update(overrides)
+        return context
+
+    def render_component(self, field, **overrides):
+        context = self.get_component_context(field, **overrides)
+        return self.get_component_template().render(context)
+
 
 class TextInputWidget(BaseFormWidget, widgets.TextInput):
     template_name = "forms/text_input.html"
@@ -23,6 +95,10 @@ class TextInputWidget(BaseFormWidget, widgets.TextInput):
 class PasswordInputWidget(BaseFormWidget, widgets.PasswordInput):
     template_name = "forms/password_input.html"
 
+    # allauth's password help texts (validator lists, reset links) are
+    # presented by the pages themselves
+    show_field_help_text = False
+
 
 class EmailInputWidget(BaseFormWidget, widgets.EmailInput):
     template_name = "forms/text_input.html"
@@ -48,3 +124,23 @@ class SelectWidget(BaseFormWidget, widgets.Select):
         context["show_empty"] = attrs.pop("show_empty", True)
         context["empty_label"] = attrs.pop("empty_label", "Select Option")
         return context
+
+    def get_component_context(self, field, **overrides):
+        context = super().get_component_context(field, **overrides)
+
+        # Options are built in Python rather than looped over in the template
+        value = self.format_value(field.value())
+        context["options"] = format_html_join(
+            "",
+            '<option value="{}"{}>{}</option>',
+            (
+                (
+                    option["value"],
+                    " selected" if option["selected"] else "",
+                    option["label"],
+                )
+                for _, options, _ in self.optgroups(field.html_name, value)
+                for option in options
+            ),
+        )
+        return context
@@ -0,0 +1,33 @@
+from allauth.account.adapter import DefaultAccountAdapter
+from django.core.exceptions import PermissionDenied
+
+from apps.security import lockout
+from apps.security.client_ip import get_client_ip
+from apps.security.profile_gate import profile_destination
+
+
+class AccountAdapter(DefaultAccountAdapter):
+    def get_client_ip(self, request):
+        # allauth's rate limits key on the same resolved address as auditing
+        ip = get_client_ip(request)
+        if not ip:
+            raise PermissionDenied("Unable to determine client IP address")
+        return ip
+
+    def get_login_redirect_url(self, request):
+        # Straight to the page the profile gate would end up at, skipping the
+        # hop through LOGIN_REDIRECT_URL
+        return profile_destination(request)
+
+    def pre_authenticate(self, request, **credentials):
+        # The lockout tracker replaces allauth's login_failed limit, which
+        # still applies whenever the tracker is unavailable
+        self._login_failed_rl_usage = None
+        retry_after = lockout.locked_for(
+            get_client_ip(request),
+            credentials.get("email") or credentials.get("username"),
+        )
+        if retry_after is None:
+            return super().pre_authenticate(request, **credentials)
+        if retry_after:
+            raise self.validation_error("too_many_login_attempts")
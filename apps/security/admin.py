@@ -2,6 +2,9 @@ from django.contrib import admin
 from django.contrib.sites.models import Site
 from unfold.admin import ModelAdmin
 
+from apps.common.admin import KeysetPaginationAdminMixin
+from apps.security.models import LoginEvent
+
 # Unregister the default Site model admin
 admin.site.unregister(Site)
 
@@ -19,3 +22,31 @@ class SiteAdmin(ModelAdmin):
         "name",
         "domain",
     )
+
+
+# Login Event Model
+@admin.register(LoginEvent)
+class LoginEventAdmin(KeysetPaginationAdminMixin, ModelAdmin):
+    list_display = ["created_at", "outcome", "identifier", "user", "ip", "country"]
+    list_filter = ["outcome", ("created_at", admin.DateFieldListFilter)]
+    list_select_related = ["user"]
+    search_fields = ["=ip", "=asn", "identifier"]
+    ordering = ["-created_at"]
+    date_hierarchy = "created_at"
+    readonly_fields = [
+        "created_at",
+        "outcome",
+        "identifier",
+        "user",
+        "ip",
+        "country",
+        "asn",
+        "user_agent",
+    ]
+
+    # Events are written by the flush task only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
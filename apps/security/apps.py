@@ -8,3 +8,6 @@ class SecurityConfig(AppConfig):
     def ready(self):
         # Register signals
         import apps.security.signals
+        from apps.security.client_ip import check_geoip
+
+        check_geoip()
@@ -0,0 +1,147 @@
+import logging
+
+from allauth.account.auth_backends import AuthenticationBackend
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from apps.common.cache import CACHE_ERRORS
+from apps.security.permissions import get_group_permission_sets
+
+logger = logging.getLogger("apps.security")
+
+# Bump when the cached payload layout changes
+USER_CACHE_VERSION = 2
+
+# Seconds a cached user is served before it is reloaded from the database
+USER_CACHE_TIMEOUT = 300
+
+
+# Never cached; the cache is shared with the Celery broker. The session
+# verification hash derived from it is cached instead.
+UNCACHED_FIELDS = {"password"}
+
+# Backend paths stored in sessions signed in before the cached backends
+LEGACY_BACKENDS = {
+    "django.contrib.auth.backends.ModelBackend": (
+        "apps.security.backends.CachedModelBackend"
+    ),
+    "allauth.account.auth_backends.AuthenticationBackend": (
+        "apps.security.backends.CachedAuthenticationBackend"
+    ),
+}
+
+
+def user_cache_key(user_id):
+    return f"auth:user:v{USER_CACHE_VERSION}:{user_id}"
+
+
+def _cached_fields(model):
+    return [
+        field.attname
+        for field in model._meta.concrete_fields
+        if field.attname not in UNCACHED_FIELDS
+    ]
+
+
+def _serialize_user(user):
+    fields = _cached_fields(user)
+    return {
+        "db": user._state.db,
+        "fields": fields,
+        "values": [getattr(user, field) for field in fields],
+        "session_auth_hash": user.get_session_auth_hash(),
+        "group_ids": list(user.groups.values_list("pk", flat=True)),
+        "user_permissions": _user_permissions(user),
+    }
+
+
+def _user_permissions(user):
+    # Directly assigned permissions; superusers resolve all permissions live
+    if user.is_superuser:
+        return None
+    perms = user.user_permissions.values_list("content_type__app_label", "codename")
+    return {f"{app_label}.{codename}" for app_label, codename in perms.order_by()}
+
+
+def _deserialize_user(model, payload):
+    # The password stays deferred; it is loaded if anything reads it
+    user = model.from_db(payload["db"], payload["fields"], payload["values"])
+    session_auth_hash = payload["session_auth_hash"]
+    user.get_session_auth_hash = lambda: session_auth_hash
+    user._group_ids = payload["group_ids"]
+    if payload["user_permissions"] is not None:
+        # Picked up by ModelBackend.get_user_permissions()
+        user._user_perm_cache = payload["user_permissions"]
+    return user
+
+
+def get_cached_user(user_id):
+    model = get_user_model()
+    try:
+        payload = cache.get(user_cache_key(user_id))
+    except CACHE_ERRORS:
+        return None
+    if payload is None or payload.get("fields") != _cached_fields(model):
+        return None
+    return _deserialize_user(model, payload)
+
+
+def cache_user(user):
+    try:
+        cache.set(user_cache_key(user.pk), _serialize_user(user), USER_CACHE_TIMEOUT)
+    except CACHE_ERRORS:
+        logger.debug("User cache unavailable, skipping store for %s", user.pk)
+
+
+def invalidate_cached_users(user_ids):
+    keys = [user_cache_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    try:
+        cache.delete_many(keys)
+    except CACHE_ERRORS:
+        # Entries left behind expire after USER_CACHE_TIMEOUT
+        logger.warning("User cache unavailable, could not invalidate %s", user_ids)
+
+
+def get_group_ids(user):
+    # Group ids from the cached payload, or a single query when not cached
+    if not hasattr(user, "_group_ids"):
+        user._group_ids = list(user.groups.values_list("pk", flat=True))
+    return user._group_ids
+
+
+class CachedUserMixin:
+    # Serve request.user from the cache instead of a query per request
+    def get_user(self, user_id):
+        user = get_cached_user(user_id)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache_user(user)
+            return user
+        return user if self.user_can_authenticate(user) else None
+
+    def get_group_permissions(self, user_obj, obj=None):
+        # Union of the groups' precompiled permission sets
+        if (
+            not user_obj.is_active
+            or user_obj.is_anonymous
+            or obj is not None
+            or user_obj.is_superuser
+        ):
+            return super().get_group_permissions(user_obj, obj)
+
+        if not hasattr(user_obj, "_group_perm_cache"):
+            sets = get_group_permission_sets(get_group_ids(user_obj))
+            user_obj._group_perm_cache = set().union(*sets.values())
+        return user_obj._group_perm_cache
+
+
+class CachedModelBackend(CachedUserMixin, ModelBackend):
+    pass
+
+
+class CachedAuthenticationBackend(CachedUserMixin, AuthenticationBackend):
+    pass
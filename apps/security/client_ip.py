@@ -0,0 +1,121 @@
+import ipaddress
+import logging
+from functools import cache, lru_cache
+
+from django.conf import settings
+
+try:
+    import maxminddb
+except ImportError:  # Optional; addresses are simply not enriched without it
+    maxminddb = None
+
+logger = logging.getLogger("apps.security")
+
+# Addresses whose country and ASN are kept per process
+LOOKUP_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=8)
+def _networks(proxies):
+    return tuple(
+        ipaddress.ip_network(proxy.strip(), strict=False)
+        for proxy in proxies
+        if proxy.strip()
+    )
+
+
+def _parse(value):
+    try:
+        return ipaddress.ip_address((value or "").strip())
+    except ValueError:
+        return None
+
+
+def resolve_client_ip(remote_addr, forwarded_for=""):
+    # Walk X-Forwarded-For from the nearest hop back; the first address that
+    # isn't one of TRUSTED_PROXIES is the client. Entries left of it are
+    # client supplied and ignored.
+    networks = _networks(tuple(settings.TRUSTED_PROXIES))
+    client = _parse(remote_addr)
+    if client is None:
+        return None
+
+    hops = [hop for hop in (forwarded_for or "").split(",") if hop.strip()]
+    while hops and any(client in network for network in networks):
+        hop = _parse(hops.pop())
+        if hop is None:
+            break
+        client = hop
+    return str(client)
+
+
+def check_geoip():
+    # Configured databases are ignored without the reader; say so at startup
+    # rather than leaving login events silently unenriched
+    configured = settings.GEOIP_COUNTRY_DATABASE or settings.GEOIP_ASN_DATABASE
+    if configured and maxminddb is None:
+        logger.warning(
+            "GeoIP databases are configured but maxminddb is not installed; "
+            "login events will not record country or network"
+        )
+
+
+@cache
+def _open_database(path):
+    # Memory-mapped once per process; None when unset or unreadable
+    if not path or maxminddb is None:
+        return None
+    try:
+        return maxminddb.open_database(path, maxminddb.MODE_MMAP)
+    except (OSError, ValueError):
+        logger.warning("GeoIP database %s could not be opened", path)
+        return None
+
+
+def _get(database, ip):
+    if database is None:
+        return {}
+    try:
+        return database.get(ip) or {}
+    except ValueError:
+        return {}
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def _lookup(ip, country_path, asn_path):
+    country = _get(_open_database(country_path), ip)
+    asn = _get(_open_database(asn_path), ip)
+    return (
+        (country.get("country") or country.get("registered_country") or {}).get(
+            "iso_code", ""
+        ),
+        asn.get("autonomous_system_number"),
+        asn.get("autonomous_system_organization", ""),
+    )
+
+
+def lookup_ip(ip):
+    # Country code and autonomous system from the local MaxMind-format databases
+    country, asn, as_org = (
+        _lookup(ip, settings.GEOIP_COUNTRY_DATABASE, settings.GEOIP_ASN_DATABASE)
+        if ip
+        else ("", None, "")
+    )
+    return {"ip": ip, "country": country, "asn": asn, "as_org": as_org}
+
+
+def get_client(request):
+    # Client address and its enrichment, resolved once per request and
+    # shared by login auditing and rate limiting
+    if not hasattr(request, "_client"):
+        request._client = lookup_ip(
+            resolve_client_ip(
+                request.META.get("REMOTE_ADDR"),
+                request.META.get("HTTP_X_FORWARDED_FOR"),
+            )
+        )
+    return request._client
+
+
+def get_client_ip(request):
+    return get_client(request)["ip"]
@@ -0,0 +1,62 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+from apps.common.cache import CACHE_ERRORS
+from apps.common.fragments import NAVIGATION_VERSION_KEY
+from apps.security.backends import get_group_ids
+from apps.security.permissions import get_group_versions, group_version_key
+
+
+def _role(user):
+    if not user.is_authenticated:
+        return "anonymous"
+    if user.is_superuser:
+        return "superuser"
+    return "staff" if user.is_staff else "user"
+
+
+def _versions(group_ids):
+    # Navigation and group versions in one round trip
+    keys = [NAVIGATION_VERSION_KEY, *(group_version_key(pk) for pk in group_ids)]
+    found = cache.get_many(keys)
+
+    missing = [pk for pk in group_ids if group_version_key(pk) not in found]
+    if missing:
+        for pk, version in get_group_versions(missing).items():
+            found[group_version_key(pk)] = version
+
+    if NAVIGATION_VERSION_KEY not in found:
+        cache.add(NAVIGATION_VERSION_KEY, time.time_ns(), None)
+        found[NAVIGATION_VERSION_KEY] = cache.get(NAVIGATION_VERSION_KEY)
+    return [found.get(key) for key in keys]
+
+
+def _role_signature(user):
+    role = _role(user)
+    group_ids = []
+    direct = []
+    if role in ("staff", "user"):
+        # Superusers pass every check, so only other roles vary by grants
+        group_ids = sorted(get_group_ids(user))
+        direct = sorted(user.get_user_permissions())
+
+    try:
+        versions = _versions(group_ids)
+    except CACHE_ERRORS:
+        return None
+
+    language = get_language() or ""
+    parts = [role, language, *map(str, versions), *map(str, group_ids), *direct]
+    digest = hashlib.blake2b("|".join(parts).encode(), digest_size=8).hexdigest()
+    return f"{role}:{language}:{digest}"
+
+
+def role_signature(request):
+    # Users who see the same navigation share a signature; computed once per
+    # request and None when Redis is unreachable (fragments are not cached)
+    if not hasattr(request, "_role_signature"):
+        request._role_signature = _role_signature(request.user)
+    return request._role_signature
@@ -0,0 +1,235 @@
+import ipaddress
+import logging
+import math
+import os
+import time
+
+from apps.common.cache import CACHE_ERRORS, get_redis_client
+
+logger = logging.getLogger("apps.security")
+
+KEY_PREFIX = "security:lockout"
+
+# Recently failing emails, IPs and subnets, scored by their last failure
+OFFENDERS_KEY = f"{KEY_PREFIX}:offenders"
+
+# Failures allowed per sliding window (seconds) before a lockout
+LOCKOUT_RULES = {
+    "email": (5, 15 * 60),
+    "ip": (20, 15 * 60),
+    "subnet": (100, 15 * 60),
+}
+
+# Prefix lengths grouping addresses into one subnet
+SUBNET_PREFIXES = {4: 24, 6: 64}
+
+# First lockout in seconds; doubles with each repeat offence up to the cap
+LOCKOUT_BASE = 60
+LOCKOUT_MAX = 24 * 60 * 60
+
+# Seconds repeat offences (and offenders) are remembered
+STRIKE_TTL = 24 * 60 * 60
+
+# Offenders listed in the admin
+OFFENDERS_LIMIT = 100
+
+# Longest remaining lock among KEYS, in milliseconds, and its 1-based index
+CHECK_SCRIPT = """
+local longest, culprit = 0, 0
+for i, key in ipairs(KEYS) do
+    local ttl = redis.call('pttl', key)
+    if ttl > longest then
+        longest, culprit = ttl, i
+    end
+end
+return {culprit, longest}
+"""
+
+# Count a failure in each window (KEYS: window, strikes, lock per dimension,
+# then the offenders index) and lock dimensions that reach their limit. Each
+# repeat offence doubles the lock; the window restarts once locked.
+RECORD_SCRIPT = """
+local now = tonumber(ARGV[1])
+local member = ARGV[2]
+local strike_ttl = tonumber(ARGV[3])
+local base = tonumber(ARGV[4])
+local cap = tonumber(ARGV[5])
+local offenders = KEYS[#KEYS]
+local result = {}
+for i = 0, (#KEYS - 1) / 3 - 1 do
+    local window, strikes, lock = KEYS[i * 3 + 1], KEYS[i * 3 + 2], KEYS[i * 3 + 3]
+    local limit = tonumber(ARGV[i * 3 + 6])
+    local span = tonumber(ARGV[i * 3 + 7])
+    redis.call('zremrangebyscore', window, '-inf', now - span)
+    redis.call('zadd', window, now, member)
+    redis.call('pexpire', window, span)
+    local count = redis.call('zcard', window)
+    local locked = 0
+    if count >= limit and redis.call('exists', lock) == 0 then
+        local strike = redis.call('incr', strikes)
+        redis.call('pexpire', strikes, strike_ttl)
+        locked = math.floor(math.min(base * 2 ^ (strike - 1), cap))
+        redis.call('set', lock, '1', 'PX', locked)
+        redis.call('del', window)
+    end
+    redis.call('zadd', offenders, now, ARGV[i * 3 + 8])
+    table.insert(result, count)
+    table.insert(result, locked)
+end
+redis.call('zremrangebyscore', offenders, '-inf', now - strike_ttl)
+redis.call('pexpire', offenders, strike_ttl)
+return result
+"""
+
+
+def _key(dimension, value, part):
+    return f"{KEY_PREFIX}:{dimension}:{value}:{part}"
+
+
+def subnet(ip):
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+    prefix = SUBNET_PREFIXES[address.version]
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+def dimensions(ip=None, email=None):
+    # (dimension, value) pairs an attempt is counted under
+    pairs = []
+    email = (email or "").strip().lower()
+    if email:
+        pairs.append(("email", email))
+    if ip and subnet(ip):
+        pairs.append(("ip", ip))
+        pairs.append(("subnet", subnet(ip)))
+    return pairs
+
+
+def locked_for(ip=None, email=None):
+    # Seconds until the attempt may proceed (0 when it may), or None when the
+    # tracker is unavailable. One round trip however many dimensions apply.
+    client = get_redis_client()
+    if client is None:
+        return None
+
+    pairs = dimensions(ip, email)
+    if not pairs:
+        return 0
+    keys = [_key(dimension, value, "lock") for dimension, value in pairs]
+    try:
+        culprit, remaining = client.eval(CHECK_SCRIPT, len(keys), *keys)
+    except CACHE_ERRORS:
+        logger.warning("Lockout tracker unreachable, check skipped")
+        return None
+
+    if culprit:
+        logger.info("Login blocked while %s %s is locked out", *pairs[culprit - 1])
+    return math.ceil(remaining / 1000)
+
+
+def record_failure(ip=None, email=None):
+    # Count a failed login under each dimension; returns {dimension: lock seconds}
+    # for dimensions this failure locked
+    client = get_redis_client()
+    pairs = dimensions(ip, email)
+    if client is None or not pairs:
+        return {}
+
+    now = int(time.time() * 1000)
+    keys = []
+    args = [
+        now,
+        f"{now}:{os.urandom(4).hex()}",
+        STRIKE_TTL * 1000,
+        LOCKOUT_BASE * 1000,
+        LOCKOUT_MAX * 1000,
+    ]
+    for dimension, value in pairs:
+        limit, window = LOCKOUT_RULES[dimension]
+        keys += [_key(dimension, value, part) for part in ("window", "strikes", "lock")]
+        args += [limit, window * 1000, f"{dimension}:{value}"]
+    keys.append(OFFENDERS_KEY)
+
+    try:
+        result = client.eval(RECORD_SCRIPT, len(keys), *keys, *args)
+    except CACHE_ERRORS:
+        logger.warning("Lockout tracker unreachable, failure not counted")
+        return {}
+
+    locked = {}
+    for (dimension, value), locked_ms in zip(pairs, result[1::2]):
+        if locked_ms:
+            locked[dimension] = locked_ms // 1000
+            logger.warning(
+                "Locked out %s %s for %ss after repeated failed logins",
+                dimension,
+                value,
+                locked_ms // 1000,
+            )
+    return locked
+
+
+def clear(dimension, value):
+    # Lift a lockout and forget the failures that led to it
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        client.delete(
+            *(_key(dimension, value, part) for part in ("window", "strikes", "lock"))
+        )
+        client.zrem(OFFENDERS_KEY, f"{dimension}:{value}")
+    except CACHE_ERRORS:
+        logger.warning(
+            "Lockout tracker unreachable, %s %s not cleared", dimension, value
+        )
+
+
+def offenders(limit=OFFENDERS_LIMIT):
+    # Most recent offenders with their live failure count, strikes and lock
+    client = get_redis_client()
+    if client is None:
+        return None
+
+    now = time.time()
+    try:
+        members = client.zrevrangebyscore(
+            OFFENDERS_KEY,
+            "+inf",
+            (now - STRIKE_TTL) * 1000,
+            start=0,
+            num=limit,
+            withscores=True,
+        )
+        entries = []
+        pipe = client.pipeline(transaction=False)
+        for member, last_failure in members:
+            dimension, value = member.decode().split(":", 1)
+            window = LOCKOUT_RULES[dimension][1]
+            pipe.zcount(_key(dimension, value, "window"), (now - window) * 1000, "+inf")
+            pipe.get(_key(dimension, value, "strikes"))
+            pipe.pttl(_key(dimension, value, "lock"))
+            entries.append((dimension, value, last_failure))
+        results = pipe.execute()
+    except CACHE_ERRORS:
+        logger.warning("Lockout tracker unreachable, offenders unavailable")
+        return None
+
+    rows = []
+    for index, (dimension, value, last_failure) in enumerate(entries):
+        failures, strikes, lock_ms = results[index * 3 : index * 3 + 3]
+        rows.append(
+            {
+                "dimension": dimension,
+                "value": value,
+                "failures": failures,
+                "strikes": int(strikes or 0),
+                "locked_for": math.ceil(max(lock_ms, 0) / 1000),
+                "last_failure": last_failure / 1000,
+            }
+        )
+    return sorted(
+        rows, key=lambda row: (row["locked_for"], row["failures"]), reverse=True
+    )
@@ -0,0 +1,145 @@
+import json
+import logging
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_ipv46_address
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.common.cache import CACHE_ERRORS, get_redis_client
+from apps.security.models import LoginEvent
+from apps.users.models import User
+
+logger = logging.getLogger("apps.security")
+
+# Redis list the request path appends to and the flush task drains
+BUFFER_KEY = "security:login-events"
+
+# Oldest events are dropped past this many, should the flush task stop running
+MAX_BUFFERED_EVENTS = 100_000
+
+# Events written per INSERT
+FLUSH_BATCH_SIZE = 1000
+
+IDENTIFIER_LENGTH = LoginEvent._meta.get_field("identifier").max_length
+USER_AGENT_LENGTH = LoginEvent._meta.get_field("user_agent").max_length
+
+
+def _clean_ip(ip):
+    # Forwarded headers are client supplied; an unparsable address would fail
+    # the whole batch's INSERT, so it is dropped here
+    ip = (ip or "").strip()
+    try:
+        validate_ipv46_address(ip)
+    except ValidationError:
+        return None
+    return ip
+
+
+def record_login_event(outcome, client=None, user=None, identifier="", user_agent=""):
+    # Queue an event for the flush task; written directly only without Redis.
+    # client is apps.security.client_ip.get_client()'s address and enrichment.
+    client = client or {}
+    entry = {
+        "outcome": outcome,
+        "user_id": user.pk if user is not None else None,
+        "identifier": (identifier or (user.email if user else ""))[:IDENTIFIER_LENGTH],
+        "ip": _clean_ip(client.get("ip")),
+        "country": client.get("country") or "",
+        "asn": client.get("asn"),
+        "user_agent": (user_agent or "")[:USER_AGENT_LENGTH],
+        "created_at": timezone.now().isoformat(),
+    }
+
+    client = get_redis_client()
+    if client is not None:
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.rpush(BUFFER_KEY, json.dumps(entry))
+            pipe.ltrim(BUFFER_KEY, -MAX_BUFFERED_EVENTS, -1)
+            pipe.execute()
+            return
+        except CACHE_ERRORS:
+            logger.warning("Login event buffer unreachable, writing directly")
+
+    save_events([entry])
+
+
+def save_events(entries):
+    # One INSERT for a batch of buffered events
+    entries = list(entries)
+    user_ids = _resolve_users(entries)
+    LoginEvent.objects.bulk_create(
+        LoginEvent(
+            user_id=user_ids.get(index),
+            identifier=entry["identifier"],
+            outcome=entry["outcome"],
+            ip=entry["ip"],
+            country=entry.get("country", ""),
+            asn=entry.get("asn"),
+            user_agent=entry["user_agent"],
+            created_at=parse_datetime(entry["created_at"]),
+        )
+        for index, entry in enumerate(entries)
+    )
+    return len(entries)
+
+
+def _resolve_users(entries):
+    # Users that still exist, and accounts matching failed attempts' identifiers
+    user_ids = {entry["user_id"] for entry in entries if entry["user_id"]}
+    identifiers = {
+        entry["identifier"].lower()
+        for entry in entries
+        if not entry["user_id"] and entry["identifier"]
+    }
+    if not user_ids and not identifiers:
+        return {}
+
+    existing = set()
+    by_identifier = {}
+    for pk, username, email in User.objects.filter(
+        Q(pk__in=user_ids) | Q(email__in=identifiers) | Q(username__in=identifiers)
+    ).values_list("pk", "username", "email"):
+        existing.add(pk)
+        by_identifier[username.lower()] = pk
+        by_identifier[email.lower()] = pk
+
+    return {
+        index: (
+            (entry["user_id"] if entry["user_id"] in existing else None)
+            if entry["user_id"]
+            else by_identifier.get(entry["identifier"].lower())
+        )
+        for index, entry in enumerate(entries)
+    }
+
+
+def flush_events(batch_size=FLUSH_BATCH_SIZE):
+    # Drain the buffer in batches; a failed write puts its batch back in front
+    client = get_redis_client()
+    if client is None:
+        return 0
+
+    written = 0
+    while True:
+        try:
+            pipe = client.pipeline()
+            pipe.lrange(BUFFER_KEY, 0, batch_size - 1)
+            pipe.ltrim(BUFFER_KEY, batch_size, -1)
+            raw, _ = pipe.execute()
+        except CACHE_ERRORS:
+            logger.warning("Login event buffer unreachable, flush skipped")
+            return written
+        if not raw:
+            return written
+
+        try:
+            written += save_events(json.loads(item) for item in raw)
+        except Exception:
+            client.lpush(BUFFER_KEY, *reversed(raw))
+            raise
+
+        if len(raw) < batch_size:
+            return written
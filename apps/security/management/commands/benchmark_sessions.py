@@ -0,0 +1,102 @@
+import random
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.common.cache import get_redis_client
+from apps.security import sessions
+from apps.security.sessions import SessionStore
+
+DEFAULT_VIEWS = 1000
+
+# Statements that write the session table
+WRITES = ("INSERT", "UPDATE", "DELETE")
+
+
+class Command(BaseCommand):
+    help = (
+        "Count django_session writes per page view for cached_db and the "
+        "write-behind session store, saving every request as in production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--views",
+            type=int,
+            default=DEFAULT_VIEWS,
+            help=f"Page views per store (default: {DEFAULT_VIEWS:,})",
+        )
+        parser.add_argument(
+            "--sessions",
+            type=int,
+            default=20,
+            help="Signed-in sessions the views are spread over (default: 20)",
+        )
+        parser.add_argument(
+            "--write-rate",
+            type=float,
+            default=0.02,
+            help="Share of views that change session data (default: 0.02)",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    def handle(self, *args, **options):
+        if get_redis_client(settings.SESSION_CACHE_ALIAS) is None:
+            self.stderr.write(
+                "SESSION_CACHE_ALIAS is not a Redis cache; the write-behind "
+                "store falls back to writing every save."
+            )
+
+        views = options["views"]
+        self.stdout.write(
+            f"{'store':<14} {'views':>7} {'writes':>7} {'per 1,000':>10} {'ms':>8}"
+        )
+        for label, store in (
+            ("cached_db", CachedDBStore),
+            ("write-behind", SessionStore),
+        ):
+            writes, elapsed = self._run(store, views, options)
+            self.stdout.write(
+                f"{label:<14} {views:>7,} {writes:>7,} "
+                f"{writes * 1000 / views:>10.1f} {elapsed * 1000:>8.1f}"
+            )
+
+    def _run(self, store, views, options):
+        # Everything is rolled back; cached copies are removed afterwards
+        randomizer = random.Random(options["seed"])
+        with transaction.atomic():
+            keys = []
+            for index in range(options["sessions"]):
+                session = store()
+                session["_auth_user_id"] = str(index)
+                session.create()
+                keys.append(session.session_key)
+
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                for view in range(views):
+                    # A request: load the session, read it, save it
+                    session = store(randomizer.choice(keys))
+                    session.get("_auth_user_id")
+                    if randomizer.random() < options["write_rate"]:
+                        session["last_view"] = view
+                    session.save()
+                if store is SessionStore:
+                    sessions.sweep_session_expiry()
+            elapsed = time.perf_counter() - started
+
+            for key in keys:
+                store(key).delete()
+            transaction.set_rollback(True)
+
+        writes = sum(
+            1
+            for query in queries.captured_queries
+            if query["sql"].lstrip().upper().startswith(WRITES)
+            and "django_session" in query["sql"]
+        )
+        return writes, elapsed
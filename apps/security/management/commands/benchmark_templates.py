@@ -0,0 +1,148 @@
+import time
+import tracemalloc
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from apps.common.widgets import BaseFormWidget
+from apps.security.forms import EditProfileForm, LoginForm, SignupForm
+from apps.users.models import User
+
+DEFAULT_ITERATIONS = 200
+
+# Submitted data that fails validation, as on a rejected POST
+INVALID_DATA = {
+    "login": "juan@example.com",
+    "password": "wrong",
+    "username": "x",
+    "email": "not-an-email",
+    "password1": "short",
+    "password2": "other",
+    "first_name": "R2-D2",
+    "last_name": "Cruz",
+    "phone": "abc",
+}
+
+# The per-field include each page used before the form_field tag
+INCLUDE_FIELD = (
+    "{% include field.field.widget.template_name with "
+    "label=field.label name=field.html_name id=field.id_for_label "
+    "value=field.value required=field.field.required has_error=field.errors "
+    "error_message=field.errors.0 help_text=field.help_text "
+    "disabled=field.field.disabled "
+    "placeholder=field.field.widget.attrs.placeholder "
+    "autocomplete=field.field.widget.attrs.autocomplete %}"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure render time and allocations of the login, signup and edit "
+        "profile pages, and compare per-field includes with the form_field tag."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=DEFAULT_ITERATIONS,
+            help=f"Renders per measurement (default: {DEFAULT_ITERATIONS})",
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        engine = engines["django"]
+        include_block = engine.from_string(
+            "{% for field in fields %}" + INCLUDE_FIELD + "{% endfor %}"
+        )
+        form_field_block = engine.from_string(
+            "{% load form_tags %}{% for field in fields %}{% form_field field %}{% endfor %}"
+        )
+
+        self.stdout.write(
+            f"{'page':<24} {'page ms':>8} {'page KiB':>9} "
+            f"{'include ms':>11} {'form_field ms':>14}"
+        )
+        for label, template_name, make_form, request in self._pages():
+            for state, data in (("GET", None), ("failed POST", INVALID_DATA)):
+                form = make_form(data)
+                if data is not None:
+                    form.is_valid()
+                fields = [
+                    field
+                    for field in form
+                    if isinstance(field.field.widget, BaseFormWidget)
+                ]
+                context = {"form": form, "fields": fields}
+
+                page_ms, page_kib = self._measure(
+                    lambda: render_to_string(template_name, context, request),
+                    iterations,
+                )
+                include_ms, _ = self._measure(
+                    lambda: include_block.render(context), iterations
+                )
+                form_field_ms, _ = self._measure(
+                    lambda: form_field_block.render(context), iterations
+                )
+                self.stdout.write(
+                    f"{f'{label} {state}':<24} {page_ms:8.3f} {page_kib:9.1f} "
+                    f"{include_ms:11.3f} {form_field_ms:14.3f}"
+                )
+
+    def _pages(self):
+        factory = RequestFactory()
+        anonymous = factory.get("/")
+        anonymous.user = AnonymousUser()
+
+        # Unsaved, so the benchmark never writes to the database
+        user = User(
+            username="juan",
+            email="juan@example.com",
+            first_name="Juan",
+            last_name="Cruz",
+            job_title="Agent",
+        )
+        signed_in = factory.get("/")
+        signed_in.user = user
+
+        return [
+            (
+                "login",
+                "account/login.html",
+                lambda data: LoginForm(data, request=anonymous),
+                anonymous,
+            ),
+            (
+                "signup",
+                "account/signup.html",
+                lambda data: SignupForm(data),
+                anonymous,
+            ),
+            (
+                "edit profile",
+                "account/edit_profile.html",
+                lambda data: EditProfileForm(data, instance=user),
+                signed_in,
+            ),
+        ]
+
+    def _measure(self, render, iterations):
+        # Warm template and loader caches before timing
+        render()
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            render()
+        elapsed_ms = (time.perf_counter() - started) * 1000 / iterations
+
+        tracemalloc.start()
+        try:
+            render()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return elapsed_ms, peak / 1024
@@ -0,0 +1,89 @@
+from django.contrib import messages
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.shortcuts import redirect
+from django.urls import reverse
+
+from apps.security import session_index
+from apps.security.backends import LEGACY_BACKENDS
+from apps.security.client_ip import get_client
+from apps.security.profile_gate import (
+    is_profile_complete,
+    pop_login,
+    profile_destination,
+)
+
+# Pages that need a complete profile
+PROFILE_REQUIRED = {"base:index", "analytics:dashboard"}
+
+
+class LegacyAuthBackendMiddleware:
+    # Point sessions signed in through Django's and allauth's own backends at
+    # the cached ones, so they stay valid. Can go once SESSION_COOKIE_AGE has
+    # passed since the switch.
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        backend = request.session.get(BACKEND_SESSION_KEY)
+        if backend in LEGACY_BACKENDS:
+            request.session[BACKEND_SESSION_KEY] = LEGACY_BACKENDS[backend]
+        return self.get_response(request)
+
+
+class SessionActivityMiddleware:
+    # Keep "last seen" on the active sessions page current; throttled per
+    # session, so most requests don't reach Redis. Sessions whose key was
+    # cycled after login (e.g. by a password change) are indexed again here.
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            session_key = request.session.session_key
+            if session_index.touch(user, session_key) is False:
+                session_index.add_session(
+                    user,
+                    session_key,
+                    client=get_client(request),
+                    user_agent=request.META.get("HTTP_USER_AGENT", ""),
+                )
+        return response
+
+
+class ProfileGateMiddleware:
+    # Send signed-in users straight to where they belong: the dashboard once
+    # their profile is complete, the complete profile page until then. One
+    # redirect at most, decided before any view runs.
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not request.user.is_authenticated or request.resolver_match is None:
+            return None
+
+        from_login = pop_login(request)
+        view_name = request.resolver_match.view_name
+        if view_name == "security:complete_profile":
+            if request.method == "GET" and is_profile_complete(request):
+                # Toast message
+                messages.info(request, "Your profile is already complete")
+                return redirect("analytics:dashboard")
+        elif view_name in PROFILE_REQUIRED:
+            destination = profile_destination(request)
+            if destination != request.path:
+                incomplete = destination == reverse("security:complete_profile")
+                if incomplete and not from_login:
+                    # Toast message; the login redirect needs no explanation
+                    messages.info(
+                        request, "Please complete your profile first to proceed."
+                    )
+                return redirect(destination)
+        return None
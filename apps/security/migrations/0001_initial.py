@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:53
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoginEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('identifier', models.CharField(max_length=254, verbose_name='Username/Email')),
+                ('outcome', models.CharField(choices=[('success', 'Logged In'), ('failure', 'Failed Login'), ('logout', 'Logged Out')], max_length=10, verbose_name='Outcome')),
+                ('ip', models.GenericIPAddressField(blank=True, null=True, verbose_name='IP Address')),
+                ('user_agent', models.CharField(blank=True, max_length=255, verbose_name='User Agent')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Occurred At')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='login_events', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Login Event',
+                'indexes': [models.Index(fields=['user', 'created_at'], name='security_lo_user_id_802ad7_idx'), models.Index(fields=['ip', 'created_at'], name='security_lo_ip_032805_idx'), models.Index(fields=['outcome', 'created_at'], name='security_lo_outcome_f1f1bf_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('security', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loginevent',
+            name='asn',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='ASN'),
+        ),
+        migrations.AddField(
+            model_name='loginevent',
+            name='country',
+            field=models.CharField(blank=True, max_length=2, verbose_name='Country'),
+        ),
+    ]
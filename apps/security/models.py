@@ -1,3 +1,40 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class LoginEvent(models.Model):
+    class Outcome(models.TextChoices):
+        SUCCESS = "success", "Logged In"
+        FAILURE = "failure", "Failed Login"
+        LOGOUT = "logout", "Logged Out"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name="User",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="login_events",
+    )
+    # Username or email as entered, kept for attempts on unknown accounts
+    identifier = models.CharField(verbose_name="Username/Email", max_length=254)
+    outcome = models.CharField(
+        verbose_name="Outcome", max_length=10, choices=Outcome.choices
+    )
+    ip = models.GenericIPAddressField(verbose_name="IP Address", null=True, blank=True)
+    country = models.CharField(verbose_name="Country", max_length=2, blank=True)
+    asn = models.PositiveIntegerField(verbose_name="ASN", null=True, blank=True)
+    user_agent = models.CharField(verbose_name="User Agent", max_length=255, blank=True)
+    created_at = models.DateTimeField(verbose_name="Occurred At", default=timezone.now)
+
+    class Meta:
+        verbose_name = "Login Event"
+        indexes = [
+            models.Index(fields=["user", "created_at"]),
+            models.Index(fields=["ip", "created_at"]),
+            models.Index(fields=["outcome", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_outcome_display()} - {self.identifier}"
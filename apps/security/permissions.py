@@ -0,0 +1,120 @@
+import logging
+import time
+
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+
+from apps.common.cache import CACHE_ERRORS
+
+logger = logging.getLogger("apps.security")
+
+# Seconds a group version and its compiled set live in Redis; expiry
+# rotates the version, bounding staleness if an invalidation was lost
+GROUP_PERMISSIONS_TIMEOUT = 86400
+
+# Entries kept in the per-process copy before it is reset
+LOCAL_CACHE_SIZE = 1024
+
+# Per-process compiled sets keyed by (group id, version)
+_local_sets = {}
+
+
+def group_version_key(group_id):
+    return f"auth:group:{group_id}:version"
+
+
+def group_permissions_key(group_id, version):
+    return f"auth:group:{group_id}:perms:{version}"
+
+
+def _new_version():
+    # Time based so a version evicted from Redis is never handed out again
+    return time.time_ns()
+
+
+def _compile_permissions(group_ids):
+    # One query for every group's permission strings
+    compiled = {group_id: set() for group_id in group_ids}
+    rows = Permission.objects.filter(group__in=group_ids).values_list(
+        "group", "content_type__app_label", "codename"
+    )
+    for group_id, app_label, codename in rows.order_by():
+        compiled[group_id].add(f"{app_label}.{codename}")
+    return {group_id: frozenset(perms) for group_id, perms in compiled.items()}
+
+
+def get_group_versions(group_ids):
+    versions = cache.get_many([group_version_key(pk) for pk in group_ids])
+    missing = {
+        group_version_key(pk): _new_version()
+        for pk in group_ids
+        if group_version_key(pk) not in versions
+    }
+    if missing:
+        # add() keeps a version another process created in the meantime
+        for key, version in missing.items():
+            cache.add(key, version, GROUP_PERMISSIONS_TIMEOUT)
+        versions.update(cache.get_many(list(missing)))
+    return {pk: versions.get(group_version_key(pk)) for pk in group_ids}
+
+
+def get_group_permission_sets(group_ids):
+    # Permission sets for each group, compiled once per group version
+    if not group_ids:
+        return {}
+
+    try:
+        versions = get_group_versions(group_ids)
+    except CACHE_ERRORS:
+        return _compile_permissions(group_ids)
+
+    result = {}
+    remote = {}
+    for group_id, version in versions.items():
+        if version is None:
+            result.update(_compile_permissions([group_id]))
+        elif (group_id, version) in _local_sets:
+            result[group_id] = _local_sets[(group_id, version)]
+        else:
+            remote[group_permissions_key(group_id, version)] = (group_id, version)
+
+    if remote:
+        try:
+            stored = cache.get_many(list(remote))
+        except CACHE_ERRORS:
+            stored = {}
+
+        missing = [remote[key] for key in remote if key not in stored]
+        compiled = _compile_permissions([group_id for group_id, _ in missing])
+        try:
+            cache.set_many(
+                {
+                    group_permissions_key(group_id, version): compiled[group_id]
+                    for group_id, version in missing
+                },
+                GROUP_PERMISSIONS_TIMEOUT,
+            )
+        except CACHE_ERRORS:
+            logger.debug("Permission cache unavailable, skipping store")
+
+        if len(_local_sets) + len(remote) > LOCAL_CACHE_SIZE:
+            _local_sets.clear()
+        for key, (group_id, version) in remote.items():
+            perms = stored.get(key, compiled.get(group_id))
+            _local_sets[(group_id, version)] = perms
+            result[group_id] = perms
+
+    return result
+
+
+def invalidate_group_permissions(group_ids):
+    # New versions make every process recompile on its next check
+    try:
+        cache.set_many(
+            {group_version_key(pk): _new_version() for pk in group_ids},
+            GROUP_PERMISSIONS_TIMEOUT,
+        )
+    except CACHE_ERRORS:
+        logger.warning(
+            "Permission cache unavailable, could not invalidate %s", group_ids
+        )
@@ -0,0 +1,39 @@
+from django.urls import reverse
+
+# Session flag set once the user's profile is known to be complete
+SESSION_KEY = "profile_complete"
+
+# Session flag marking the first request after login, which follows the
+# login redirect
+LOGIN_KEY = "profile_gate_login"
+
+
+def is_profile_complete(request):
+    # Completion only ever becomes true within a session, so only that is
+    # cached; incomplete profiles are checked against the user each time
+    if request.session.get(SESSION_KEY):
+        return True
+    if request.user.is_profile_complete:
+        request.session[SESSION_KEY] = True
+        return True
+    return False
+
+
+def forget_profile_complete(request):
+    request.session.pop(SESSION_KEY, None)
+
+
+def mark_login(request):
+    request.session[LOGIN_KEY] = True
+
+
+def pop_login(request):
+    # True once, for the request following the login redirect
+    return request.session.pop(LOGIN_KEY, False)
+
+
+def profile_destination(request):
+    # Where a signed-in user belongs: the dashboard, or completing their profile
+    if is_profile_complete(request):
+        return reverse("analytics:dashboard")
+    return reverse("security:complete_profile")
@@ -0,0 +1,265 @@
+import json
+import logging
+import re
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.utils.crypto import salted_hmac
+
+from apps.common.cache import CACHE_ERRORS, get_redis_client
+
+logger = logging.getLogger("apps.security")
+
+KEY_PREFIX = "sessions:user"
+
+# Seconds between last-seen updates for one session
+TOUCH_INTERVAL = 60
+
+# Sessions whose last-seen time this process wrote recently
+TOUCH_CACHE_SIZE = 10_000
+
+# First match wins; Edge and Opera report Chrome too, Chrome reports Safari
+BROWSERS = (
+    ("Edge", re.compile(r"Edg(?:e|A|iOS)?/")),
+    ("Opera", re.compile(r"OPR/|Opera")),
+    ("Firefox", re.compile(r"Firefox/|FxiOS/")),
+    ("Chrome", re.compile(r"Chrome/|CriOS/")),
+    ("Safari", re.compile(r"Safari/")),
+)
+SYSTEMS = (
+    ("iOS", re.compile(r"iPhone|iPad|iPod")),
+    ("Android", re.compile(r"Android")),
+    ("Windows", re.compile(r"Windows")),
+    ("macOS", re.compile(r"Mac OS X|Macintosh")),
+    ("ChromeOS", re.compile(r"CrOS")),
+    ("Linux", re.compile(r"Linux")),
+)
+
+# Set last-seen only for sessions still indexed (KEYS: metadata, last-seen),
+# so revoked sessions stay out, and slide both keys' TTL
+TOUCH_SCRIPT = """
+if redis.call('hexists', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('hset', KEYS[2], ARGV[1], ARGV[2])
+redis.call('expire', KEYS[1], ARGV[3])
+redis.call('expire', KEYS[2], ARGV[3])
+return 1
+"""
+
+_touched = {}
+
+
+def _keys(user_id):
+    # Metadata per session, and last-seen times kept apart so touches stay small
+    return f"{KEY_PREFIX}:{user_id}", f"{KEY_PREFIX}:{user_id}:seen"
+
+
+def session_id(session_key):
+    # Opaque stand-in for a session key in pages and forms; keys never leave
+    # the server
+    return salted_hmac("apps.security.session_index", session_key).hexdigest()[:32]
+
+
+def _session_store():
+    return import_module(settings.SESSION_ENGINE).SessionStore
+
+
+def describe_device(user_agent):
+    # "Chrome on Windows" style label from a User-Agent header
+    browser = next(
+        (name for name, pattern in BROWSERS if pattern.search(user_agent or "")), ""
+    )
+    system = next(
+        (name for name, pattern in SYSTEMS if pattern.search(user_agent or "")), ""
+    )
+    if browser and system:
+        return f"{browser} on {system}"
+    return browser or system or "Unknown device"
+
+
+def add_session(user, session_key, client=None, user_agent=""):
+    # Index a session the user just signed in with
+    redis = get_redis_client(settings.SESSION_CACHE_ALIAS)
+    if redis is None or not session_key:
+        return
+
+    client = client or {}
+    now = time.time()
+    meta, seen = _keys(user.pk)
+    entry = {
+        "device": describe_device(user_agent),
+        "user_agent": user_agent[:512],
+        "ip": client.get("ip"),
+        "country": client.get("country", ""),
+        "created_at": now,
+    }
+    try:
+        pipe = redis.pipeline()
+        pipe.hset(meta, session_key, json.dumps(entry))
+        pipe.hset(seen, session_key, now)
+        pipe.expire(meta, settings.SESSION_COOKIE_AGE)
+        pipe.expire(seen, settings.SESSION_COOKIE_AGE)
+        pipe.execute()
+    except CACHE_ERRORS:
+        logger.warning("Session index unreachable, session not indexed")
+        return
+    _touched[session_key] = now
+
+
+def remove_session(user, session_key):
+    redis = get_redis_client(settings.SESSION_CACHE_ALIAS)
+    if redis is None or not session_key:
+        return
+    _touched.pop(session_key, None)
+    try:
+        pipe = redis.pipeline()
+        for key in _keys(user.pk):
+            pipe.hdel(key, session_key)
+        pipe.execute()
+    except CACHE_ERRORS:
+        logger.warning("Session index unreachable, session not removed")
+
+
+def touch(user, session_key):
+    # Record activity at most once per TOUCH_INTERVAL per session and process.
+    # False when the session turned out not to be indexed.
+    now = time.time()
+    if not session_key or now - _touched.get(session_key, 0) < TOUCH_INTERVAL:
+        return
+    redis = get_redis_client(settings.SESSION_CACHE_ALIAS)
+    if redis is None:
+        return
+
+    if len(_touched) >= TOUCH_CACHE_SIZE:
+        _touched.clear()
+    _touched[session_key] = now
+    try:
+        return bool(
+            redis.eval(
+                TOUCH_SCRIPT,
+                2,
+                *_keys(user.pk),
+                session_key,
+                now,
+                settings.SESSION_COOKIE_AGE,
+            )
+        )
+    except CACHE_ERRORS:
+        logger.debug("Session index unreachable, last seen not updated")
+
+
+def list_sessions(user, current_key=None):
+    # The user's sessions, most recently active first; None without Redis.
+    # Sessions that expired or were flushed elsewhere are dropped from the index.
+    redis = get_redis_client(settings.SESSION_CACHE_ALIAS)
+    if redis is None:
+        return None
+
+    meta, seen = _keys(user.pk)
+    try:
+        pipe = redis.pipeline(transaction=False)
+        pipe.hgetall(meta)
+        pipe.hgetall(seen)
+        entries, last_seen = pipe.execute()
+    except CACHE_ERRORS:
+        logger.warning("Session index unreachable, sessions unavailable")
+        return None
+
+    store = _session_store()()
+    idle_since = time.time() - settings.SESSION_COOKIE_AGE
+    sessions, stale = [], []
+    for session_key, value in entries.items():
+        entry = json.loads(value)
+        session_key = session_key.decode()
+        entry["id"] = session_id(session_key)
+        entry["last_seen"] = float(last_seen.get(session_key.encode()) or 0) or (
+            entry["created_at"]
+        )
+        if session_key != current_key and (
+            entry["last_seen"] < idle_since or not store.exists(session_key)
+        ):
+            stale.append(session_key)
+            continue
+        entry["current"] = session_key == current_key
+        sessions.append(entry)
+
+    if stale:
+        try:
+            pipe = redis.pipeline()
+            pipe.hdel(meta, *stale)
+            pipe.hdel(seen, *stale)
+            pipe.execute()
+        except CACHE_ERRORS:
+            pass
+    return sorted(
+        sessions, key=lambda entry: (entry["current"], entry["last_seen"]), reverse=True
+    )
+
+
+def _indexed_keys(redis, user):
+    return [key.decode() for key in redis.hkeys(_keys(user.pk)[0])]
+
+
+def _revoke(redis, user, session_keys):
+    store = _session_store()()
+    for session_key in session_keys:
+        store.delete(session_key)
+        _touched.pop(session_key, None)
+    if session_keys:
+        try:
+            pipe = redis.pipeline()
+            for key in _keys(user.pk):
+                pipe.hdel(key, *session_keys)
+            pipe.execute()
+        except CACHE_ERRORS:
+            logger.warning("Session index unreachable, revoked sessions still listed")
+        logger.info(
+            "Revoked %s session(s) for user: %s", len(session_keys), user.username
+        )
+    return len(session_keys)
+
+
+def revoke_sessions(user, session_ids, current_key=None):
+    # Sign the user out of the sessions with the given ids (see session_id);
+    # ids not in their index, and the current session, are ignored. Returns
+    # how many were revoked, or None without Redis.
+    redis = get_redis_client(settings.SESSION_CACHE_ALIAS)
+    if redis is None:
+        return None
+
+    session_ids = set(session_ids)
+    if not session_ids:
+        return 0
+    try:
+        indexed = _indexed_keys(redis, user)
+    except CACHE_ERRORS:
+        logger.warning("Session index unreachable, sessions not revoked")
+        return None
+    return _revoke(
+        redis,
+        user,
+        [
+            session_key
+            for session_key in indexed
+            if session_key != current_key and session_id(session_key) in session_ids
+        ],
+    )
+
+
+def revoke_other_sessions(user, current_key):
+    # "Sign out everywhere else": every indexed session but the current one
+    redis = get_redis_client(settings.SESSION_CACHE_ALIAS)
+    if redis is None:
+        return None
+    try:
+        indexed = _indexed_keys(redis, user)
+    except CACHE_ERRORS:
+        logger.warning("Session index unreachable, sessions not revoked")
+        return None
+    return _revoke(
+        redis,
+        user,
+        [session_key for session_key in indexed if session_key != current_key],
+    )
@@ -0,0 +1,112 @@
+import hashlib
+import logging
+import time
+from datetime import UTC, datetime
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.models import Session
+from django.db.models import Case, DateTimeField, F, Value, When
+
+from apps.common.cache import CACHE_ERRORS, get_redis_client
+
+logger = logging.getLogger("apps.security")
+
+# Sessions whose database expiry is behind Redis, scored by the expiry to write
+PENDING_EXPIRY_KEY = "sessions:pending-expiry"
+
+# Rows updated per statement by the sweep
+SWEEP_BATCH_SIZE = 500
+
+
+class SessionStore(CachedDBStore):
+    # Write-behind sessions: the cache (Redis) copy is primary. The database row
+    # is written when the session data changes; saves that only slide the expiry
+    # (SESSION_SAVE_EVERY_REQUEST) refresh the Redis TTL and leave the row to
+    # sweep_session_expiry(). Behaves like cached_db on non-Redis caches.
+
+    def load(self):
+        data = super().load()
+        self._loaded_digest = self._digest(data)
+        return data
+
+    def save(self, must_create=False):
+        if (
+            must_create
+            or self.session_key is None
+            or self._changed()
+            or not self._touch()
+        ):
+            super().save(must_create)
+            self._loaded_digest = self._digest(self._get_session())
+
+    def _changed(self):
+        return self._digest(self._get_session()) != getattr(
+            self, "_loaded_digest", None
+        )
+
+    def _digest(self, data):
+        return hashlib.blake2b(self.serializer().dumps(data), digest_size=16).digest()
+
+    def _touch(self):
+        # Slide the cached copy's TTL and queue the row's expiry, in one round
+        # trip. False when the row has to be written instead.
+        client = get_redis_client(settings.SESSION_CACHE_ALIAS)
+        if client is None:
+            return False
+
+        age = self.get_expiry_age()
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.expire(self._cache.make_key(self.cache_key), age)
+            pipe.zadd(PENDING_EXPIRY_KEY, {self.session_key: time.time() + age})
+            cached, _ = pipe.execute()
+        except CACHE_ERRORS:
+            logger.warning("Session cache unreachable, writing session to database")
+            return False
+        # An evicted copy is rewritten along with the row
+        return bool(cached)
+
+
+def sweep_session_expiry(batch_size=SWEEP_BATCH_SIZE):
+    # Catch database expiries up with Redis: one UPDATE per batch of sessions,
+    # however many requests each had since the last sweep
+    client = get_redis_client(settings.SESSION_CACHE_ALIAS)
+    if client is None:
+        return 0
+
+    try:
+        pipe = client.pipeline()
+        pipe.zrange(PENDING_EXPIRY_KEY, 0, -1, withscores=True)
+        pipe.delete(PENDING_EXPIRY_KEY)
+        pending, _ = pipe.execute()
+    except CACHE_ERRORS:
+        logger.warning("Session cache unreachable, expiry sweep skipped")
+        return 0
+
+    updated = 0
+    for start in range(0, len(pending), batch_size):
+        expiries = {
+            key.decode(): datetime.fromtimestamp(score, UTC)
+            for key, score in pending[start : start + batch_size]
+        }
+        try:
+            updated += Session.objects.filter(session_key__in=expiries).update(
+                expire_date=Case(
+                    *(
+                        When(
+                            session_key=key,
+                            expire_date__lt=expiry,
+                            then=Value(expiry),
+                        )
+                        for key, expiry in expiries.items()
+                    ),
+                    default=F("expire_date"),
+                    output_field=DateTimeField(),
+                )
+            )
+        except Exception:
+            # Requeue what wasn't written; newer expiries queued meanwhile win
+            client.zadd(PENDING_EXPIRY_KEY, dict(pending[start:]), nx=True)
+            raise
+    return updated
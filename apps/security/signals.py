@@ -1,51 +1,152 @@
-import logging
-
 from allauth.account.signals import user_logged_in, user_logged_out
 from django.conf import settings
+from django.contrib.auth.models import Permission
 from django.contrib.auth.signals import user_login_failed
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
-logger = logging.getLogger("apps.security")
+from apps.security import lockout, profile_gate, session_index
+from apps.security.backends import invalidate_cached_users
+from apps.security.client_ip import get_client
+from apps.security.login_events import record_login_event
+from apps.security.models import LoginEvent
+from apps.security.permissions import invalidate_group_permissions
+from apps.users.models import Group, User
 
 
 @receiver(user_logged_in)
 def log_user_login(sender, request, user, **kwargs):
-    # Log successful user login
-    ip_address = get_client_ip(request)
-    user_agent = request.META.get("HTTP_USER_AGENT", "Unknown")
-
-    logger.info(
-        f"User logged in - Username: {user.username}, Email: {user.email}, "
-        f"IP: {ip_address}, User-Agent: {user_agent}"
+    # Record successful user login
+    record_login_event(
+        LoginEvent.Outcome.SUCCESS,
+        client=get_client(request),
+        user=user,
+        user_agent=request.META.get("HTTP_USER_AGENT", ""),
+    )
+    # The account holder got in; failures against the address no longer count
+    lockout.clear("email", user.email.lower())
+    # The login redirect explains itself; the profile gate stays quiet on it
+    profile_gate.mark_login(request)
+    # Index the new session for the active sessions page; login() has already
+    # rotated the key
+    session_index.add_session(
+        user,
+        request.session.session_key,
+        client=get_client(request),
+        user_agent=request.META.get("HTTP_USER_AGENT", ""),
     )
 
 
 @receiver(user_logged_out)
 def log_user_logout(sender, request=None, user=None, **kwargs):
-    # Log user logout
+    # Record user logout
     if request and user and user.is_authenticated:
-        ip_address = get_client_ip(request)
-        logger.info(
-            f"User logged out - Username: {user.username}, Email: {user.email}, IP: {ip_address}"
+        record_login_event(
+            LoginEvent.Outcome.LOGOUT,
+            client=get_client(request),
+            user=user,
+            user_agent=request.META.get("HTTP_USER_AGENT", ""),
         )
+        # Sent before the session is flushed, so the key is still the one indexed
+        session_index.remove_session(user, request.session.session_key)
 
 
 @receiver(user_login_failed)
-def log_user_login_failed(sender, credentials, request, **kwargs):
-    # Log failed login attempts
-    ip_address = get_client_ip(request)
-    username = credentials.get("username") or credentials.get("email", "Unknown")
-
-    logger.warning(
-        f"Failed login attempt - Username/Email: {username}, IP: {ip_address}"
+def log_user_login_failed(sender, credentials, request=None, **kwargs):
+    # Record failed login attempts; the account is matched when the batch is written
+    client = get_client(request) if request else None
+    identifier = credentials.get("username") or credentials.get("email", "")
+    record_login_event(
+        LoginEvent.Outcome.FAILURE,
+        client=client,
+        identifier=identifier,
+        user_agent=request.META.get("HTTP_USER_AGENT", "") if request else "",
     )
+    lockout.record_failure(client["ip"] if client else None, identifier)
+
+
+def _invalidate_users(user_ids):
+    # Drop now, and again after commit so concurrent requests can't re-cache stale rows
+    user_ids = list(user_ids)
+    invalidate_cached_users(user_ids)
+    transaction.on_commit(lambda: invalidate_cached_users(user_ids))
+
+
+def _invalidate_groups(group_ids):
+    # Bump now, and again after commit so stale rows compiled meanwhile are dropped
+    group_ids = list(group_ids)
+    invalidate_group_permissions(group_ids)
+    transaction.on_commit(lambda: invalidate_group_permissions(group_ids))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    # Covers profile edits, password changes and deactivation
+    _invalidate_users([instance.pk])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_user_cache_on_membership(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            _invalidate_users([instance.pk])
+    elif action == "pre_clear":
+        instance._cleared_user_ids = list(
+            instance.user_set.values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        _invalidate_users(getattr(instance, "_cleared_user_ids", []))
+    elif action in ("post_add", "post_remove") and pk_set:
+        _invalidate_users(pk_set)
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_user_cache_on_permissions(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    # Directly assigned permissions are part of the cached user
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            _invalidate_users([instance.pk])
+    elif action == "pre_clear":
+        instance._cleared_user_ids = list(
+            instance.user_set.values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        _invalidate_users(getattr(instance, "_cleared_user_ids", []))
+    elif action in ("post_add", "post_remove") and pk_set:
+        _invalidate_users(pk_set)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_group_permissions_on_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            _invalidate_groups([instance.pk])
+    elif action == "pre_clear":
+        instance._cleared_group_ids = list(
+            instance.group_set.values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        _invalidate_groups(getattr(instance, "_cleared_group_ids", []))
+    elif action in ("post_add", "post_remove") and pk_set:
+        _invalidate_groups(pk_set)
+
+
+@receiver(pre_delete, sender=Permission)
+def invalidate_group_permissions_on_delete(sender, instance, **kwargs):
+    # Grants are cascaded away without m2m_changed
+    _invalidate_groups(instance.group_set.values_list("pk", flat=True))
+    _invalidate_users(instance.user_set.values_list("pk", flat=True))
 
 
-def get_client_ip(request):
-    # Get client IP address from request
-    x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
-    if x_forwarded_for:
-        ip = x_forwarded_for.split(",")[0]
-    else:
-        ip = request.META.get("REMOTE_ADDR")
-    return ip
+@receiver(pre_delete, sender=Group)
+def invalidate_user_cache_on_group_delete(sender, instance, **kwargs):
+    # Memberships are cascaded away without m2m_changed
+    _invalidate_users(instance.user_set.values_list("pk", flat=True))
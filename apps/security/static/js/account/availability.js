@@ -0,0 +1,84 @@
+import { AVAILABILITY_DEBOUNCE } from '../constants.js';
+
+document.addEventListener('DOMContentLoaded', function () {
+    const form = document.querySelector('form[data-availability-url]');
+    if (!form) return;
+
+    const url = form.dataset.availabilityUrl;
+    const csrfToken = form.querySelector('input[name="csrfmiddlewaretoken"]')?.value;
+
+    // Hint shown below the input, next to any server-side error
+    function getHint(input) {
+        let hint = input.parentElement.querySelector('[data-availability-hint]');
+        if (!hint) {
+            hint = document.createElement('span');
+            hint.dataset.availabilityHint = '';
+            hint.className = 'text-xs hidden';
+            input.insertAdjacentElement('afterend', hint);
+        }
+        return hint;
+    }
+
+    function showHint(input, message, available) {
+        const hint = getHint(input);
+        hint.textContent = message;
+        hint.classList.toggle('hidden', !message);
+        hint.classList.toggle('text-(--text-error)', !available);
+        hint.classList.toggle('text-(--text-muted)', available);
+    }
+
+    function watch(input) {
+        const initial = input.value.trim().toLowerCase();
+        const results = new Map();
+        let timer = null;
+        let controller = null;
+
+        async function check(value) {
+            // Repeat values (e.g. backspacing) are answered locally
+            if (results.has(value)) return results.get(value);
+
+            controller?.abort();
+            controller = new AbortController();
+            const body = new URLSearchParams({ field: input.name, value: value });
+            const response = await fetch(url, {
+                method: 'POST',
+                headers: { 'X-CSRFToken': csrfToken },
+                body: body,
+                signal: controller.signal,
+            });
+
+            // Rate limited or failed checks are left to form submission
+            if (!response.ok) return null;
+
+            const result = await response.json();
+            results.set(value, result);
+            return result;
+        }
+
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            const value = input.value.trim().toLowerCase();
+
+            if (!value || value === initial) {
+                showHint(input, '', true);
+                return;
+            }
+
+            timer = setTimeout(async function () {
+                try {
+                    const result = await check(value);
+                    if (!result || input.value.trim().toLowerCase() !== value) return;
+                    showHint(input, result.message, result.available);
+                } catch (error) {
+                    if (error.name !== 'AbortError') throw error;
+                }
+            }, AVAILABILITY_DEBOUNCE);
+        });
+    }
+
+    form.querySelectorAll('input[name="username"], input[name="email"]').forEach(
+        function (input) {
+            if (!input.disabled) watch(input);
+        }
+    );
+});
@@ -0,0 +1,16 @@
+from celery import shared_task
+
+from apps.security import sessions
+from apps.security.login_events import flush_events
+
+
+@shared_task
+def flush_login_events():
+    # Write buffered login events to the database in batches
+    return flush_events()
+
+
+@shared_task
+def sweep_session_expiry():
+    # Write session expiries slid in Redis back to the database
+    return sessions.sweep_session_expiry()
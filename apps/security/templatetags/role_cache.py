@@ -0,0 +1,38 @@
+from django import template
+
+from apps.common.fragments import fragment_key, get_fragment, set_fragment
+from apps.security.fragments import role_signature
+
+register = template.Library()
+
+
+class RoleCacheNode(template.Node):
+    def __init__(self, nodelist, name):
+        self.nodelist = nodelist
+        self.name = name
+
+    def render(self, context):
+        request = context.get("request")
+        signature = role_signature(request) if request is not None else None
+        if signature is None:
+            return self.nodelist.render(context)
+
+        key = fragment_key(self.name.resolve(context), signature)
+        content = get_fragment(key)
+        if content is None:
+            content = self.nodelist.render(context)
+            set_fragment(key, content)
+        return content
+
+
+@register.tag
+def role_cache(parser, token):
+    # {% role_cache "navbar" %}...{% endrole_cache %} reuses the rendered
+    # block for every user with the same role, group versions and language.
+    # Only cache markup that doesn't depend on the individual user or path.
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes a fragment name")
+    nodelist = parser.parse(("endrole_cache",))
+    parser.delete_first_token()
+    return RoleCacheNode(nodelist, parser.compile_filter(bits[1]))
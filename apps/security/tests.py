@@ -1,3 +1,1086 @@
-from django.test import TestCase
+import time
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from allauth.account.models import EmailAddress
+from django.contrib import admin
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Permission
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.template import engines
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from fakeredis import FakeConnection
+from unfold.sites import UnfoldAdminSite
+
+from apps.common import fragments
+from apps.common.cache import get_redis_client
+from apps.security import client_ip, lockout, permissions, session_index
+from apps.security.adapters import AccountAdapter
+from apps.security.backends import (
+    CachedModelBackend,
+    get_group_ids,
+    user_cache_key,
+)
+from apps.security.fragments import role_signature
+from apps.security.login_events import flush_events, record_login_event, save_events
+from apps.security.models import LoginEvent
+from apps.security.profile_gate import SESSION_KEY as PROFILE_COMPLETE_KEY
+from apps.security.sessions import (
+    PENDING_EXPIRY_KEY,
+    SessionStore,
+    sweep_session_expiry,
+)
+from apps.users import availability
+from apps.users.availability import BLOOM_BITS, BLOOM_HASHES, bit_positions
+from apps.users.models import Group, User
+from apps.users.tasks import rebuild_availability_filters
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# django-redis over an in-process Redis (with Lua), so scripts and pipelines run
+FAKE_REDIS_CACHE = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": "redis://localhost:6379/15",
+        "OPTIONS": {"CONNECTION_POOL_KWARGS": {"connection_class": FakeConnection}},
+    }
+}
+
+
+def users_permission(codename):
+    return Permission.objects.get(content_type__app_label="users", codename=codename)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CachedUserBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.backend = CachedModelBackend()
+        self.group = Group.objects.create(name="Sales")
+        self.user = User.objects.create_user(
+            username="juan",
+            email="juan@example.com",
+            password="pass12345",
+            first_name="Juan",
+            last_name="Cruz",
+            job_title="Agent",
+        )
+        self.user.groups.add(self.group)
+
+    # Test: Repeat lookups are served from the cache without queries
+    def test_cached_lookup_skips_database(self):
+        self.backend.get_user(self.user.pk)
+
+        with self.assertNumQueries(0):
+            user = self.backend.get_user(self.user.pk)
+            self.assertEqual(user.email, "juan@example.com")
+            self.assertEqual(get_group_ids(user), [self.group.pk])
+            self.assertTrue(user.is_profile_complete)
+            self.assertEqual(
+                user.get_session_auth_hash(), self.user.get_session_auth_hash()
+            )
+
+    # Test: Password hashes stay out of the cache; the session hash is cached
+    def test_password_not_cached(self):
+        self.backend.get_user(self.user.pk)
+        payload = cache.get(user_cache_key(self.user.pk))
+        self.assertNotIn("password", payload["fields"])
+        self.assertNotIn(self.user.password, payload["values"])
+
+        user = self.backend.get_user(self.user.pk)
+        self.assertIn("password", user.get_deferred_fields())
+        self.assertTrue(user.check_password("pass12345"))
+
+    # Test: Sessions from the previous backends stay signed in
+    def test_legacy_backend_sessions(self):
+        self.client.force_login(
+            self.user, backend="django.contrib.auth.backends.ModelBackend"
+        )
+        response = self.client.get(reverse("security:edit_profile"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.client.session["_auth_user_backend"],
+            "apps.security.backends.CachedModelBackend",
+        )
+
+    # Test: Saving the user (including a password change) invalidates the entry
+    def test_save_invalidates(self):
+        self.backend.get_user(self.user.pk)
+        self.user.set_password("changed12345")
+        self.user.save()
+
+        user = self.backend.get_user(self.user.pk)
+        self.assertTrue(user.check_password("changed12345"))
+
+    # Test: Membership changes from either side invalidate the entry
+    def test_membership_changes_invalidate(self):
+        self.backend.get_user(self.user.pk)
+        self.user.groups.remove(self.group)
+        self.assertEqual(get_group_ids(self.backend.get_user(self.user.pk)), [])
+
+        other = Group.objects.create(name="Support")
+        other.user_set.add(self.user)
+        self.assertEqual(get_group_ids(self.backend.get_user(self.user.pk)), [other.pk])
+
+        other.user_set.clear()
+        self.assertEqual(get_group_ids(self.backend.get_user(self.user.pk)), [])
+
+    # Test: Deactivated users are not served from the cache
+    def test_inactive_user_rejected(self):
+        self.backend.get_user(self.user.pk)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class GroupPermissionCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        permissions._local_sets.clear()
+        self.backend = CachedModelBackend()
+        self.view_user = users_permission("view_user")
+        self.change_user = users_permission("change_user")
+        self.view_group = users_permission("view_group")
+
+        self.sales = Group.objects.create(name="Sales")
+        self.support = Group.objects.create(name="Support")
+        self.sales.permissions.add(self.view_user, self.change_user)
+        self.support.permissions.add(self.view_group)
+
+        self.user = User.objects.create_user(username="juan", email="j@example.com")
+        self.user.groups.add(self.sales, self.support)
+        self.user.user_permissions.add(self.view_group)
+
+    def _request_user(self):
+        # What AuthenticationMiddleware hands each request
+        return self.backend.get_user(self.user.pk)
+
+    # Test: Benchmark - permission checks for one request, before and after
+    def test_benchmark_permission_checks_per_request(self):
+        checks = ["users.view_user", "users.change_user", "users.view_group"]
+
+        # Before: ModelBackend loads the user and joins permissions every request
+        baseline = ModelBackend()
+        with self.assertNumQueries(3):
+            user = baseline.get_user(self.user.pk)
+            for perm in checks:
+                self.assertTrue(baseline.has_perm(user, perm))
+
+        # After: warm requests resolve everything from the caches
+        self._request_user()
+        self.backend.get_all_permissions(self._request_user())
+        with self.assertNumQueries(0):
+            user = self._request_user()
+            for perm in checks:
+                self.assertTrue(self.backend.has_perm(user, perm))
+
+    # Test: Effective permissions are the union of user and group sets
+    def test_union_of_groups(self):
+        self.assertEqual(
+            self.backend.get_all_permissions(self._request_user()),
+            {"users.view_user", "users.change_user", "users.view_group"},
+        )
+
+    # Test: Group permission changes reach warm processes through the version
+    def test_group_permission_change_invalidates(self):
+        self.backend.get_all_permissions(self._request_user())
+        self.sales.permissions.remove(self.change_user)
+        self.assertNotIn(
+            "users.change_user", self.backend.get_all_permissions(self._request_user())
+        )
+
+        self.change_user.group_set.add(self.support)
+        self.assertIn(
+            "users.change_user", self.backend.get_all_permissions(self._request_user())
+        )
+
+    # Test: Membership and direct grant changes refresh the cached user
+    def test_membership_change_invalidates(self):
+        self.backend.get_all_permissions(self._request_user())
+        self.user.groups.remove(self.sales)
+        self.user.user_permissions.clear()
+        self.assertEqual(
+            self.backend.get_all_permissions(self._request_user()),
+            {"users.view_group"},
+        )
+
+
+class CachedUserBackendFallbackTests(TestCase):
+    # Test: Lookups fall back to the database when Redis is unreachable
+    def test_redis_down_falls_back(self):
+        user = User.objects.create_user(username="maria", email="maria@example.com")
+        self.assertEqual(CachedModelBackend().get_user(user.pk), user)
+
+    # Test: Permission checks fall back to the database when Redis is unreachable
+    def test_redis_down_permissions(self):
+        group = Group.objects.create(name="Sales")
+        group.permissions.add(users_permission("view_user"))
+        user = User.objects.create_user(username="maria", email="maria@example.com")
+        user.groups.add(group)
+        user = CachedModelBackend().get_user(user.pk)
+        self.assertTrue(CachedModelBackend().has_perm(user, "users.view_user"))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AvailabilityCheckTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("security:check_availability")
+        self.user = User.objects.create_user(username="juan", email="juan@example.com")
+
+    def _check(self, field, value):
+        return self.client.post(self.url, {"field": field, "value": value})
+
+    # Test: Taken values are reported regardless of case
+    def test_taken_values(self):
+        response = self._check("username", "Juan")
+        self.assertFalse(response.json()["available"])
+        self.assertEqual(
+            response.json()["message"], "A user with this username already exists."
+        )
+        self.assertFalse(self._check("email", "JUAN@example.com").json()["available"])
+        self.assertTrue(self._check("username", "maria").json()["available"])
+
+    # Test: Secondary addresses count as registered emails
+    def test_secondary_email_taken(self):
+        EmailAddress.objects.create(user=self.user, email="other@example.com")
+        self.assertFalse(self._check("email", "other@example.com").json()["available"])
+
+    # Test: A signed-in user's own values are available to them
+    def test_own_values_available(self):
+        self.client.force_login(self.user)
+        self.assertTrue(self._check("username", "juan").json()["available"])
+
+    # Test: Malformed values are rejected without a lookup
+    def test_invalid_format(self):
+        with self.assertNumQueries(0):
+            response = self._check("username", "no spaces")
+        self.assertFalse(response.json()["available"])
+        self.assertEqual(self._check("phone", "123").status_code, 400)
+
+    # Test: Checks are rate limited per client
+    @override_settings(ACCOUNT_RATE_LIMITS={"check_availability": "2/m/ip"})
+    def test_rate_limited(self):
+        self._check("username", "maria")
+        self._check("username", "mario")
+        self.assertEqual(self._check("username", "marie").status_code, 429)
+
+    # Test: Filter positions are stable and within the bitmap
+    def test_bit_positions(self):
+        positions = bit_positions("juan@example.com")
+        self.assertEqual(positions, bit_positions("juan@example.com"))
+        self.assertEqual(len(positions), BLOOM_HASHES)
+        self.assertTrue(all(0 <= position < BLOOM_BITS for position in positions))
+
+
+@override_settings(CACHES=FAKE_REDIS_CACHE)
+class AvailabilityFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(username="juan", email="juan@example.com")
+        patcher = mock.patch.object(rebuild_availability_filters, "delay")
+        self.delay = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    # Test: A missing filter queues one build and checks fall back meanwhile
+    def test_missing_filter_queues_build(self):
+        for _ in range(3):
+            self.assertIsNone(availability.might_be_taken("username", "maria"))
+        self.delay.assert_called_once_with()
+
+        availability.rebuild_filters()
+        self.assertFalse(availability.might_be_taken("username", "maria"))
+        self.assertTrue(availability.might_be_taken("username", "juan"))
+
+        # A flush queues the next build
+        cache.clear()
+        self.assertIsNone(availability.might_be_taken("email", "juan@example.com"))
+        self.assertEqual(self.delay.call_count, 2)
+
+    # Test: Migrating queues a build only while filters are missing
+    def test_ensure_filters(self):
+        availability.ensure_filters()
+        self.delay.assert_called_once_with()
+
+        availability.rebuild_filters()
+        availability.ensure_filters()
+        self.delay.assert_called_once_with()
+
+
+class BenchmarkTemplatesCommandTests(TestCase):
+    # Test: The benchmark renders every page in both states
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command("benchmark_templates", iterations=1, stdout=out)
+        self.assertIn("signup failed POST", out.getvalue())
+        self.assertIn("edit profile GET", out.getvalue())
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RoleFragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        fragments.clear_local_fragments()
+        permissions._local_sets.clear()
+        self.factory = RequestFactory()
+        self.group = Group.objects.create(name="Sales")
+        self.user = User.objects.create_user(username="juan", email="j@example.com")
+        self.user.groups.add(self.group)
+        self.admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass12345"
+        )
+
+    def _request(self, user, path="/"):
+        request = self.factory.get(path)
+        request.user = CachedModelBackend().get_user(user.pk)
+        return request
+
+    def _render(self, user, body):
+        template = engines["django"].from_string(
+            "{% load role_cache %}{% role_cache 'chrome' %}{{ body }}{% endrole_cache %}"
+        )
+        return template.render({"body": body}, self._request(user))
+
+    # Test: Users with the same role share the rendered fragment
+    def test_fragment_shared_per_role(self):
+        other = User.objects.create_user(username="maria", email="m@example.com")
+        other.groups.add(self.group)
+
+        self.assertEqual(self._render(self.user, "first"), "first")
+        self.assertEqual(self._render(other, "second"), "first")
+        self.assertEqual(self._render(self.admin, "admin"), "admin")
+
+    # Test: The in-process copy answers without a cache round trip
+    def test_local_copy_served_first(self):
+        self._render(self.user, "first")
+        request = self._request(self.user)
+        role_signature(request)
+        with mock.patch.object(cache, "get", side_effect=AssertionError):
+            self.assertEqual(
+                engines["django"]
+                .from_string(
+                    "{% load role_cache %}{% role_cache 'chrome' %}x{% endrole_cache %}"
+                )
+                .render({}, request),
+                "first",
+            )
+
+    # Test: Group permission and navigation changes retire cached fragments
+    def test_invalidation(self):
+        self._render(self.user, "first")
+        self.group.permissions.add(users_permission("view_user"))
+        self.assertEqual(self._render(self.user, "second"), "second")
+
+        fragments.invalidate_navigation()
+        self.assertEqual(self._render(self.user, "third"), "third")
+
+    # Test: The admin sidebar is built once per role, with "active" per request
+    def test_admin_sidebar_cached(self):
+        build = mock.patch.object(
+            UnfoldAdminSite,
+            "get_sidebar_list",
+            autospec=True,
+            side_effect=UnfoldAdminSite.get_sidebar_list,
+        )
+        users_url = reverse("admin:users_user_changelist")
+        with build as built:
+            first = admin.site.get_sidebar_list(self._request(self.admin, users_url))
+            second = admin.site.get_sidebar_list(self._request(self.admin, "/other/"))
+        self.assertEqual(built.call_count, 1)
+
+        users = first[1]["items"][0]
+        self.assertEqual(users["link"], users_url)
+        self.assertTrue(users["has_permission"])
+        self.assertTrue(users["active"])
+        self.assertFalse(second[1]["items"][0]["active"])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class LoginEventTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="juan", email="juan@example.com", password="pass12345"
+        )
+
+    def _login(self, email, password):
+        return self.client.post(
+            reverse("account_login"),
+            {"login": email, "password": password},
+            HTTP_USER_AGENT="Firefox",
+        )
+
+    # Test: Logins, logouts and failed attempts are stored as events
+    def test_events_recorded(self):
+        self._login("juan@example.com", "wrong")
+        self._login("nobody@example.com", "wrong")
+        self._login("juan@example.com", "pass12345")
+        self.client.post(reverse("account_logout"))
+
+        events = list(
+            LoginEvent.objects.order_by("pk").values_list(
+                "outcome", "identifier", "user", "ip"
+            )
+        )
+        self.assertEqual(
+            events,
+            [
+                ("failure", "juan@example.com", self.user.pk, "127.0.0.1"),
+                ("failure", "nobody@example.com", None, "127.0.0.1"),
+                ("success", "juan@example.com", self.user.pk, "127.0.0.1"),
+                ("logout", "juan@example.com", self.user.pk, "127.0.0.1"),
+            ],
+        )
+        self.assertEqual(LoginEvent.objects.first().user_agent, "Firefox")
+
+    # Test: Batches tolerate deleted users and malformed addresses
+    def test_batch_cleans_entries(self):
+        record_login_event(
+            LoginEvent.Outcome.FAILURE, client={"ip": "not-an-ip"}, identifier="x"
+        )
+        # A user deleted between the login and the flush
+        entry = {
+            "outcome": "success",
+            "user_id": self.user.pk + 1000,
+            "identifier": "gone@example.com",
+            "ip": "10.0.0.1",
+            "user_agent": "",
+            "created_at": "2026-01-05T08:00:00+00:00",
+        }
+
+        self.assertEqual(save_events([entry]), 1)
+        failure, success = LoginEvent.objects.order_by("pk")
+        self.assertIsNone(failure.ip)
+        self.assertIsNone(success.user)
+        self.assertEqual(success.created_at.year, 2026)
+
+    # Test: Flushing without a Redis buffer has nothing to drain
+    def test_flush_without_buffer(self):
+        self.assertEqual(flush_events(), 0)
+
+    # Test: Events are listed in the admin and searchable by IP
+    def test_admin_changelist(self):
+        record_login_event(
+            LoginEvent.Outcome.FAILURE, client={"ip": "10.0.0.1"}, identifier="a"
+        )
+        record_login_event(
+            LoginEvent.Outcome.FAILURE, client={"ip": "10.0.0.2"}, identifier="b"
+        )
+        admin_user = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass12345"
+        )
+        self.client.force_login(admin_user)
+
+        response = self.client.get(
+            reverse("admin:security_loginevent_changelist"), {"q": "10.0.0.2"}
+        )
+        self.assertEqual(
+            [event.identifier for event in response.context["cl"].result_list], ["b"]
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class LoginLockoutTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="juan", email="juan@example.com", password="pass12345"
+        )
+
+    def _login(self, password):
+        return self.client.post(
+            reverse("account_login"),
+            {"login": "juan@example.com", "password": password},
+        )
+
+    # Test: Attempts are counted per email, IP and subnet
+    def test_dimensions(self):
+        self.assertEqual(
+            lockout.dimensions("10.1.2.3", " Juan@Example.com"),
+            [
+                ("email", "juan@example.com"),
+                ("ip", "10.1.2.3"),
+                ("subnet", "10.1.2.0/24"),
+            ],
+        )
+        self.assertEqual(lockout.subnet("2001:db8::1"), "2001:db8::/64")
+        self.assertEqual(lockout.dimensions("unknown", ""), [])
+
+    # Test: A locked out login is refused before the password is checked
+    def test_locked_out(self):
+        with (
+            mock.patch.object(lockout, "locked_for", return_value=60) as locked_for,
+            mock.patch.object(ModelBackend, "authenticate") as authenticate,
+        ):
+            response = self._login("pass12345")
+
+        locked_for.assert_called_once_with("127.0.0.1", "juan@example.com")
+        authenticate.assert_not_called()
+        self.assertContains(response, "Too many failed login attempts")
+        self.assertNotIn("_auth_user_id", self.client.session)
+
+    # Test: Without Redis, allauth's login_failed limit still applies
+    @override_settings(ACCOUNT_RATE_LIMITS={"login_failed": "2/m/ip"})
+    def test_fallback_rate_limit(self):
+        self.assertIsNone(lockout.locked_for("127.0.0.1", "juan@example.com"))
+        self._login("wrong")
+        self._login("wrong")
+        self.assertContains(self._login("pass12345"), "Too many failed login attempts")
+
+    # Test: Failed logins feed the tracker and successful ones clear the email
+    def test_signals_update_tracker(self):
+        with (
+            mock.patch.object(lockout, "record_failure") as record_failure,
+            mock.patch.object(lockout, "clear") as clear,
+        ):
+            self._login("wrong")
+            self._login("pass12345")
+
+        record_failure.assert_called_once_with("127.0.0.1", "juan@example.com")
+        clear.assert_called_once_with("email", "juan@example.com")
+
+    # Test: The offenders page is limited to superusers
+    def test_admin_page(self):
+        url = reverse("admin:login_lockouts")
+        staff = User.objects.create_user(
+            username="staff", email="staff@example.com", is_staff=True
+        )
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        admin_user = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass12345"
+        )
+        self.client.force_login(admin_user)
+        self.assertContains(self.client.get(url), "not available")
+
+        with mock.patch.object(lockout, "clear") as clear:
+            response = self.client.post(url, {"dimension": "ip", "value": "10.0.0.1"})
+        self.assertRedirects(response, url)
+        clear.assert_called_once_with("ip", "10.0.0.1")
+
+
+@override_settings(CACHES=FAKE_REDIS_CACHE)
+class LockoutTrackerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 1_700_000_000.0
+        clock = mock.Mock(time=lambda: self.now)
+        patcher = mock.patch.object(lockout, "time", clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _fail(self, times, ip="10.1.2.3", email="juan@example.com"):
+        return [lockout.record_failure(ip, email) for _ in range(times)][-1]
+
+    # Test: Reaching the limit locks the dimension, and repeats double the lock
+    def test_lock_doubles_per_strike(self):
+        self.assertEqual(self._fail(4), {})
+        self.assertEqual(lockout.locked_for("10.1.2.3", "juan@example.com"), 0)
+
+        self.assertEqual(self._fail(1), {"email": 60})
+        self.assertEqual(lockout.locked_for("10.9.9.9", "JUAN@example.com"), 60)
+        self.assertEqual(lockout.locked_for("10.1.2.3", "ana@example.com"), 0)
+
+        # The lock runs out; its window restarted when it was set
+        get_redis_client().delete(lockout._key("email", "juan@example.com", "lock"))
+        self.assertEqual(self._fail(4), {})
+        self.assertEqual(self._fail(1), {"email": 120})
+
+    # Test: Failures older than the window no longer count
+    def test_window_slides(self):
+        self._fail(4)
+        self.now += 15 * 60 + 1
+        self.assertEqual(self._fail(1), {})
+        self.assertEqual(self._fail(3), {})
+        self.assertEqual(self._fail(1), {"email": 60})
+
+    # Test: Offenders list live counts, strikes and locks until cleared
+    def test_offenders_and_clear(self):
+        self._fail(5)
+        rows = {row["dimension"]: row for row in lockout.offenders()}
+
+        # Locked offenders come first
+        self.assertEqual(list(rows)[0], "email")
+        self.assertEqual(set(rows), {"email", "ip", "subnet"})
+        self.assertEqual(rows["email"]["value"], "juan@example.com")
+        self.assertEqual(rows["email"]["strikes"], 1)
+        self.assertEqual(rows["email"]["locked_for"], 60)
+        self.assertEqual(rows["email"]["failures"], 0)
+        self.assertEqual(rows["ip"]["failures"], 5)
+        self.assertEqual(rows["subnet"]["value"], "10.1.2.0/24")
+        self.assertEqual(rows["subnet"]["last_failure"], self.now)
+
+        lockout.clear("email", "juan@example.com")
+        self.assertEqual(lockout.locked_for(email="juan@example.com"), 0)
+        self.assertEqual(
+            {row["dimension"] for row in lockout.offenders()}, {"ip", "subnet"}
+        )
+
+        # Offenders are forgotten once their strikes expire
+        self.now += lockout.STRIKE_TTL + 1
+        self.assertEqual(lockout.offenders(), [])
+
+
+class ClientIPTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    # Test: Without trusted proxies the peer address is the client
+    @override_settings(TRUSTED_PROXIES=[])
+    def test_untrusted_forwarded_for_ignored(self):
+        self.assertEqual(
+            client_ip.resolve_client_ip("203.0.113.9", "198.51.100.1"), "203.0.113.9"
+        )
+
+    # Test: Trusted hops are skipped from the right; spoofed entries are not believed
+    @override_settings(TRUSTED_PROXIES=["10.0.0.0/8", "2001:db8::/32"])
+    def test_trusted_proxies(self):
+        resolve = client_ip.resolve_client_ip
+        self.assertEqual(resolve("10.0.0.2", "198.51.100.1, 10.0.0.1"), "198.51.100.1")
+        self.assertEqual(resolve("10.0.0.2", "1.1.1.1, 198.51.100.1"), "198.51.100.1")
+        self.assertEqual(resolve("2001:db8::1", " 198.51.100.1 "), "198.51.100.1")
+        self.assertEqual(resolve("10.0.0.2", "10.0.0.3"), "10.0.0.3")
+        self.assertEqual(resolve("10.0.0.2", "junk"), "10.0.0.2")
+        self.assertIsNone(resolve("", "198.51.100.1"))
+
+    # Test: The client is resolved and enriched once per request
+    @override_settings(TRUSTED_PROXIES=["10.0.0.0/8"])
+    def test_resolved_once_per_request(self):
+        request = self.factory.get(
+            "/", REMOTE_ADDR="10.0.0.2", HTTP_X_FORWARDED_FOR="198.51.100.1"
+        )
+        with mock.patch.object(
+            client_ip, "lookup_ip", wraps=client_ip.lookup_ip
+        ) as lookup:
+            self.assertEqual(client_ip.get_client_ip(request), "198.51.100.1")
+            self.assertEqual(
+                AccountAdapter(request).get_client_ip(request), "198.51.100.1"
+            )
+        lookup.assert_called_once_with("198.51.100.1")
+
+    # Test: Country and ASN come from the configured databases
+    @override_settings(
+        GEOIP_COUNTRY_DATABASE="country.mmdb", GEOIP_ASN_DATABASE="asn.mmdb"
+    )
+    def test_enrichment(self):
+        databases = {
+            "country.mmdb": {"198.51.100.1": {"country": {"iso_code": "PH"}}},
+            "asn.mmdb": {
+                "198.51.100.1": {
+                    "autonomous_system_number": 9299,
+                    "autonomous_system_organization": "PLDT",
+                }
+            },
+        }
+        client_ip._lookup.cache_clear()
+        with mock.patch.object(client_ip, "_open_database", databases.get):
+            self.assertEqual(
+                client_ip.lookup_ip("198.51.100.1"),
+                {"ip": "198.51.100.1", "country": "PH", "asn": 9299, "as_org": "PLDT"},
+            )
+            self.assertEqual(client_ip.lookup_ip("203.0.113.9")["country"], "")
+        client_ip._lookup.cache_clear()
+
+    # Test: Without databases addresses are left unenriched
+    def test_no_databases(self):
+        self.assertEqual(
+            client_ip.lookup_ip("198.51.100.1"),
+            {"ip": "198.51.100.1", "country": "", "asn": None, "as_org": ""},
+        )
+
+    # Test: Configured databases without maxminddb are reported at startup
+    def test_missing_reader_warning(self):
+        with (
+            mock.patch.object(client_ip, "maxminddb", None),
+            mock.patch.object(client_ip.logger, "warning") as warning,
+        ):
+            client_ip.check_geoip()
+            warning.assert_not_called()
+            with override_settings(GEOIP_ASN_DATABASE="asn.mmdb"):
+                client_ip.check_geoip()
+        warning.assert_called_once()
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class WriteBehindSessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        session = SessionStore()
+        session["_auth_user_id"] = "1"
+        session.create()
+        self.key = session.session_key
+
+    # Test: Only changes to the session data count as changes
+    def test_change_detection(self):
+        session = SessionStore(self.key)
+        self.assertEqual(session["_auth_user_id"], "1")
+        self.assertFalse(session._changed())
+
+        session["_auth_user_id"] = "1"
+        self.assertFalse(session._changed())
+
+        session["cart"] = [1]
+        self.assertTrue(session._changed())
+        session.save()
+        self.assertFalse(session._changed())
+        self.assertEqual(SessionStore(self.key)["cart"], [1])
+
+    # Test: Without Redis every save is written through, as with cached_db
+    def test_fallback_writes_through(self):
+        session = SessionStore(self.key)
+        session.load()
+        with CaptureQueriesContext(connection) as queries:
+            session.save()
+        self.assertTrue(
+            any(query["sql"].startswith("UPDATE") for query in queries.captured_queries)
+        )
+        self.assertEqual(sweep_session_expiry(), 0)
+
+    # Test: The benchmark compares both stores
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command(
+            "benchmark_sessions", views=20, sessions=2, stdout=out, stderr=StringIO()
+        )
+        self.assertIn("cached_db", out.getvalue())
+        self.assertIn("write-behind", out.getvalue())
+
+
+@override_settings(CACHES=FAKE_REDIS_CACHE, SESSION_CACHE_ALIAS="default")
+class WriteBehindRedisTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        session = SessionStore()
+        session["_auth_user_id"] = "1"
+        session.create()
+        self.key = session.session_key
+        self.redis = get_redis_client()
+
+    def _save_unchanged(self, evict=False):
+        session = SessionStore(self.key)
+        self.assertEqual(session["_auth_user_id"], "1")
+        if evict:
+            self.redis.delete(cache.make_key(session.cache_key))
+        with CaptureQueriesContext(connection) as queries:
+            session.save()
+        return session, [query["sql"] for query in queries.captured_queries]
+
+    # Test: Unchanged saves slide the Redis TTL and leave the row to the sweep
+    def test_touch_defers_row_write(self):
+        cache_key = cache.make_key(SessionStore(self.key).cache_key)
+        self.redis.expire(cache_key, 10)
+
+        session, queries = self._save_unchanged()
+        self.assertEqual(queries, [])
+        self.assertGreater(self.redis.ttl(cache_key), 10)
+        expiry = self.redis.zscore(PENDING_EXPIRY_KEY, self.key)
+        self.assertAlmostEqual(expiry, time.time() + session.get_expiry_age(), delta=5)
+
+        Session.objects.filter(session_key=self.key).update(expire_date=timezone.now())
+        self.assertEqual(sweep_session_expiry(), 1)
+        self.assertAlmostEqual(
+            Session.objects.get(session_key=self.key).expire_date.timestamp(),
+            expiry,
+            delta=1,
+        )
+        self.assertFalse(self.redis.exists(PENDING_EXPIRY_KEY))
+        self.assertEqual(sweep_session_expiry(), 0)
+
+    # Test: An evicted cached copy is rewritten along with the row
+    def test_evicted_copy_writes_through(self):
+        _, queries = self._save_unchanged(evict=True)
+        self.assertTrue(any(query.startswith("UPDATE") for query in queries))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ActiveSessionsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="juan", email="juan@example.com")
+        self.url = reverse("security:sessions")
+
+    # Test: Devices are labelled from the User-Agent header
+    def test_describe_device(self):
+        self.assertEqual(
+            session_index.describe_device(
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                "(KHTML, like Gecko) Chrome/120.0 Safari/537.36 Edg/120.0"
+            ),
+            "Edge on Windows",
+        )
+        self.assertEqual(
+            session_index.describe_device(
+                "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) "
+                "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/604.1"
+            ),
+            "Safari on iOS",
+        )
+        self.assertEqual(session_index.describe_device(""), "Unknown device")
+
+    # Test: The page needs a signed-in user
+    def test_requires_login(self):
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    # Test: Without Redis the page says the index is unavailable
+    def test_unavailable_without_redis(self):
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context["sessions"])
+        self.assertIsNone(session_index.revoke_other_sessions(self.user, "key"))
+
+        response = self.client.post(self.url, {"revoke_all": "1"}, follow=True)
+        self.assertContains(response, "Active sessions are unavailable right now")
+
+
+@override_settings(
+    CACHES=FAKE_REDIS_CACHE,
+    SESSION_CACHE_ALIAS="default",
+    SESSION_ENGINE="django.contrib.sessions.backends.db",
+)
+class SessionIndexRedisTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        session_index._touched.clear()
+        self.user = User.objects.create_user(username="juan", email="juan@example.com")
+        self.redis = get_redis_client()
+        self.keys = []
+        for user_agent in ("Firefox/120.0 (X11; Linux x86_64)", ""):
+            session = DBStore()
+            session.create()
+            self.keys.append(session.session_key)
+            session_index.add_session(
+                self.user, session.session_key, {"ip": "10.0.0.1"}, user_agent
+            )
+        self.seen_key = f"sessions:user:{self.user.pk}:seen"
+
+    # Test: Sessions list with their device, current one first, keyed by an
+    # opaque id rather than the session key
+    def test_list_sessions(self):
+        sessions = session_index.list_sessions(self.user, self.keys[1])
+        self.assertEqual(
+            [(entry["device"], entry["current"]) for entry in sessions],
+            [("Unknown device", True), ("Firefox on Linux", False)],
+        )
+        self.assertEqual(sessions[1]["ip"], "10.0.0.1")
+        self.assertEqual(sessions[1]["id"], session_index.session_id(self.keys[0]))
+        self.assertNotIn("session_key", sessions[1])
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("security:sessions"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, self.keys[0])
+
+    # Test: Sessions gone from the store are dropped from the index
+    def test_list_drops_stale_sessions(self):
+        Session.objects.filter(session_key=self.keys[0]).delete()
+        sessions = session_index.list_sessions(self.user, self.keys[1])
+        self.assertEqual(len(sessions), 1)
+        self.assertEqual(self.redis.hkeys(self.seen_key), [self.keys[1].encode()])
+
+    # Test: Touches update indexed sessions at most once per interval
+    def test_touch(self):
+        self.redis.hset(self.seen_key, self.keys[0], 1)
+        session_index.touch(self.user, self.keys[0])
+        self.assertEqual(float(self.redis.hget(self.seen_key, self.keys[0])), 1)
+
+        session_index._touched.clear()
+        session_index.touch(self.user, self.keys[0])
+        self.assertAlmostEqual(
+            float(self.redis.hget(self.seen_key, self.keys[0])), time.time(), delta=5
+        )
+
+        # Revoked sessions are not indexed again
+        session_index.remove_session(self.user, self.keys[0])
+        session_index._touched.clear()
+        session_index.touch(self.user, self.keys[0])
+        self.assertIsNone(self.redis.hget(self.seen_key, self.keys[0]))
+
+    # Test: Only the user's own sessions are revoked, by id, never the current one
+    def test_revoke_sessions(self):
+        other = User.objects.create_user(username="ana", email="ana@example.com")
+        session = DBStore()
+        session.create()
+        session_index.add_session(other, session.session_key)
+
+        ids = [session_index.session_id(key) for key in self.keys]
+        self.assertEqual(
+            session_index.revoke_sessions(
+                self.user,
+                [session_index.session_id(session.session_key), ids[1]],
+                self.keys[1],
+            ),
+            0,
+        )
+        self.assertEqual(session_index.revoke_sessions(self.user, ids[:1]), 1)
+        self.assertFalse(Session.objects.filter(session_key=self.keys[0]).exists())
+        self.assertTrue(Session.objects.filter(session_key=self.keys[1]).exists())
+        self.assertTrue(
+            Session.objects.filter(session_key=session.session_key).exists()
+        )
+        self.assertEqual(session_index.revoke_sessions(self.user, ids[:1]), 0)
+
+    # Test: The page revokes a session by the id it lists
+    def test_revoke_from_page(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse("security:sessions"),
+            {"session_id": session_index.session_id(self.keys[0])},
+            follow=True,
+        )
+        self.assertContains(response, "Signed out of 1 other session")
+        self.assertFalse(Session.objects.filter(session_key=self.keys[0]).exists())
+
+    # Test: A session whose key cycled on password change is indexed again
+    def test_cycled_session_reindexed(self):
+        self.user.set_password("pass12345")
+        self.user.save()
+        self.client.force_login(self.user)
+        old_key = self.client.session.session_key
+        session_index.add_session(self.user, old_key)
+
+        response = self.client.post(
+            reverse("account_change_password"),
+            {
+                "oldpassword": "pass12345",
+                "password1": "N3w-pass-54321",
+                "password2": "N3w-pass-54321",
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        new_key = self.client.session.session_key
+        self.assertNotEqual(new_key, old_key)
+
+        sessions = session_index.list_sessions(self.user, new_key)
+        self.assertTrue(sessions[0]["current"])
+        self.assertEqual(sessions[0]["id"], session_index.session_id(new_key))
+        self.assertNotIn(
+            session_index.session_id(old_key), [entry["id"] for entry in sessions]
+        )
+
+    # Test: Signing out elsewhere revokes every session but the current one
+    def test_revoke_other_sessions(self):
+        self.assertEqual(
+            session_index.revoke_other_sessions(self.user, self.keys[1]), 1
+        )
+        self.assertFalse(Session.objects.filter(session_key=self.keys[0]).exists())
+        self.assertEqual(
+            [
+                entry["current"]
+                for entry in session_index.list_sessions(self.user, self.keys[1])
+            ],
+            [True],
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ProfileGateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="juan", email="juan@example.com", password="pass12345"
+        )
+
+    def _complete_profile(self):
+        User.objects.filter(pk=self.user.pk).update(
+            first_name="Juan", last_name="Cruz", job_title="Agent"
+        )
+
+    def _login(self):
+        return self.client.post(
+            reverse("account_login"),
+            {"login": "juan@example.com", "password": "pass12345"},
+        )
+
+    # Test: Login redirects straight to completing an incomplete profile
+    def test_login_incomplete_profile(self):
+        response = self._login()
+        self.assertRedirects(
+            response,
+            reverse("security:complete_profile"),
+            fetch_redirect_response=False,
+        )
+        self.assertNotIn(PROFILE_COMPLETE_KEY, self.client.session)
+
+    # Test: Login redirects straight to the dashboard and caches completion
+    def test_login_complete_profile(self):
+        self._complete_profile()
+        response = self._login()
+        self.assertRedirects(
+            response, reverse("analytics:dashboard"), fetch_redirect_response=False
+        )
+        self.assertTrue(self.client.session[PROFILE_COMPLETE_KEY])
+
+    # Test: Gated pages send incomplete profiles to complete them in one hop
+    def test_gated_pages_incomplete(self):
+        self.client.force_login(self.user)
+        for name in ("base:index", "analytics:dashboard"):
+            response = self.client.get(reverse(name))
+            self.assertRedirects(
+                response,
+                reverse("security:complete_profile"),
+                fetch_redirect_response=False,
+            )
+        response = self.client.get(reverse("security:complete_profile"))
+        self.assertEqual(response.status_code, 200)
+
+    # Test: Gated pages explain the redirect, except right after login
+    def test_gated_redirect_message(self):
+        response = self.client.post(
+            reverse("account_login"),
+            {
+                "login": "juan@example.com",
+                "password": "pass12345",
+                "next": reverse("analytics:dashboard"),
+            },
+            follow=True,
+        )
+        self.assertRedirects(response, reverse("security:complete_profile"))
+        self.assertNotContains(response, "Please complete your profile first")
+
+        response = self.client.get(reverse("analytics:dashboard"), follow=True)
+        self.assertContains(response, "Please complete your profile first")
+
+    # Test: Complete profiles skip the index and the complete profile page
+    def test_gated_pages_complete(self):
+        self._complete_profile()
+        self.client.force_login(self.user)
+        for name in ("base:index", "security:complete_profile"):
+            response = self.client.get(reverse(name))
+            self.assertRedirects(
+                response, reverse("analytics:dashboard"), fetch_redirect_response=False
+            )
+
+    # Test: The cached flag spares the user check on later requests
+    def test_cached_completion(self):
+        self._complete_profile()
+        self.client.force_login(self.user)
+        self.client.get(reverse("base:index"))
+        User.objects.filter(pk=self.user.pk).update(first_name="")
+        cache.clear()
+        response = self.client.get(reverse("base:index"))
+        self.assertRedirects(
+            response, reverse("analytics:dashboard"), fetch_redirect_response=False
+        )
+
+    # Test: Completing the profile caches it for the rest of the session
+    def test_complete_profile_sets_flag(self):
+        self.client.force_login(self.user)
+        self.client.post(
+            reverse("security:complete_profile"),
+            {"first_name": "Juan", "last_name": "Cruz", "job_title": "Agent"},
+        )
+        self.assertTrue(self.client.session[PROFILE_COMPLETE_KEY])
+        response = self.client.get(reverse("base:index"))
+        self.assertRedirects(
+            response, reverse("analytics:dashboard"), fetch_redirect_response=False
+        )
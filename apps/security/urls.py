@@ -12,4 +12,12 @@ urlpatterns = [
     ),
     # Edit User Profile
     path("profile/edit/", views.EditProfileView.as_view(), name="edit_profile"),
+    # Active Sessions
+    path("profile/sessions/", views.ActiveSessionsView.as_view(), name="sessions"),
+    # Username/Email Availability
+    path(
+        "account/availability/",
+        views.check_availability,
+        name="check_availability",
+    ),
 ]
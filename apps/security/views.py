@@ -1,13 +1,23 @@
 import logging
 
+from allauth.core import ratelimit
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.http import JsonResponse
 from django.shortcuts import redirect
-from django.urls import reverse, reverse_lazy
-from django.views.generic import UpdateView
+from django.urls import reverse_lazy
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+from django.views.generic import TemplateView, UpdateView
 
+from apps.common.validators import username_validator
+from apps.users.availability import AVAILABILITY_FIELDS, is_available
 from apps.users.models import User
+from apps.users.validators import EMAIL_TAKEN_MESSAGE, USERNAME_TAKEN_MESSAGE
 
+from . import profile_gate, session_index
 from .forms import CompleteProfileForm, EditProfileForm
 
 logger = logging.getLogger("apps.security")
@@ -24,14 +34,9 @@ class CompleteProfileView(LoginRequiredMixin, UpdateView):
         return self.request.user
 
     def get(self, request, *args, **kwargs):
-        # If profile is already complete, redirect to dashboard
-        user = request.user
-        if user.is_profile_complete:
-            messages.info(request, "Your profile is already complete")
-            return redirect(reverse("analytics:dashboard"))
-        else:
-            # Toast message
-            messages.info(request, "Please complete your profile to continue")
+        # Complete profiles are redirected by ProfileGateMiddleware
+        # Toast message
+        messages.info(request, "Please complete your profile to continue")
 
         return super().get(request, *args, **kwargs)
 
@@ -40,14 +45,16 @@ class CompleteProfileView(LoginRequiredMixin, UpdateView):
 
         # Log profile completion
         logger.info(
-            f"Profile completed for user: {user.username} "
-            f"(Employee ID: {user.get_field('employee_id')}, "
-            f"Email: {user.get_field('email')}, "
-            f"Phone: {user.get_field('phone')}, "
-            f"First Name: {user.get_field('first_name')}, "
-            f"Last Name: {user.get_field('last_name')}, "
-            f"Job Title: {user.get_field('job_title')}, "
-            f"Team: {user.get_field('team')})"
+            "Profile completed for user: %s (Employee ID: %s, Email: %s, "
+            "Phone: %s, First Name: %s, Last Name: %s, Job Title: %s, Team: %s)",
+            user.username,
+            user.get_field("employee_id"),
+            user.get_field("email"),
+            user.get_field("phone"),
+            user.get_field("first_name"),
+            user.get_field("last_name"),
+            user.get_field("job_title"),
+            user.get_field("team"),
         )
 
         # Toast message
@@ -55,6 +62,7 @@ class CompleteProfileView(LoginRequiredMixin, UpdateView):
 
         # Skip OTP verification on profile completion
         self.request.session["otp_verified"] = True
+        self.request.session[profile_gate.SESSION_KEY] = True
 
         return super().form_valid(form)
 
@@ -73,9 +81,87 @@ class EditProfileView(LoginRequiredMixin, UpdateView):
         user = form.save()
 
         # Log profile update
-        logger.info(f"Profile updated for user: {user.username}")
+        logger.info("Profile updated for user: %s", user.username)
+
+        # Required fields may have been cleared
+        if not user.is_profile_complete:
+            profile_gate.forget_profile_complete(self.request)
 
         # Toast message
         messages.success(self.request, "Your profile has been updated successfully!")
 
         return super().form_valid(form)
+
+
+# Active Sessions View
+class ActiveSessionsView(LoginRequiredMixin, TemplateView):
+    template_name = "account/sessions.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        sessions = session_index.list_sessions(
+            self.request.user, self.request.session.session_key
+        )
+        for entry in sessions or []:
+            for field in ("created_at", "last_seen"):
+                entry[field] = timezone.datetime.fromtimestamp(
+                    entry[field], timezone.get_current_timezone()
+                )
+        context["sessions"] = sessions
+        context["other_sessions"] = sum(
+            not entry["current"] for entry in sessions or []
+        )
+        return context
+
+    def post(self, request, *args, **kwargs):
+        current_key = request.session.session_key
+        if "revoke_all" in request.POST:
+            revoked = session_index.revoke_other_sessions(request.user, current_key)
+        else:
+            # The current session is ended by signing out, not from here
+            revoked = session_index.revoke_sessions(
+                request.user, request.POST.getlist("session_id"), current_key
+            )
+
+        # Toast message
+        if revoked is None:
+            messages.error(request, "Active sessions are unavailable right now")
+        elif revoked:
+            messages.success(
+                request,
+                f"Signed out of {revoked} other session{'s' if revoked != 1 else ''}",
+            )
+        else:
+            messages.info(request, "No other sessions were signed out")
+        return redirect("security:sessions")
+
+
+# Username/Email Availability
+@require_POST
+def check_availability(request):
+    # Called while typing; POST keeps addresses out of access logs and lets
+    # allauth's rate limiter (ACCOUNT_RATE_LIMITS["check_availability"]) apply
+    if not ratelimit.consume(request, action="check_availability"):
+        return JsonResponse({"error": "Too many requests"}, status=429)
+
+    field = request.POST.get("field")
+    value = request.POST.get("value", "").strip()
+    if field not in AVAILABILITY_FIELDS or not value:
+        return JsonResponse({"error": "Invalid request"}, status=400)
+
+    # Format errors are reported without touching Redis or the database
+    try:
+        if field == "email":
+            validate_email(value)
+        else:
+            username_validator(value)
+    except ValidationError as error:
+        return JsonResponse({"available": False, "message": error.messages[0]})
+
+    # A user's own username or email is not taken for them
+    exclude_pk = request.user.pk if request.user.is_authenticated else None
+    if is_available(field, value, exclude_pk):
+        return JsonResponse({"available": True, "message": ""})
+
+    message = EMAIL_TAKEN_MESSAGE if field == "email" else USERNAME_TAKEN_MESSAGE
+    return JsonResponse({"available": False, "message": message})
@@ -5,8 +5,14 @@ from django.contrib.auth.models import Group as BaseGroup
 from unfold.admin import ModelAdmin
 from unfold.forms import AdminPasswordChangeForm, UserCreationForm
 
+from apps.common.admin import (
+    IndexedSearchAdminMixin,
+    KeysetPaginationAdminMixin,
+    SortableAdminMixin,
+)
 from apps.users.filters import (
     ActiveStatusFilter,
+    GroupFilter,
     StaffStatusFilter,
     SuperuserStatusFilter,
 )
@@ -28,7 +34,9 @@ for model in MODELS:
 
 # Group Model
 @admin.register(Group)
-class GroupAdmin(BaseGroupAdmin, ModelAdmin):
+class GroupAdmin(
+    SortableAdminMixin, KeysetPaginationAdminMixin, BaseGroupAdmin, ModelAdmin
+):
     search_fields = ["name"]
     ordering = ["order", "name"]
     list_display = ["name", "order"]
@@ -37,7 +45,9 @@ class GroupAdmin(BaseGroupAdmin, ModelAdmin):
 
 # User Model
 @admin.register(User)
-class UserAdmin(BaseUserAdmin, ModelAdmin):
+class UserAdmin(
+    IndexedSearchAdminMixin, KeysetPaginationAdminMixin, BaseUserAdmin, ModelAdmin
+):
     form = UserAdminForm
     add_form = UserCreationForm
     change_password_form = AdminPasswordChangeForm
@@ -48,7 +58,7 @@ class UserAdmin(BaseUserAdmin, ModelAdmin):
         ActiveStatusFilter,
         StaffStatusFilter,
         SuperuserStatusFilter,
-        "groups",
+        GroupFilter,
     ]
     list_display = ["full_name", "username", "job_title", "date_joined_display"]
     fieldsets = (
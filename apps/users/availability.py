@@ -0,0 +1,212 @@
+import hashlib
+import logging
+from itertools import batched
+
+from allauth.account.models import EmailAddress
+from django.db.models import Q
+from kombu.exceptions import OperationalError
+
+from apps.common.cache import CACHE_ERRORS, get_redis_client
+from apps.users.models import User
+
+logger = logging.getLogger("apps.users")
+
+# Fields the availability check answers for
+AVAILABILITY_FIELDS = ("username", "email")
+
+KEY_PREFIX = "users:availability"
+
+# Bloom filter size per field: 2**20 bits (128 KiB) and 7 hashes keep false
+# positives around 1% up to ~100k values. False positives only cost a query.
+BLOOM_BITS = 1 << 20
+BLOOM_HASHES = 7
+
+# Values written per pipeline while rebuilding
+REBUILD_CHUNK_SIZE = 1000
+
+# Held while a build queued for missing filters is pending, so a burst of
+# checks queues one build. Expires in case the build never runs.
+BUILD_LOCK_KEY = f"{KEY_PREFIX}:build-queued"
+BUILD_LOCK_TTL = 10 * 60
+
+# Set bits only on filters that exist, so a partial filter never looks built.
+# KEYS are the live filter and the one being rebuilt.
+ADD_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    if redis.call('exists', key) == 1 then
+        for _, offset in ipairs(ARGV) do
+            redis.call('setbit', key, offset, 1)
+        end
+    end
+end
+"""
+
+
+def filter_key(field):
+    return f"{KEY_PREFIX}:{field}"
+
+
+def normalize(value):
+    # Lookups are case-insensitive, so "Juan" and "juan" collide
+    return (value or "").strip().lower()
+
+
+def bit_positions(value):
+    # Double hashing: k positions derived from one 128-bit digest
+    digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+    first = int.from_bytes(digest[:8], "big")
+    second = int.from_bytes(digest[8:], "big") | 1
+    return [(first + i * second) % BLOOM_BITS for i in range(BLOOM_HASHES)]
+
+
+def might_be_taken(field, value):
+    # False when the filter rules the value out, True on a possible hit and
+    # None when there is no filter to ask
+    client = get_redis_client()
+    if client is None:
+        return None
+
+    key = filter_key(field)
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.exists(key)
+        for position in bit_positions(value):
+            pipe.getbit(key, position)
+        exists, *bits = pipe.execute()
+    except CACHE_ERRORS:
+        logger.warning("Availability filter unreachable, checking the database")
+        return None
+
+    if not exists:
+        queue_build(client)
+        return None
+    return all(bits)
+
+
+def queue_build(client):
+    # Build the filters in the background, once, rather than answering every
+    # check from the database until the scheduled rebuild
+    from apps.users.tasks import rebuild_availability_filters
+
+    try:
+        if not client.set(BUILD_LOCK_KEY, 1, nx=True, ex=BUILD_LOCK_TTL):
+            return
+    except CACHE_ERRORS:
+        return
+    try:
+        rebuild_availability_filters.delay()
+    except OperationalError:
+        logger.warning("Availability filter build not queued, broker unreachable")
+        client.delete(BUILD_LOCK_KEY)
+
+
+def ensure_filters():
+    # Queue a build when any filter is missing, e.g. after a deploy or a flush
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        built = client.exists(*map(filter_key, AVAILABILITY_FIELDS))
+    except CACHE_ERRORS:
+        logger.warning("Availability filters unreachable, build not queued")
+        return
+    if built < len(AVAILABILITY_FIELDS):
+        queue_build(client)
+
+
+def is_taken(field, value, exclude_pk=None):
+    # Authoritative check, matching allauth's signup rules for emails
+    if field == "email":
+        query = User.objects.filter(
+            Q(email__iexact=value) | Q(emailaddress__email__iexact=value)
+        )
+    else:
+        query = User.objects.filter(username__iexact=value)
+
+    if exclude_pk is not None:
+        query = query.exclude(pk=exclude_pk)
+    return query.exists()
+
+
+def is_available(field, value, exclude_pk=None):
+    # The database is only consulted when the filter can't rule the value out
+    value = normalize(value)
+    if not value:
+        return False
+    if might_be_taken(field, value) is False:
+        return True
+    return not is_taken(field, value, exclude_pk)
+
+
+def mark_taken(field, values):
+    # Add values to the filter; a no-op until the filter has been built
+    offsets = {
+        position
+        for value in map(normalize, values)
+        if value
+        for position in bit_positions(value)
+    }
+    client = get_redis_client()
+    if client is None or not offsets:
+        return
+
+    key = filter_key(field)
+    try:
+        client.eval(ADD_SCRIPT, 2, key, f"{key}:rebuild", *sorted(offsets))
+    except CACHE_ERRORS:
+        logger.warning("Availability filter update skipped, cache unreachable")
+
+
+def mark_users_taken(users):
+    users = list(users)
+    mark_taken("username", (user.username for user in users))
+    mark_taken("email", (user.email for user in users))
+
+
+def taken_values(field):
+    # Every value the filter must contain, streamed from the database
+    if field == "email":
+        yield from User.objects.values_list("email", flat=True).iterator()
+        yield from EmailAddress.objects.values_list("email", flat=True).iterator()
+    else:
+        yield from User.objects.values_list("username", flat=True).iterator()
+
+
+def rebuild_filters():
+    # Build fresh filters beside the live ones and swap them in atomically.
+    # Removed or renamed values leave stale bits behind until the next rebuild.
+    client = get_redis_client()
+    if client is None:
+        return {}
+
+    counts = {}
+    for field in AVAILABILITY_FIELDS:
+        key = filter_key(field)
+        building = f"{key}:rebuild"
+        count = 0
+        try:
+            client.delete(building)
+            # Allocate the bitmap up front so concurrent adds reach it too
+            client.setbit(building, BLOOM_BITS - 1, 0)
+            for chunk in batched(
+                map(normalize, taken_values(field)), REBUILD_CHUNK_SIZE
+            ):
+                pipe = client.pipeline(transaction=False)
+                for value in chunk:
+                    if value:
+                        for position in bit_positions(value):
+                            pipe.setbit(building, position, 1)
+                pipe.execute()
+                count += len(chunk)
+            client.rename(building, key)
+        except CACHE_ERRORS:
+            logger.warning("Availability filter rebuild failed, cache unreachable")
+            return counts
+        counts[field] = count
+
+    try:
+        client.delete(BUILD_LOCK_KEY)
+    except CACHE_ERRORS:
+        pass
+    logger.info("Rebuilt availability filters: %s", counts)
+    return counts
@@ -0,0 +1,94 @@
+import logging
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from apps.common.cache import CACHE_ERRORS
+
+logger = logging.getLogger("apps.users")
+
+# Boolean user fields with maintained counts
+FACET_FLAGS = ["is_active", "is_staff", "is_superuser"]
+
+KEY_PREFIX = "users:facets"
+
+
+def flag_key(flag, value):
+    return f"{KEY_PREFIX}:{flag}:{int(bool(value))}"
+
+
+def group_key(group_id):
+    return f"{KEY_PREFIX}:group:{group_id}"
+
+
+def get_counts(keys):
+    # Fetch counters in one cache round-trip; empty when the cache is down
+    try:
+        return cache.get_many(keys)
+    except CACHE_ERRORS:
+        logger.warning("Facet counts unavailable, cache unreachable")
+        return {}
+
+
+def get_flag_counts(request):
+    # Counts for every flag filter, shared across filters on the same request
+    if not hasattr(request, "_user_flag_counts"):
+        request._user_flag_counts = get_counts(
+            [flag_key(flag, value) for flag in FACET_FLAGS for value in (1, 0)]
+        )
+    return request._user_flag_counts
+
+
+def with_count(label, counts, key):
+    # Append "(1,204)" to a filter label when the count is known
+    count = counts.get(key)
+    return label if count is None else f"{label} ({count:,})"
+
+
+def adjust_facets(deltas):
+    # Apply counter deltas; uninitialized counters wait for reconciliation
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            pass
+        except CACHE_ERRORS:
+            logger.warning("Facet counter update skipped, cache unreachable")
+            return
+
+
+def discard_facets(keys):
+    try:
+        cache.delete_many(keys)
+    except CACHE_ERRORS:
+        logger.warning("Facet counter removal skipped, cache unreachable")
+
+
+def count_new_users(users):
+    # Counter deltas for freshly inserted users (bulk_create skips signals)
+    deltas = Counter()
+    for user in users:
+        for flag in FACET_FLAGS:
+            deltas[flag_key(flag, getattr(user, flag))] += 1
+    return deltas
+
+
+def reconcile_facets():
+    # Recompute every counter from the database and overwrite the cache
+    from apps.users.models import Group, User
+
+    aggregates = {}
+    for flag in FACET_FLAGS:
+        aggregates[flag_key(flag, 1)] = Count("pk", filter=Q(**{flag: True}))
+        aggregates[flag_key(flag, 0)] = Count("pk", filter=Q(**{flag: False}))
+    counts = User.objects.aggregate(**aggregates)
+
+    groups = Group.objects.annotate(members=Count("user")).values_list("pk", "members")
+    counts.update({group_key(pk): members for pk, members in groups})
+
+    cache.set_many(counts, timeout=None)
+    logger.info("Reconciled %s user facet counters", len(counts))
+    return counts
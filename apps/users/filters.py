@@ -1,58 +1,60 @@
 from django.contrib.admin import SimpleListFilter
 
+from apps.users.facets import (
+    flag_key,
+    get_counts,
+    get_flag_counts,
+    group_key,
+    with_count,
+)
+from apps.users.models import Group
 
-class ActiveStatusFilter(SimpleListFilter):
-    title = "Active Status"
-    parameter_name = "is_active"
 
+class FlagCountFilter(SimpleListFilter):
     def lookups(self, request, model_admin):
-        # Define filter options
+        # Define filter options, labelled with cached counts
+        counts = get_flag_counts(request)
         return (
-            ("1", "Yes"),
-            ("0", "No"),
+            ("1", with_count("Yes", counts, flag_key(self.parameter_name, 1))),
+            ("0", with_count("No", counts, flag_key(self.parameter_name, 0))),
         )
 
     def queryset(self, request, queryset):
         # Filter queryset based on selection
         if self.value() == "1":
-            return queryset.filter(is_active=True)
+            return queryset.filter(**{self.parameter_name: True})
         if self.value() == "0":
-            return queryset.filter(is_active=False)
+            return queryset.filter(**{self.parameter_name: False})
 
 
-class StaffStatusFilter(SimpleListFilter):
-    title = "Staff Status"
-    parameter_name = "is_staff"
+class ActiveStatusFilter(FlagCountFilter):
+    title = "Active Status"
+    parameter_name = "is_active"
 
-    def lookups(self, request, model_admin):
-        # Define filter options
-        return (
-            ("1", "Yes"),
-            ("0", "No"),
-        )
 
-    def queryset(self, request, queryset):
-        # Filter queryset based on selection
-        if self.value() == "1":
-            return queryset.filter(is_staff=True)
-        if self.value() == "0":
-            return queryset.filter(is_staff=False)
+class StaffStatusFilter(FlagCountFilter):
+    title = "Staff Status"
+    parameter_name = "is_staff"
 
 
-class SuperuserStatusFilter(SimpleListFilter):
+class SuperuserStatusFilter(FlagCountFilter):
     title = "Superuser Status"
     parameter_name = "is_superuser"
 
+
+class GroupFilter(SimpleListFilter):
+    title = "Groups"
+    parameter_name = "groups__id__exact"
+
     def lookups(self, request, model_admin):
-        # Define filter options
-        return (
-            ("1", "Yes"),
-            ("0", "No"),
-        )
+        # Define filter options, labelled with cached member counts
+        groups = list(Group.objects.values_list("pk", "name"))
+        counts = get_counts([group_key(pk) for pk, _ in groups])
+        return [
+            (str(pk), with_count(name, counts, group_key(pk))) for pk, name in groups
+        ]
 
     def queryset(self, request, queryset):
         # Filter queryset based on selection
-        if self.value() == "1":
-            return queryset.filter(is_superuser=True)
-        if self.value() == "0":
-            return queryset.filter(is_superuser=False)
+        if self.value():
+            return queryset.filter(groups__id=self.value())
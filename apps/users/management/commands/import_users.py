@@ -0,0 +1,75 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.models import User
+from apps.users.provisioning import DEFAULT_BATCH_SIZE, PROVISION_FIELDS
+
+
+class Command(BaseCommand):
+    help = "Bulk import users from a CSV file with a header row."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to the CSV file to import")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Rows validated and inserted per batch (default: {DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Password hashing processes (default: CPU count, 1 disables the pool)",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+
+        # Read errors surface the same way as a missing or unreadable file
+        try:
+            with open(path, newline="", encoding="utf-8-sig") as csv_file:
+                summary = self._import(csv_file, options)
+        except OSError as error:
+            raise CommandError(f"Cannot read {path}: {error}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {summary['created']} of {summary['processed']} users "
+                f"({summary['failed']} failed)"
+            )
+        )
+
+    def _import(self, csv_file, options):
+        reader = csv.DictReader(csv_file)
+
+        # Validate header before streaming rows
+        columns = set(reader.fieldnames or [])
+        if "email" not in columns:
+            raise CommandError("CSV must include an 'email' column")
+
+        unknown = columns - set(PROVISION_FIELDS)
+        if unknown:
+            self.stderr.write(
+                self.style.WARNING(
+                    f"Ignoring unknown columns: {', '.join(sorted(unknown))}"
+                )
+            )
+
+        return User.objects.bulk_provision(
+            reader,
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            on_progress=self._report_progress,
+            on_error=self._report_error,
+            start=2,  # Line 1 is the header
+        )
+
+    def _report_progress(self, processed, created, failed):
+        self.stdout.write(
+            f"Processed {processed} rows: {created} created, {failed} failed"
+        )
+
+    def _report_error(self, row_number, messages):
+        self.stderr.write(self.style.ERROR(f"Line {row_number}: {'; '.join(messages)}"))
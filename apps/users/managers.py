@@ -1,26 +1,70 @@
 import logging
 
+from django.contrib.auth.models import GroupManager as BaseGroupManager
 from django.contrib.auth.models import UserManager as BaseUserManager
+from django.db import IntegrityError, transaction
+
+from apps.common.managers import OrderingQuerySet
 
 logger = logging.getLogger("apps.users")
 
+# Attempts made when a concurrent signup claims the generated username first
+USERNAME_RETRY_LIMIT = 3
+
+# Widest numeric suffix reserved when truncating long base usernames
+USERNAME_SUFFIX_DIGITS = 6
+
+
+class GroupManager(BaseGroupManager.from_queryset(OrderingQuerySet)):
+    # Natural key lookups plus move() and rebalance()
+    pass
+
 
 class UserManager(BaseUserManager):
-    def _generate_username(self, first_name, last_name):
-        # Generate unique username from first and last name
+    def _username_max_length(self):
+        return self.model._meta.get_field("username").max_length
+
+    def _base_username(self, first_name, last_name):
+        # Build "first.last" base username from first and last name
         first_clean = first_name.replace(" ", "").lower()
         last_clean = last_name.replace(" ", "").lower()
-        base_username = f"{first_clean}.{last_clean}"
-        username = base_username[:50]
+        return f"{first_clean}.{last_clean}"
+
+    def _next_free_username(self, base_username, taken):
+        # Pick the first free "base", "base1", "base2"... against a set of taken names
+        max_length = self._username_max_length()
+        username = base_username[:max_length]
         counter = 1
 
-        # Handle duplicates by appending a number
-        while self.model.objects.filter(username=username).exists():
-            username = f"{base_username}{counter}"
+        while username in taken:
+            suffix = str(counter)
+            username = f"{base_username[: max_length - len(suffix)]}{suffix}"
             counter += 1
 
+        return username
+
+    def _username_prefix(self, base_username):
+        # Shortest stem any generated variant of the base username starts with
+        return base_username[: self._username_max_length() - USERNAME_SUFFIX_DIGITS]
+
+    def _taken_usernames(self, base_username):
+        # Fetch every existing username that could collide with the base in one query
+        prefix = self._username_prefix(base_username)
+        return set(
+            self.filter(username__startswith=prefix).values_list("username", flat=True)
+        )
+
+    def _generate_username(self, first_name, last_name):
+        # Generate unique username from first and last name
+        base_username = self._base_username(first_name, last_name)
+        username = self._next_free_username(
+            base_username, self._taken_usernames(base_username)
+        )
+
         if username != base_username:
-            logger.debug(f"Username collision resolved: {base_username} -> {username}")
+            logger.debug(
+                "Username collision resolved: %s -> %s", base_username, username
+            )
 
         return username
 
@@ -30,21 +74,57 @@ class UserManager(BaseUserManager):
             raise ValueError("Email is required")
 
         # Auto-generate username if not provided
-        if not extra_fields.get("username"):
-            first_name = extra_fields.get("first_name")
-            last_name = extra_fields.get("last_name")
+        first_name = extra_fields.get("first_name")
+        last_name = extra_fields.get("last_name")
+        generate_username = not extra_fields.get("username") and bool(
+            first_name and last_name
+        )
 
-            if first_name and last_name:
-                extra_fields["username"] = self._generate_username(
-                    first_name, last_name
-                )
+        if generate_username:
+            extra_fields["username"] = self._generate_username(first_name, last_name)
 
         # Create user
         email = self.normalize_email(email)
         user = self.model(email=email, **extra_fields)
         user.set_password(password)
-        user.save(using=self._db)
-        return user
+
+        # Retry with a fresh username if a concurrent signup claimed it first
+        for attempt in range(1, USERNAME_RETRY_LIMIT + 1):
+            try:
+                with transaction.atomic(using=self._db):
+                    user.save(using=self._db)
+                return user
+            except IntegrityError:
+                if (
+                    not generate_username
+                    or attempt == USERNAME_RETRY_LIMIT
+                    or not self.filter(username=user.username).exists()
+                ):
+                    raise
+
+                logger.debug(
+                    "Username %s taken during signup, retrying (attempt %s)",
+                    user.username,
+                    attempt,
+                )
+                user.username = self._generate_username(first_name, last_name)
+
+    def bulk_provision(
+        self,
+        rows,
+        batch_size=None,
+        workers=None,
+        on_progress=None,
+        on_error=None,
+        start=1,
+    ):
+        # Validate, hash and insert user rows (dicts) in batches via bulk_create
+        from apps.users.provisioning import UserProvisioner
+
+        provisioner = UserProvisioner(self, batch_size=batch_size, workers=workers)
+        return provisioner.run(
+            rows, on_progress=on_progress, on_error=on_error, start=start
+        )
 
     def create_superuser(self, email, password=None, **extra_fields):
         # Set superuser defaults
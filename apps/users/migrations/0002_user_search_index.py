@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from apps.common.search import install_search_index, uninstall_search_index
+
+SEARCH_FIELDS = ["username", "email", "first_name", "last_name"]
+
+
+def create_search_index(apps, schema_editor):
+    install_search_index(schema_editor, apps.get_model("users", "User"), SEARCH_FIELDS)
+
+
+def drop_search_index(apps, schema_editor):
+    uninstall_search_index(schema_editor, apps.get_model("users", "User"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
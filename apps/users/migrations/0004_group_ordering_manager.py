@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:23
+
+import apps.users.managers
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_date_joined_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='group',
+            managers=[
+                ('objects', apps.users.managers.GroupManager()),
+            ],
+        ),
+    ]
@@ -7,12 +7,15 @@ from phonenumber_field.modelfields import PhoneNumberField
 
 from apps.common.mixins import OrderingMixin
 
-from .managers import UserManager
+from .managers import GroupManager, UserManager
 
 logger = logging.getLogger("apps.users")
 
 
 class Group(OrderingMixin, BaseGroup):
+    # Custom manager
+    objects = GroupManager()
+
     class Meta:
         proxy = False
         ordering = ["order", "name"]
@@ -54,6 +57,7 @@ class User(AbstractUser):
         indexes = [
             models.Index(fields=["email"]),
             models.Index(fields=["first_name", "last_name"]),
+            models.Index(fields=["date_joined", "id"]),
         ]
 
     def save(self, *args, **kwargs):
@@ -63,12 +67,14 @@ class User(AbstractUser):
         if is_new:
             # Log new user
             logger.info(
-                f"New user created: {self.username} "
-                f"Email: {self.get_field('email')}, "
-                f"Phone: {self.get_field('phone')}, "
-                f"First Name: {self.get_field('first_name')}, "
-                f"Last Name: {self.get_field('last_name')}, "
-                f"Job Title: {self.get_field('job_title')}"
+                "New user created: %s Email: %s, Phone: %s, First Name: %s, "
+                "Last Name: %s, Job Title: %s",
+                self.username,
+                self.get_field("email"),
+                self.get_field("phone"),
+                self.get_field("first_name"),
+                self.get_field("last_name"),
+                self.get_field("job_title"),
             )
 
     @property
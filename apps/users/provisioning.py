@@ -0,0 +1,267 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from apps.common.validators import human_name_validator, username_validator
+from apps.users.availability import mark_users_taken
+from apps.users.facets import adjust_facets, count_new_users
+from apps.users.validators import validate_unique_emails
+
+logger = logging.getLogger("apps.users")
+
+# Rows validated, hashed and inserted together
+DEFAULT_BATCH_SIZE = 500
+
+# Columns accepted from provisioning rows
+PROVISION_FIELDS = [
+    "email",
+    "username",
+    "first_name",
+    "last_name",
+    "job_title",
+    "phone",
+    "password",
+]
+
+# Fields validated by the engine itself rather than by model field cleaning
+ENGINE_VALIDATED_FIELDS = {"email", "username", "password"}
+
+
+def _init_worker():
+    # Make sure Django is configured in spawned hashing processes
+    django.setup()
+
+
+def _hash_password(password):
+    # Runs in a worker process; None yields an unusable password
+    return make_password(password or None)
+
+
+def _batches(rows, size, start):
+    # Yield (row_number, row) batches without materializing the whole input
+    numbered = enumerate(rows, start=start)
+    while batch := list(islice(numbered, size)):
+        yield batch
+
+
+class UserProvisioner:
+    def __init__(self, manager, batch_size=None, workers=None):
+        self.manager = manager
+        self.model = manager.model
+        self.batch_size = batch_size or DEFAULT_BATCH_SIZE
+        self.workers = workers
+        self.processed = 0
+        self.created = 0
+        self.failed = 0
+
+    def run(self, rows, on_progress=None, on_error=None, start=1):
+        # Provision users batch by batch, reporting progress and per-row errors
+        executor = None
+        if self.workers is None or self.workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker
+            )
+
+        try:
+            for batch in _batches(rows, self.batch_size, start):
+                errors = self._process_batch(batch, executor)
+                self.processed += len(batch)
+                self.failed += len(errors)
+
+                if on_error:
+                    for row_number, messages in errors:
+                        on_error(row_number, messages)
+                if on_progress:
+                    on_progress(self.processed, self.created, self.failed)
+        finally:
+            if executor:
+                executor.shutdown()
+
+        logger.info(
+            "Bulk provisioning finished: %s processed, %s created, %s failed",
+            self.processed,
+            self.created,
+            self.failed,
+        )
+        return {
+            "processed": self.processed,
+            "created": self.created,
+            "failed": self.failed,
+        }
+
+    def _process_batch(self, batch, executor):
+        errors = []
+        pending = []
+
+        # Validate rows without touching the database
+        for row_number, row in batch:
+            values = self._normalize_row(row)
+            messages = self._validate_row(values)
+            if messages:
+                errors.append((row_number, messages))
+            else:
+                pending.append((row_number, values))
+
+        # Reject emails already registered or repeated within the batch
+        pending = self._check_emails(pending, errors)
+
+        # Assign usernames against a single prefetch of existing names
+        pending = self._assign_usernames(pending, errors)
+
+        if not pending:
+            return errors
+
+        # Hash passwords in the process pool
+        passwords = [values.pop("password", None) for _, values in pending]
+        if executor:
+            workers = self.workers or os.cpu_count() or 1
+            chunksize = max(1, len(passwords) // (workers * 4))
+            hashes = list(executor.map(_hash_password, passwords, chunksize=chunksize))
+        else:
+            hashes = [_hash_password(password) for password in passwords]
+
+        users = []
+        for (row_number, values), password in zip(pending, hashes):
+            users.append((row_number, self.model(password=password, **values)))
+
+        errors.extend(self._insert(users))
+        errors.sort(key=lambda error: error[0])
+        return errors
+
+    def _normalize_row(self, row):
+        values = {}
+        for field in PROVISION_FIELDS:
+            value = (row.get(field) or "").strip()
+            if value:
+                values[field] = value
+
+        if "email" in values:
+            values["email"] = self.manager.normalize_email(values["email"])
+        return values
+
+    def _validate_row(self, values):
+        messages = []
+
+        email = values.get("email")
+        if not email:
+            messages.append("email: Email is required")
+        else:
+            try:
+                validate_email(email)
+            except ValidationError as error:
+                messages.extend(f"email: {message}" for message in error.messages)
+
+        if "username" in values:
+            try:
+                username_validator(values["username"])
+            except ValidationError as error:
+                messages.extend(f"username: {message}" for message in error.messages)
+        elif not (values.get("first_name") and values.get("last_name")):
+            messages.append(
+                "username: Provide a username or both first_name and last_name"
+            )
+
+        for field in ["first_name", "last_name"]:
+            if field in values:
+                try:
+                    human_name_validator(values[field])
+                except ValidationError as error:
+                    messages.extend(f"{field}: {message}" for message in error.messages)
+
+        # Run model field validation (lengths, phone format) on provided columns
+        provided = values.keys() - ENGINE_VALIDATED_FIELDS
+        user = self.model(**{field: values[field] for field in provided})
+        try:
+            user.clean_fields(
+                exclude=[
+                    field.name
+                    for field in self.model._meta.fields
+                    if field.name not in provided
+                ]
+            )
+        except ValidationError as error:
+            for field, field_messages in error.message_dict.items():
+                messages.extend(f"{field}: {message}" for message in field_messages)
+
+        return messages
+
+    def _check_emails(self, pending, errors):
+        # Registered emails and repeats within the batch, in one chunked lookup
+        taken = validate_unique_emails(values["email"] for _, values in pending)
+
+        valid = []
+        for index, (row_number, values) in enumerate(pending):
+            if index in taken:
+                errors.append(
+                    (row_number, [f"email: {m}" for m in taken[index].messages])
+                )
+                continue
+            valid.append((row_number, values))
+        return valid
+
+    def _assign_usernames(self, pending, errors):
+        explicit = [values["username"] for _, values in pending if "username" in values]
+        bases = {
+            self.manager._base_username(values["first_name"], values["last_name"])
+            for _, values in pending
+            if "username" not in values
+        }
+
+        # One query covering explicit usernames and every generated base prefix
+        query = Q(username__in=explicit)
+        for base in bases:
+            query |= Q(username__startswith=self.manager._username_prefix(base))
+        taken = set(self.manager.filter(query).values_list("username", flat=True))
+
+        valid = []
+        for row_number, values in pending:
+            if "username" in values:
+                if values["username"] in taken:
+                    errors.append(
+                        (
+                            row_number,
+                            ["username: A user with this username already exists."],
+                        )
+                    )
+                    continue
+            else:
+                base = self.manager._base_username(
+                    values["first_name"], values["last_name"]
+                )
+                values["username"] = self.manager._next_free_username(base, taken)
+
+            taken.add(values["username"])
+            valid.append((row_number, values))
+        return valid
+
+    def _insert(self, users):
+        try:
+            with transaction.atomic(using=self.manager.db):
+                self.manager.bulk_create(
+                    [user for _, user in users], batch_size=self.batch_size
+                )
+            self.created += len(users)
+            adjust_facets(count_new_users(user for _, user in users))
+            mark_users_taken(user for _, user in users)
+            return []
+        except IntegrityError:
+            # A concurrent writer claimed an email or username; isolate the rows
+            logger.warning("Bulk insert conflicted, retrying batch row by row")
+
+        errors = []
+        for row_number, user in users:
+            try:
+                with transaction.atomic(using=self.manager.db):
+                    user.save(using=self.manager.db)
+                self.created += 1
+            except IntegrityError:
+                errors.append((row_number, ["Email or username is already taken."]))
+        return errors
@@ -0,0 +1,158 @@
+from collections import Counter
+
+from allauth.account.models import EmailAddress
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_migrate,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from apps.users.availability import ensure_filters, mark_taken, mark_users_taken
+from apps.users.facets import (
+    FACET_FLAGS,
+    adjust_facets,
+    discard_facets,
+    flag_key,
+    group_key,
+)
+from apps.users.models import Group, User
+
+
+def _flag_state(instance):
+    # Loaded flag values, or None when any flag is deferred
+    values = [instance.__dict__.get(flag) for flag in FACET_FLAGS]
+    return None if None in values else tuple(values)
+
+
+def _adjust_on_commit(deltas):
+    # Counters only move for changes that were committed
+    if deltas:
+        transaction.on_commit(lambda: adjust_facets(deltas))
+
+
+def _linked_ids(sender, instance, reverse, pk_set):
+    # The ids in pk_set actually linked to instance; Django passes the ids
+    # asked for on remove, whether or not they were members
+    source = User.groups.field.m2m_field_name()
+    target = User.groups.field.m2m_reverse_field_name()
+    if reverse:
+        source, target = target, source
+    return set(
+        sender.objects.filter(
+            **{source: instance.pk, f"{target}__in": pk_set}
+        ).values_list(target, flat=True)
+    )
+
+
+@receiver(post_init, sender=User)
+def remember_user_flags(sender, instance, **kwargs):
+    # Keep loaded flag values to diff against on save
+    instance._facet_flags = _flag_state(instance)
+
+
+@receiver(post_save, sender=User)
+def update_flag_facets(sender, instance, created, update_fields=None, **kwargs):
+    # Move counts between "Yes" and "No" for flags that changed
+    previous = None if created else instance._facet_flags
+    current = _flag_state(instance)
+    instance._facet_flags = current
+
+    if current is None or (previous is None and not created):
+        return
+
+    deltas = Counter()
+    for index, flag in enumerate(FACET_FLAGS):
+        if previous is not None and previous[index] == current[index]:
+            continue
+        deltas[flag_key(flag, current[index])] += 1
+        if previous is not None:
+            deltas[flag_key(flag, previous[index])] -= 1
+    _adjust_on_commit(deltas)
+
+
+@receiver(pre_delete, sender=User)
+def remember_user_groups(sender, instance, **kwargs):
+    # Group rows are cascaded away without m2m_changed, capture them first
+    instance._facet_group_ids = list(instance.groups.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=User)
+def remove_user_facets(sender, instance, **kwargs):
+    deltas = Counter()
+    state = _flag_state(instance)
+    if state is not None:
+        for flag, value in zip(FACET_FLAGS, state):
+            deltas[flag_key(flag, value)] -= 1
+    for group_id in getattr(instance, "_facet_group_ids", []):
+        deltas[group_key(group_id)] -= 1
+    _adjust_on_commit(deltas)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def update_group_facets(sender, instance, action, reverse, pk_set, **kwargs):
+    # Track membership counts for user.groups and group.user_set changes
+    if action == "pre_clear":
+        if reverse:
+            instance._facet_cleared = {instance.pk: instance.user_set.count()}
+        else:
+            instance._facet_cleared = Counter(
+                instance.groups.values_list("pk", flat=True)
+            )
+        return
+
+    if action == "post_clear":
+        cleared = getattr(instance, "_facet_cleared", {})
+        _adjust_on_commit({group_key(pk): -count for pk, count in cleared.items()})
+        return
+
+    if action == "pre_remove":
+        instance._facet_removed = (
+            _linked_ids(sender, instance, reverse, pk_set) if pk_set else set()
+        )
+        return
+
+    # post_add gets only the newly linked ids; post_remove uses the members
+    # found before the delete
+    if action == "post_add":
+        changed, sign = pk_set, 1
+    elif action == "post_remove":
+        changed, sign = getattr(instance, "_facet_removed", set()), -1
+    else:
+        return
+    if not changed:
+        return
+
+    if reverse:
+        _adjust_on_commit({group_key(instance.pk): sign * len(changed)})
+    else:
+        _adjust_on_commit({group_key(pk): sign for pk in changed})
+
+
+@receiver(post_delete, sender=Group)
+def remove_group_facet(sender, instance, **kwargs):
+    discard_facets([group_key(instance.pk)])
+
+
+@receiver(post_save, sender=User)
+def mark_user_values_taken(sender, instance, **kwargs):
+    # Keep the availability filters current once the row is visible to others
+    transaction.on_commit(lambda: mark_users_taken([instance]))
+
+
+@receiver(post_save, sender=EmailAddress)
+def mark_email_address_taken(sender, instance, **kwargs):
+    email = instance.email
+    transaction.on_commit(lambda: mark_taken("email", [email]))
+
+
+@receiver(post_migrate)
+def build_availability_filters(sender, **kwargs):
+    # Deploys migrate; have the filters ready instead of waiting for the
+    # daily rebuild
+    if sender.name == "apps.users":
+        ensure_filters()
@@ -0,0 +1,16 @@
+from celery import shared_task
+
+from apps.users.availability import rebuild_filters
+from apps.users.facets import reconcile_facets
+
+
+@shared_task
+def reconcile_user_facets():
+    # Periodically correct counter drift from bulk updates and missed signals
+    return len(reconcile_facets())
+
+
+@shared_task
+def rebuild_availability_filters():
+    # Drop stale bits left by deleted or renamed users
+    return rebuild_filters()
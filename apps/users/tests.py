@@ -1,8 +1,17 @@
 import logging
+import tempfile
 import warnings
+from io import StringIO
+from unittest import mock
 
+from django.contrib.admin.sites import site
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
 # Disable all logging during tests
 logging.disable(logging.CRITICAL)
@@ -14,8 +23,14 @@ warnings.filterwarnings(
     category=UserWarning,
 )
 
+from apps.users.facets import flag_key, get_counts, group_key, reconcile_facets
+from apps.users.filters import ActiveStatusFilter, GroupFilter
+from apps.users.models import Group
+
 User = get_user_model()
 
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
 
 class UserCreationTests(TestCase):
     # Test: Create regular user with valid data
@@ -114,6 +129,323 @@ class UserUniquenessTests(TestCase):
             )
 
 
+class UsernameGenerationTests(TestCase):
+    def _create_collisions(self, base_username, count, start=0):
+        # Seed existing usernames "base", "base1", ... "base{count - 1}"
+        User.objects.bulk_create(
+            User(
+                username=base_username if i == 0 else f"{base_username}{i}",
+                email=f"{base_username}{i}@example.com",
+            )
+            for i in range(start, count)
+        )
+
+    def _signup_queries(self, email):
+        # Count queries issued by a signup that needs a generated username
+        with CaptureQueriesContext(connection) as queries:
+            User.objects.create_user(
+                first_name="Juan",
+                last_name="Dela Cruz",
+                email=email,
+                job_title="Developer",
+                password="testpass123",
+            )
+        return len(queries)
+
+    # Test: Username generation resolves collisions with a single query
+    def test_generate_username_single_query(self):
+        self._create_collisions("juan.delacruz", 300)
+        with self.assertNumQueries(1):
+            username = User.objects._generate_username("Juan", "Dela Cruz")
+        self.assertEqual(username, "juan.delacruz300")
+
+    # Test: Generated username fills the first free suffix
+    def test_generate_username_fills_gap(self):
+        self._create_collisions("juan.delacruz", 2)
+        self._create_collisions("juan.delacruz", 5, start=3)
+        self.assertEqual(
+            User.objects._generate_username("Juan", "Dela Cruz"), "juan.delacruz2"
+        )
+
+    # Test: Long names are truncated so the suffix still fits
+    def test_generate_username_respects_max_length(self):
+        first_name = "a" * 30
+        last_name = "b" * 30
+        User.objects.create_user(
+            first_name=first_name,
+            last_name=last_name,
+            email="long1@example.com",
+            password="testpass123",
+        )
+        user = User.objects.create_user(
+            first_name=first_name,
+            last_name=last_name,
+            email="long2@example.com",
+            password="testpass123",
+        )
+        self.assertEqual(len(user.username), 50)
+        self.assertTrue(user.username.endswith("1"))
+
+    # Test: Signup retries when a concurrent signup claims the username first
+    def test_create_user_retries_on_username_race(self):
+        self._create_collisions("juan.delacruz", 1)
+        real_taken = User.objects._taken_usernames
+
+        # First lookup misses the concurrent row, second one sees it
+        with mock.patch.object(
+            User.objects,
+            "_taken_usernames",
+            side_effect=[set(), real_taken("juan.delacruz")],
+        ):
+            user = User.objects.create_user(
+                first_name="Juan",
+                last_name="Dela Cruz",
+                email="juan@example.com",
+                password="testpass123",
+            )
+        self.assertEqual(user.username, "juan.delacruz1")
+
+    # Benchmark: Signup cost stays flat with hundreds of username collisions
+    def test_signup_cost_flat_with_collisions(self):
+        baseline = self._signup_queries("first@example.com")
+        self._create_collisions("juan.delacruz", 500, start=1)
+        self.assertEqual(self._signup_queries("second@example.com"), baseline)
+
+
+class BulkProvisionTests(TestCase):
+    # Test: Rows are inserted with generated usernames and hashed passwords
+    def test_bulk_provision_creates_users(self):
+        User.objects.create_user(
+            first_name="Ana", last_name="Reyes", email="ana@example.com"
+        )
+        rows = [
+            {"email": "ana2@example.com", "first_name": "Ana", "last_name": "Reyes"},
+            {"email": "ana3@example.com", "first_name": "Ana", "last_name": "Reyes"},
+            {"email": "Bo@EXAMPLE.com", "username": "bob.o", "password": "s3cret-pass"},
+        ]
+        summary = User.objects.bulk_provision(rows, workers=1)
+
+        self.assertEqual(summary, {"processed": 3, "created": 3, "failed": 0})
+        self.assertTrue(User.objects.filter(username="ana.reyes1").exists())
+        self.assertTrue(User.objects.filter(username="ana.reyes2").exists())
+        bo = User.objects.get(username="bob.o")
+        self.assertEqual(bo.email, "Bo@example.com")
+        self.assertTrue(bo.check_password("s3cret-pass"))
+
+    # Test: Invalid and duplicate rows are reported without blocking the batch
+    def test_bulk_provision_reports_row_errors(self):
+        User.objects.create_user(username="taken", email="taken@example.com")
+        rows = [
+            {"email": "not-an-email", "username": "valid"},
+            {"email": "taken@example.com", "username": "other"},
+            {"email": "new@example.com", "username": "taken"},
+            {"email": "dup@example.com", "username": "dup1"},
+            {"email": "dup@example.com", "username": "dup2"},
+            {"email": "noname@example.com"},
+            {"email": "ok@example.com", "username": "ok.user"},
+        ]
+        errors = {}
+        summary = User.objects.bulk_provision(
+            rows,
+            workers=1,
+            on_error=lambda row, messages: errors.update({row: messages}),
+        )
+
+        self.assertEqual(summary["created"], 2)
+        self.assertEqual(sorted(errors), [1, 2, 3, 5, 6])
+        self.assertTrue(User.objects.filter(username="ok.user").exists())
+
+    # Test: Queries per batch do not grow with the number of rows
+    def test_bulk_provision_batches_queries(self):
+        rows = [
+            {"email": f"user{i}@example.com", "first_name": "Juan", "last_name": "Cruz"}
+            for i in range(50)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            User.objects.bulk_provision(rows, batch_size=25, workers=1)
+        self.assertLessEqual(len(queries), 2 * 6)
+        self.assertEqual(User.objects.filter(last_name="Cruz").count(), 50)
+
+    # Test: Passwords can be hashed in a process pool
+    def test_bulk_provision_process_pool(self):
+        rows = [{"email": "pool@example.com", "username": "pool", "password": "pw-123"}]
+        User.objects.bulk_provision(rows, workers=2)
+        self.assertTrue(User.objects.get(username="pool").check_password("pw-123"))
+
+    # Test: import_users command streams a CSV file
+    def test_import_users_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as csv_file:
+            csv_file.write("email,first_name,last_name,job_title\n")
+            csv_file.write("maria@example.com,Maria,Santos,Manager\n")
+            csv_file.write("bad-email,Jose,Rizal,Writer\n")
+
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            "import_users", csv_file.name, "--workers=1", stdout=stdout, stderr=stderr
+        )
+
+        self.assertTrue(User.objects.filter(username="maria.santos").exists())
+        self.assertIn("Imported 1 of 2 users", stdout.getvalue())
+        self.assertIn("Line 3", stderr.getvalue())
+
+
+class UserAdminSearchTests(TestCase):
+    def setUp(self):
+        self.model_admin = site._registry[User]
+        self.request = RequestFactory().get("/")
+        for first_name, last_name, job_title in [
+            ("Juan", "Dela Cruz", "Developer"),
+            ("Juana", "Cruzado", "Manager"),
+            ("Pedro", "Santos", "Analyst"),
+        ]:
+            User.objects.create_user(
+                first_name=first_name,
+                last_name=last_name,
+                email=f"{first_name.lower()}@example.com",
+                job_title=job_title,
+            )
+
+    def _search(self, search_term):
+        queryset, may_have_duplicates = self.model_admin.get_search_results(
+            self.request, User.objects.all(), search_term
+        )
+        self.assertFalse(may_have_duplicates)
+        return list(queryset.order_by("-search_rank", "pk"))
+
+    # Test: Every term must match one of the search fields
+    def test_search_matches_all_terms(self):
+        results = self._search("juan cruz")
+        self.assertEqual(
+            sorted(user.username for user in results),
+            ["juan.delacruz", "juana.cruzado"],
+        )
+
+    # Test: Substring matches work on usernames and emails
+    def test_search_substring(self):
+        self.assertEqual([user.first_name for user in self._search("edro@")], ["Pedro"])
+
+    # Test: Terms shorter than a trigram still match
+    def test_search_short_term(self):
+        self.assertEqual([user.first_name for user in self._search("pe")], ["Pedro"])
+
+    # Test: Index follows updates to searched fields
+    def test_search_index_tracks_updates(self):
+        user = User.objects.get(first_name="Pedro")
+        user.last_name = "Reyes"
+        user.email = "p.reyes@example.com"
+        user.save()
+        self.assertEqual(self._search("edro@"), [])
+        self.assertEqual([user.first_name for user in self._search("reyes")], ["Pedro"])
+
+    # Test: Closer matches rank first
+    def test_search_ranked(self):
+        results = self._search("juana")
+        self.assertEqual(results[0].username, "juana.cruzado")
+
+    # Test: Changelist orders search results by rank
+    def test_changelist_search(self):
+        admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="admin123"
+        )
+        self.client.force_login(admin)
+        response = self.client.get(
+            reverse("admin:users_user_changelist"), {"q": "cruz"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cl"].result_count, 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class UserFacetCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(name="Sales")
+        self.user = User.objects.create_user(username="first", email="a@example.com")
+        reconcile_facets()
+
+    def _count(self, key):
+        return get_counts([key]).get(key)
+
+    # Test: Reconciliation counts flags and group members
+    def test_reconcile_counts(self):
+        self.assertEqual(self._count(flag_key("is_active", 1)), 1)
+        self.assertEqual(self._count(flag_key("is_staff", 0)), 1)
+        self.assertEqual(self._count(group_key(self.group.pk)), 0)
+
+    # Test: Creating and updating users moves counts
+    def test_save_updates_flag_counts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create_user(username="second", email="b@example.com")
+        self.assertEqual(self._count(flag_key("is_active", 1)), 2)
+
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(self._count(flag_key("is_active", 1)), 1)
+        self.assertEqual(self._count(flag_key("is_active", 0)), 1)
+
+    # Test: Group membership changes update group counts from either side
+    def test_membership_updates_group_counts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.add(self.group)
+        self.assertEqual(self._count(group_key(self.group.pk)), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other = User.objects.create_user(username="second", email="b@example.com")
+            self.group.user_set.add(other)
+        self.assertEqual(self._count(group_key(self.group.pk)), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.remove(self.group)
+            self.group.user_set.clear()
+        self.assertEqual(self._count(group_key(self.group.pk)), 0)
+
+    # Test: Removing non-members leaves counts alone, from either side
+    def test_remove_non_member(self):
+        other = User.objects.create_user(username="second", email="b@example.com")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.user_set.add(other)
+            self.user.groups.remove(self.group)
+            self.group.user_set.remove(self.user, other)
+        self.assertEqual(self._count(group_key(self.group.pk)), 0)
+
+    # Test: Rolled back changes don't move counts
+    def test_rollback_keeps_counts(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self.user.groups.add(self.group)
+                    self.user.is_active = False
+                    self.user.save()
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self._count(group_key(self.group.pk)), 0)
+        self.assertEqual(self._count(flag_key("is_active", 1)), 1)
+
+    # Test: Bulk provisioning keeps counts in step without signals
+    def test_bulk_provision_updates_counts(self):
+        User.objects.bulk_provision(
+            [{"email": "bulk@example.com", "username": "bulk.user"}], workers=1
+        )
+        self.assertEqual(self._count(flag_key("is_active", 1)), 2)
+
+    # Test: Filters label options with counts and no database queries
+    def test_filter_labels_include_counts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.add(self.group)
+        request = RequestFactory().get("/")
+        model_admin = site._registry[User]
+
+        with self.assertNumQueries(0):
+            active = ActiveStatusFilter(request, {}, User, model_admin)
+        self.assertEqual(active.lookup_choices, [("1", "Yes (1)"), ("0", "No (0)")])
+
+        groups = GroupFilter(request, {}, User, model_admin)
+        self.assertEqual(groups.lookup_choices, [(str(self.group.pk), "Sales (1)")])
+
+
 class UserStringRepresentationTests(TestCase):
     # Test: User string representation
     def test_user_str(self):
@@ -1,6 +1,9 @@
-from apps.common.validators import validate_unique_field
+from apps.common.validators import validate_unique_field, validate_unique_values
 from apps.users.models import User
 
+EMAIL_TAKEN_MESSAGE = "This email address is already registered."
+USERNAME_TAKEN_MESSAGE = "A user with this username already exists."
+
 
 # Validates that email is unique
 def validate_unique_email(email, instance=None):
@@ -9,7 +12,7 @@ def validate_unique_email(email, instance=None):
         field_name="email",
         value=email,
         instance=instance,
-        error_message="This email address is already registered.",
+        error_message=EMAIL_TAKEN_MESSAGE,
     )
 
 
@@ -20,5 +23,27 @@ def validate_unique_username(username, instance=None):
         field_name="username",
         value=username,
         instance=instance,
-        error_message="A user with this username already exists.",
+        error_message=USERNAME_TAKEN_MESSAGE,
+    )
+
+
+# Validates a batch of emails, returning {index: ValidationError}
+def validate_unique_emails(emails, exclude_pks=None):
+    return validate_unique_values(
+        model=User,
+        field_name="email",
+        values=emails,
+        exclude_pks=exclude_pks,
+        error_message=EMAIL_TAKEN_MESSAGE,
+    )
+
+
+# Validates a batch of usernames, returning {index: ValidationError}
+def validate_unique_usernames(usernames, exclude_pks=None):
+    return validate_unique_values(
+        model=User,
+        field_name="username",
+        values=usernames,
+        exclude_pks=exclude_pks,
+        error_message=USERNAME_TAKEN_MESSAGE,
     )
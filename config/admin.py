@@ -0,0 +1,171 @@
+from django.conf import settings
+from django.contrib import messages
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from unfold.sites import UnfoldAdminSite
+
+from apps.common.fragments import fragment_key, get_fragment, set_fragment
+from apps.common.profiling import PROFILE_SAMPLES, template_report
+from apps.security import lockout
+from apps.security.fragments import role_signature
+
+# Sidebar keys that are request specific or already resolved (permission
+# callbacks become "has_permission"), left out of the shared copy
+UNSHARED_KEYS = {"active", "badge", "badge_callback", "link_callback", "permission"}
+
+
+class AdminSite(UnfoldAdminSite):
+    def get_urls(self):
+        return [
+            path(
+                "template-profile/",
+                self.admin_view(self.template_profile_view),
+                name="template_profile",
+            ),
+            path(
+                "login-lockouts/",
+                self.admin_view(self.login_lockouts_view),
+                name="login_lockouts",
+            ),
+        ] + super().get_urls()
+
+    def template_profile_view(self, request):
+        # Rolling render time percentiles per template, in milliseconds
+        if not request.user.is_superuser:
+            raise PermissionDenied
+
+        report = template_report()
+        context = {
+            **self.each_context(request),
+            "title": _("Template profile"),
+            "profiling_enabled": settings.TEMPLATE_PROFILING,
+            "report_available": report is not None,
+            "samples": PROFILE_SAMPLES,
+            "table": {
+                "headers": [
+                    _("Template"),
+                    _("Requests"),
+                    _("Renders / request"),
+                    _("Inclusive p50"),
+                    _("Inclusive p95"),
+                    _("Inclusive p99"),
+                    _("Exclusive p50"),
+                    _("Exclusive p95"),
+                    _("Exclusive p99"),
+                ],
+                "rows": [
+                    [
+                        row["template"],
+                        row["requests"],
+                        f"{row['renders_per_request']:.1f}",
+                        *(
+                            f"{row[f'{kind}_p{percent}']:.2f}"
+                            for kind in ("inclusive", "exclusive")
+                            for percent in (50, 95, 99)
+                        ),
+                    ]
+                    for row in report or []
+                ],
+            },
+        }
+        return TemplateResponse(request, "admin/template_profile.html", context)
+
+    def login_lockouts_view(self, request):
+        # Emails, IPs and subnets with recent failed logins; POST lifts a lockout
+        if not request.user.is_superuser:
+            raise PermissionDenied
+
+        if request.method == "POST":
+            dimension = request.POST.get("dimension")
+            value = request.POST.get("value", "")
+            if dimension in lockout.LOCKOUT_RULES and value:
+                lockout.clear(dimension, value)
+                messages.success(
+                    request,
+                    _("Cleared failed logins for %(value)s.") % {"value": value},
+                )
+            return redirect("admin:login_lockouts")
+
+        offenders = lockout.offenders()
+        for offender in offenders or []:
+            offender["last_failure"] = timezone.datetime.fromtimestamp(
+                offender["last_failure"], timezone.get_current_timezone()
+            )
+        context = {
+            **self.each_context(request),
+            "title": _("Login lockouts"),
+            "offenders": offenders,
+            "rules": lockout.LOCKOUT_RULES,
+        }
+        return TemplateResponse(request, "admin/login_lockouts.html", context)
+
+    def get_sidebar_list(self, request):
+        # Permission callbacks and links are resolved once per role, language
+        # and navigation version; only "active" is worked out per request
+        signature = role_signature(request)
+        if signature is None or not self._sidebar_is_shareable(request):
+            return super().get_sidebar_list(request)
+
+        key = fragment_key(f"admin-sidebar:{self.name}", signature)
+        navigation = get_fragment(key)
+        if navigation is None:
+            navigation = [
+                self._shareable(group) for group in super().get_sidebar_list(request)
+            ]
+            set_fragment(key, navigation)
+
+        return [
+            {**group, "items": self._with_active(request, group["items"])}
+            for group in navigation
+        ]
+
+    def _sidebar_is_shareable(self, request):
+        # Tabs, badges, and callable links or "active" flags depend on the request
+        if self._get_config("TABS", request):
+            return False
+        navigation = self._get_config("SIDEBAR", request).get("navigation") or []
+        if callable(navigation):
+            return False
+
+        def shareable(item):
+            return (
+                not callable(item.get("link"))
+                and "active" not in item
+                and "badge" not in item
+                and all(shareable(child) for child in item.get("items", []))
+            )
+
+        return all(
+            "badge" not in group and all(shareable(item) for item in group["items"])
+            for group in navigation
+        )
+
+    def _shareable(self, entry):
+        # Plain strings and booleans only, so the copy can live in Redis
+        shared = {
+            key: value for key, value in entry.items() if key not in UNSHARED_KEYS
+        }
+        for key in ("title", "link"):
+            if shared.get(key) is not None:
+                shared[key] = str(shared[key])
+        if "items" in entry:
+            shared["items"] = [self._shareable(item) for item in entry["items"]]
+        return shared
+
+    def _with_active(self, request, items):
+        return [
+            {
+                **item,
+                "active": self._get_is_active(request, item["link"]),
+                **(
+                    {"items": self._with_active(request, item["items"])}
+                    if "items" in item
+                    else {}
+                ),
+            }
+            for item in items
+        ]
@@ -39,6 +39,14 @@ CONTENT_SECURITY_POLICY = {
     },
 }
 
+# Reverse proxies (IPs or CIDRs) whose X-Forwarded-For entries are believed
+TRUSTED_PROXIES = config("TRUSTED_PROXIES", default="", cast=Csv())
+
+# MaxMind-format (.mmdb) databases for client country and ASN lookups;
+# requires the optional maxminddb package
+GEOIP_COUNTRY_DATABASE = config("GEOIP_COUNTRY_DATABASE", default="")
+GEOIP_ASN_DATABASE = config("GEOIP_ASN_DATABASE", default="")
+
 # ------------------------------------
 # Admin
 # ------------------------------------
@@ -52,11 +60,13 @@ if not ADMIN_URL.endswith("/"):
 
 # Login/Logout
 LOGIN_URL = "/login/"
-LOGIN_REDIRECT_URL = reverse_lazy("base:index")
+LOGIN_REDIRECT_URL = reverse_lazy("analytics:dashboard")
 LOGOUT_REDIRECT_URL = reverse_lazy("base:index")
 
 # Signup
-ACCOUNT_SIGNUP_REDIRECT_URL = reverse_lazy("base:index")  # django-allauth
+ACCOUNT_SIGNUP_REDIRECT_URL = reverse_lazy(
+    "security:complete_profile"
+)  # django-allauth
 ACCOUNT_LOGOUT_REDIRECT_URL = reverse_lazy("base:index")  # django-allauth
 
 # ------------------------------------
@@ -77,14 +87,14 @@ INSTALLED_APPS = [
     "apps.security",
     "apps.users",
     # Third-party Packages
-    "unfold",
+    "unfold.apps.BasicAppConfig",
     "allauth",
     "allauth.account",
     "django_tailwind_cli",
     "phonenumber_field",
     "djmoney",
     # Core Django Apps
-    "django.contrib.admin",
+    "config.apps.AdminConfig",  # django.contrib.admin with config.admin.AdminSite
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
@@ -101,6 +111,7 @@ MIDDLEWARE = [
     "csp.middleware.CSPMiddleware",  # django-csp
     "whitenoise.middleware.WhiteNoiseMiddleware",  # whitenoise
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "apps.security.middleware.LegacyAuthBackendMiddleware",
     "django.middleware.locale.LocaleMiddleware",  # core-django-i18n
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -108,7 +119,10 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",  # django-allauth
-    "django_currentuser.middleware.ThreadLocalUserMiddleware",  # django-currentuser
+    "apps.common.middleware.CurrentActorMiddleware",
+    "apps.common.middleware.TemplateProfilerMiddleware",
+    "apps.security.middleware.SessionActivityMiddleware",
+    "apps.security.middleware.ProfileGateMiddleware",
 ]
 
 # ------------------------------------
@@ -178,6 +192,10 @@ TEMPLATES = [
     },
 ]
 
+# Template profiling: per-template render times, reported in the admin
+TEMPLATE_PROFILING = config("TEMPLATE_PROFILING", default=False, cast=bool)
+TEMPLATE_PROFILING_SLOW_MS = config("TEMPLATE_PROFILING_SLOW_MS", default=200, cast=int)
+
 # ------------------------------------
 # Static & Media Files
 # ------------------------------------
@@ -253,6 +271,9 @@ LOGGING = {
             "format": "{levelname} {message}",
             "style": "{",
         },
+        "json": {
+            "()": "apps.common.log.JSONLinesFormatter",
+        },
     },
     # Define where logs are sent
     "handlers": {
@@ -271,14 +292,14 @@ LOGGING = {
             "backupCount": 5,
             "formatter": "verbose",
         },
-        # Application logs
+        # Application logs (JSON lines, written by the queue listener)
         "app_file": {
             "level": "INFO",
             "class": "logging.handlers.RotatingFileHandler",
             "filename": LOGS_DIR / "app.log",
             "maxBytes": 1024 * 1024 * 10,  # 10MB
             "backupCount": 5,
-            "formatter": "verbose",
+            "formatter": "json",
         },
         # Error-only log file
         "error_file": {
@@ -289,6 +310,13 @@ LOGGING = {
             "backupCount": 5,
             "formatter": "verbose",
         },
+        # Queues application records for a background writer thread
+        "app_queue": {
+            "class": "apps.common.log.BoundedQueueHandler",
+            "handlers": ["app_file", "error_file"],
+            "respect_handler_level": True,
+            "queue": {"()": "queue.Queue", "maxsize": 10000},
+        },
     },
     # Configure loggers for different parts of the application
     "loggers": {
@@ -303,7 +331,7 @@ LOGGING = {
             "propagate": False,
         },
         "apps": {
-            "handlers": ["app_file", "error_file"],
+            "handlers": ["app_queue"],
             "level": "INFO",
             "propagate": False,
         },
@@ -371,6 +399,18 @@ UNFOLD = {
                         "icon": "admin_panel_settings",
                         "permission": lambda request: request.user.is_authenticated,
                     },
+                    {
+                        "link": reverse_lazy("admin:security_loginevent_changelist"),
+                        "title": _("Login Events"),
+                        "icon": "login",
+                        "permission": lambda request: request.user.is_superuser,
+                    },
+                    {
+                        "link": reverse_lazy("admin:login_lockouts"),
+                        "title": _("Login Lockouts"),
+                        "icon": "lock",
+                        "permission": lambda request: request.user.is_superuser,
+                    },
                 ],
             },
             {
@@ -384,6 +424,12 @@ UNFOLD = {
                         "icon": "web",
                         "permission": lambda request: request.user.is_authenticated,
                     },
+                    {
+                        "link": reverse_lazy("admin:template_profile"),
+                        "title": _("Template Profile"),
+                        "icon": "speed",
+                        "permission": lambda request: request.user.is_superuser,
+                    },
                 ],
             },
         ],
@@ -402,8 +448,8 @@ TAILWIND_CLI_ARGS = "--minify"
 # Allauth Integration Settings
 # ------------------------------------
 AUTHENTICATION_BACKENDS = [
-    "django.contrib.auth.backends.ModelBackend",
-    "allauth.account.auth_backends.AuthenticationBackend",
+    "apps.security.backends.CachedModelBackend",
+    "apps.security.backends.CachedAuthenticationBackend",
 ]
 
 SITE_ID = 1
@@ -418,7 +464,7 @@ ACCOUNT_SIGNUP_FIELDS = [  # (*) indicates required fields
 ACCOUNT_EMAIL_VERIFICATION = "none"  # mandatory / optional / none
 ACCOUNT_LOGIN_ON_EMAIL_CONFIRMATION = False
 ACCOUNT_RATE_LIMITS = {
-    "login_failed": "5/5m",  # 5 failed login attempts per 5 minutes
+    "login_failed": "5/5m",  # Fallback for apps.security.lockout when Redis is unavailable
     "login": "20/h",  # Max 20 total login attempts per hour
     "signup": "3/d",  # 3 signups per IP per day
     "confirm_email": "1/3m/key",  # 1 confirmation email every 3 minutes per email address
@@ -426,7 +472,9 @@ ACCOUNT_RATE_LIMITS = {
     "reset_password_from_key": "20/d/key",  # 20 password reset submissions per reset link per day
     "change_password": "5/m/user",  # 5 password changes per user per minute
     "manage_email": "10/m/user",  # 10 email add/remove actions per user per minute
+    "check_availability": "30/m/ip",  # 30 username/email availability checks per IP per minute
 }
+ACCOUNT_ADAPTER = "apps.security.adapters.AccountAdapter"
 ACCOUNT_LOGIN_METHODS = ["email"]
 ACCOUNT_SESSION_REMEMBER = None
 
@@ -450,3 +498,25 @@ CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
+CELERY_BEAT_SCHEDULE = {
+    "reconcile-user-facets": {
+        "task": "apps.users.tasks.reconcile_user_facets",
+        "schedule": 15 * 60,  # 15 minutes
+    },
+    "archive-soft-deleted-rows": {
+        "task": "apps.common.tasks.archive_soft_deleted_rows",
+        "schedule": 24 * 60 * 60,  # Daily
+    },
+    "flush-login-events": {
+        "task": "apps.security.tasks.flush_login_events",
+        "schedule": 30,  # 30 seconds
+    },
+    "sweep-session-expiry": {
+        "task": "apps.security.tasks.sweep_session_expiry",
+        "schedule": 5 * 60,  # 5 minutes
+    },
+    "rebuild-availability-filters": {
+        "task": "apps.users.tasks.rebuild_availability_filters",
+        "schedule": 24 * 60 * 60,  # Daily
+    },
+}
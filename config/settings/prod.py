@@ -68,10 +68,34 @@ DATABASE_PROD = (
 # Parse and configure database
 DATABASES = {"default": dj_database_url.parse(DATABASE_PROD, conn_max_age=600)}
 
+# ------------------------------------
+# Templates
+# ------------------------------------
+# Compile each template once per process, regardless of DEBUG or base loaders
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "APP_DIRS": False,
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                )
+            ],
+        },
+    }
+]
+
 # ------------------------------------
 # Sessions
 # ------------------------------------
-SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+# cached_db that keeps expiry-only saves in Redis (see apps.security.sessions)
+SESSION_ENGINE = "apps.security.sessions"
 SESSION_CACHE_ALIAS = "default"
 
 # ------------------------------------
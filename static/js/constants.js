@@ -20,3 +20,6 @@ export const DISABLED_BUTTON_CLASSES = [
     'cursor-not-allowed',
     'pointer-events-none',
 ];
+
+// Availability Check (in milliseconds)
+export const AVAILABILITY_DEBOUNCE = 400;